@@ -0,0 +1,17 @@
+"""
+Celery application for SmartCash.
+
+Workers and beat are started with ``celery -A SmartCash worker`` and
+``celery -A SmartCash beat``. Configuration comes from the ``CELERY_*``
+Django settings; tasks are discovered in each app's ``tasks`` module.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SmartCash.settings')
+
+app = Celery('SmartCash')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -54,7 +54,13 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'rest_framework.authtoken',
-    'accounts'
+    'django_filters',
+    'accounts',
+    'transactions',
+    'analytics',
+    'subscriptions',
+    'anomalies',
+    'notifications',
 ]
 
 AUTH_USER_MODEL = 'accounts.User'
@@ -62,7 +68,7 @@ AUTH_USER_MODEL = 'accounts.User'
 # Django REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'accounts.authentication.TokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -125,6 +131,21 @@ DATABASES = {
 }
 
 
+# Cache
+# Redis when REDIS_URL is set (shared by all workers), otherwise per-process memory
+
+REDIS_URL = os.environ.get('REDIS_URL')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    } if REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -173,6 +194,160 @@ PIRAEUS_CLIENT_SECRET = get_env_variable('CLIENT_SECRET')
 # Optional Piraeus Bank API Configuration
 PIRAEUS_REDIRECT_URI = os.environ.get('PIRAEUS_REDIRECT_URI', 'https://localhost:8000/callback')
 PIRAEUS_SANDBOX_MODE = os.environ.get('PIRAEUS_SANDBOX_MODE', 'True').lower() == 'true'
+PIRAEUS_TIMEZONE = 'Europe/Athens'  # AIS dates and daily consent budgets are in Athens time
+PIRAEUS_API_BASE_URL = os.environ.get(
+    'PIRAEUS_API_BASE_URL', 'https://api.rapidlink.piraeusbank.gr/piraeusbank/production/psd2/v3.1'
+)
+PIRAEUS_OAUTH_BASE_URL = os.environ.get(
+    'PIRAEUS_OAUTH_BASE_URL', 'https://api.rapidlink.piraeusbank.gr/piraeusbank/production/v3/oauth/oauth2'
+)
+
+# mTLS client certificate, loaded once per process by accounts.piraeus.client
+PIRAEUS_CERT_FILE = os.environ.get('PIRAEUS_CERT_FILE', 'certificate.crt')
+PIRAEUS_KEY_FILE = os.environ.get('PIRAEUS_KEY_FILE', 'private.key')
+
+# Connection pooling: one pool per host, PIRAEUS_POOL_MAXSIZE keep-alive connections each
+PIRAEUS_POOL_CONNECTIONS = int(os.environ.get('PIRAEUS_POOL_CONNECTIONS', '4'))
+PIRAEUS_POOL_MAXSIZE = int(os.environ.get('PIRAEUS_POOL_MAXSIZE', '32'))
+PIRAEUS_CONNECT_TIMEOUT = float(os.environ.get('PIRAEUS_CONNECT_TIMEOUT', '5'))
+PIRAEUS_TIMEOUT = float(os.environ.get('PIRAEUS_TIMEOUT', '30'))
+
+# Retries with jittered exponential backoff and per-endpoint circuit breakers (accounts.piraeus.resilience)
+PIRAEUS_RETRY_ATTEMPTS = int(os.environ.get('PIRAEUS_RETRY_ATTEMPTS', '3'))
+PIRAEUS_RETRY_BASE_DELAY = float(os.environ.get('PIRAEUS_RETRY_BASE_DELAY', '0.5'))
+PIRAEUS_RETRY_MAX_DELAY = float(os.environ.get('PIRAEUS_RETRY_MAX_DELAY', '8'))
+PIRAEUS_BREAKER_FAILURE_THRESHOLD = int(os.environ.get('PIRAEUS_BREAKER_FAILURE_THRESHOLD', '5'))
+PIRAEUS_BREAKER_RESET_TIMEOUT = float(os.environ.get('PIRAEUS_BREAKER_RESET_TIMEOUT', '30'))
+
+# Refresh OAuth access tokens this many seconds before they expire (sandbox tokens live 60 minutes)
+PIRAEUS_TOKEN_REFRESH_MARGIN = int(os.environ.get('PIRAEUS_TOKEN_REFRESH_MARGIN', '300'))
+
+# Incremental transaction sync (accounts.piraeus.sync)
+PIRAEUS_SYNC_INITIAL_DAYS = int(os.environ.get('PIRAEUS_SYNC_INITIAL_DAYS', '90'))
+PIRAEUS_SYNC_OVERLAP_DAYS = int(os.environ.get('PIRAEUS_SYNC_OVERLAP_DAYS', '5'))
+# AIS calls budgeted per account and sync (balances and transaction pages); a sync needs this plus the account list
+PIRAEUS_SYNC_CALLS_PER_ACCOUNT = int(os.environ.get('PIRAEUS_SYNC_CALLS_PER_ACCOUNT', '3'))
+PIRAEUS_SYNC_SINK = 'transactions.ingest.ingest_sync_batch'  # dotted path to a callable receiving each SyncBatch
+
+# Scheduled sync (accounts.tasks): every interval, users are chunked and spread evenly across it with jitter
+PIRAEUS_SYNC_INTERVAL = int(os.environ.get('PIRAEUS_SYNC_INTERVAL', str(6 * 60 * 60)))
+PIRAEUS_SYNC_CHUNK_SIZE = int(os.environ.get('PIRAEUS_SYNC_CHUNK_SIZE', '25'))
+PIRAEUS_SYNC_JITTER = float(os.environ.get('PIRAEUS_SYNC_JITTER', '0.8'))  # share of each chunk's slot
+PIRAEUS_SYNC_ACTIVE_DAYS = int(os.environ.get('PIRAEUS_SYNC_ACTIVE_DAYS', '30'))  # idle users sync every 4th round
+
+# Webhook deliveries are signed with HMAC-SHA256 using this secret (accounts.piraeus.webhooks)
+PIRAEUS_WEBHOOK_SECRET = os.environ.get('PIRAEUS_WEBHOOK_SECRET', '')
+
+# Webhook processing (accounts.tasks): attempts before an event is left dead, and seconds after which an
+# event still claimed by a worker is assumed lost with it and handed to another one
+PIRAEUS_WEBHOOK_MAX_ATTEMPTS = int(os.environ.get('PIRAEUS_WEBHOOK_MAX_ATTEMPTS', '8'))
+PIRAEUS_WEBHOOK_STALE_SECONDS = int(os.environ.get('PIRAEUS_WEBHOOK_STALE_SECONDS', '900'))
+
+# Request budgets (accounts.piraeus.ratelimit), shared across workers through this cache alias
+PIRAEUS_RATE_LIMIT_CACHE = 'default'
+PIRAEUS_CONSENT_FREQUENCY_PER_DAY = int(os.environ.get('PIRAEUS_CONSENT_FREQUENCY_PER_DAY', '255'))
+PIRAEUS_CLIENT_RATE_PER_SECOND = int(os.environ.get('PIRAEUS_CLIENT_RATE_PER_SECOND', '0'))  # 0 disables
+PIRAEUS_CLIENT_RATE_MAX_WAIT = float(os.environ.get('PIRAEUS_CLIENT_RATE_MAX_WAIT', '5'))  # seconds a call waits for a slot
+
+# Bulk AIS fetcher (accounts.piraeus.fetcher): global and per-host concurrency caps
+PIRAEUS_FETCH_CONCURRENCY = int(os.environ.get('PIRAEUS_FETCH_CONCURRENCY', '64'))
+PIRAEUS_FETCH_PER_HOST_CONCURRENCY = int(os.environ.get('PIRAEUS_FETCH_PER_HOST_CONCURRENCY', '32'))
+
+# Monthly partitions of transactions_transaction (transactions.partitions)
+TRANSACTION_PARTITION_MONTHS_AHEAD = int(os.environ.get('TRANSACTION_PARTITION_MONTHS_AHEAD', '3'))
+TRANSACTION_PARTITION_RETAIN_MONTHS = int(os.environ.get('TRANSACTION_PARTITION_RETAIN_MONTHS', '0'))  # 0 keeps all
+TRANSACTION_PARTITION_ARCHIVE_SCHEMA = os.environ.get('TRANSACTION_PARTITION_ARCHIVE_SCHEMA', 'archive')
+
+# Bulk ingestion (transactions.ingest): rows merged and committed per chunk
+TRANSACTION_INGEST_CHUNK_SIZE = int(os.environ.get('TRANSACTION_INGEST_CHUNK_SIZE', '5000'))
+
+# Export (transactions.export): rows fetched per server-side cursor round trip
+TRANSACTION_EXPORT_CHUNK_SIZE = int(os.environ.get('TRANSACTION_EXPORT_CHUNK_SIZE', '2000'))
+
+# Categorization (transactions.categorizer): seconds between checks for changed CategoryRule rows
+CATEGORY_RULES_CHECK_SECONDS = int(os.environ.get('CATEGORY_RULES_CHECK_SECONDS', '30'))
+# Categorization results per merchant key: in-process LRU entries, plus a shared cache alias ('' to disable)
+CATEGORY_CACHE_SIZE = int(os.environ.get('CATEGORY_CACHE_SIZE', '50000'))
+CATEGORY_CACHE_ALIAS = os.environ.get('CATEGORY_CACHE_ALIAS', 'default' if REDIS_URL else '')
+CATEGORY_CACHE_TIMEOUT = int(os.environ.get('CATEGORY_CACHE_TIMEOUT', '86400'))
+
+# Monthly spending summaries (analytics.summaries): (user, month) slices recomputed per transaction
+ANALYTICS_SUMMARY_BATCH_SIZE = int(os.environ.get('ANALYTICS_SUMMARY_BATCH_SIZE', '500'))
+
+# Subscription detection (subscriptions.detector)
+SUBSCRIPTION_MIN_OCCURRENCES = int(os.environ.get('SUBSCRIPTION_MIN_OCCURRENCES', '3'))
+SUBSCRIPTION_RECOMPUTE_PROCESSES = int(os.environ.get('SUBSCRIPTION_RECOMPUTE_PROCESSES', str(os.cpu_count() or 1)))  # full recompute pool
+
+# Safe to spend (analytics.safe_to_spend): category of salary credits, horizon in days when none is found
+SAFE_TO_SPEND_INCOME_CATEGORY = os.environ.get('SAFE_TO_SPEND_INCOME_CATEGORY', 'salary')
+SAFE_TO_SPEND_DEFAULT_DAYS = int(os.environ.get('SAFE_TO_SPEND_DEFAULT_DAYS', '30'))
+SAFE_TO_SPEND_CACHE_SECONDS = int(os.environ.get('SAFE_TO_SPEND_CACHE_SECONDS', '60'))  # client Cache-Control max-age
+
+# Unusual spending (anomalies.detector): EWMA weight of each new debit, minimum debits per category
+# before scoring, standard deviations that flag a debit (lower for new merchants), alert window in days,
+# and how many minutes of already scanned rows each run looks at again (ingest chunks commit out of order)
+ANOMALY_EWMA_ALPHA = float(os.environ.get('ANOMALY_EWMA_ALPHA', '0.1'))
+ANOMALY_MIN_OBSERVATIONS = int(os.environ.get('ANOMALY_MIN_OBSERVATIONS', '10'))
+ANOMALY_Z_THRESHOLD = float(os.environ.get('ANOMALY_Z_THRESHOLD', '3.0'))
+ANOMALY_NEW_MERCHANT_Z_THRESHOLD = float(os.environ.get('ANOMALY_NEW_MERCHANT_Z_THRESHOLD', '1.0'))
+ANOMALY_ALERT_DAYS = int(os.environ.get('ANOMALY_ALERT_DAYS', '3'))
+ANOMALY_RESCAN_MINUTES = int(os.environ.get('ANOMALY_RESCAN_MINUTES', '60'))
+
+# Alerts (notifications.engine): events within this many seconds go out as one notification; salary
+# credits this many days old still alert; how long a user's set of active trigger types is cached
+NOTIFICATION_COALESCE_SECONDS = int(os.environ.get('NOTIFICATION_COALESCE_SECONDS', '300'))
+NOTIFICATION_RECENT_DAYS = int(os.environ.get('NOTIFICATION_RECENT_DAYS', '3'))
+NOTIFICATION_RULE_CACHE_SECONDS = int(os.environ.get('NOTIFICATION_RULE_CACHE_SECONDS', '300'))
+NOTIFICATION_EMAIL = os.environ.get('NOTIFICATION_EMAIL', 'False').lower() == 'true'  # also email notifications
+
+# Email
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', '25'))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'False').lower() == 'true'
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'SmartCash <noreply@smartcash.local>')
+
+# Celery
+# The broker is CELERY_BROKER_URL, else Redis when REDIS_URL is set. Without one, nothing would ever
+# consume the tasks the web process enqueues (webhooks, ingest fan-out): with DEBUG they then run inline
+# in the calling process (CELERY_TASK_ALWAYS_EAGER, also handy for tests and management commands),
+# otherwise startup fails.
+
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', REDIS_URL or '')
+if not CELERY_BROKER_URL and not DEBUG:
+    raise ImproperlyConfigured("Set CELERY_BROKER_URL or REDIS_URL; without a broker background tasks are lost")
+CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND')
+CELERY_TASK_ALWAYS_EAGER = os.environ.get(
+    'CELERY_TASK_ALWAYS_EAGER', 'False' if CELERY_BROKER_URL else 'True',
+).lower() == 'true'
+CELERY_TASK_EAGER_PROPAGATES = True
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_TIMEZONE = 'UTC'
+CELERY_BEAT_SCHEDULE = {
+    'schedule-transaction-sync': {
+        'task': 'accounts.tasks.schedule_sync',
+        'schedule': PIRAEUS_SYNC_INTERVAL,
+    },
+    'refresh-expiring-tokens': {
+        'task': 'accounts.tasks.refresh_expiring_tokens',
+        'schedule': 5 * 60,
+    },
+    'requeue-webhook-events': {
+        'task': 'accounts.tasks.requeue_webhook_events',
+        'schedule': 5 * 60,
+    },
+    'maintain-transaction-partitions': {
+        'task': 'transactions.tasks.maintain_transaction_partitions',
+        'schedule': 24 * 60 * 60,
+    },
+    'rebuild-monthly-summaries': {
+        'task': 'analytics.tasks.rebuild_monthly_summaries',
+        'schedule': 24 * 60 * 60,
+    },
+}
 
 # Environment-specific settings
 ENVIRONMENT = os.environ.get('ENVIRONMENT', 'development')
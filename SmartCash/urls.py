@@ -20,5 +20,10 @@ from django.urls import path, include
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('accounts.urls')),
+    path('', include('transactions.urls')),
+    path('', include('analytics.urls')),
+    path('', include('subscriptions.urls')),
+    path('', include('anomalies.urls')),
+    path('', include('notifications.urls')),
     path('api-auth/', include('rest_framework.urls', namespace='rest_framework')),
 ]
@@ -0,0 +1,34 @@
+"""
+Token authentication that keeps the per-request user load small.
+
+Every API request loads the token and its user. The stock DRF class selects
+every ``auth_user`` column; this one defers the columns listed in
+``User.RARELY_USED_FIELDS`` so the hot path reads only what most views need.
+Views that do need them call ``request.user.load_deferred_fields()``.
+"""
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework import authentication, exceptions
+
+from .models import User
+
+
+class TokenAuthentication(authentication.TokenAuthentication):
+    """DRF token authentication with the user's rarely used columns deferred."""
+
+    def authenticate_credentials(self, key):
+        model = self.get_model()
+        try:
+            token = (
+                model.objects
+                .select_related('user')
+                .defer(*(f'user__{name}' for name in User.RARELY_USED_FIELDS))
+                .get(key=key)
+            )
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        return (token.user, token)
@@ -0,0 +1,48 @@
+"""
+Conditional GET support for the per-user read endpoints.
+
+Each endpoint derives a version from data it already holds (the user row
+that authentication loaded carries ``updated_at``) and turns it into an ETag
+and a Last-Modified date. ``conditional_get`` answers a request whose
+``If-None-Match`` / ``If-Modified-Since`` still match with a bare 304,
+before the payload is loaded or serialized; otherwise it builds the response
+and attaches the validators, so the next poll can be a 304.
+
+The same data renders differently per negotiated format (JSON, browsable
+API), so the renderer's media type is part of the ETag and responses vary on
+``Accept``.
+"""
+
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+
+def make_etag(*parts):
+    """Strong ETag over ``parts`` (version values, plus anything shaping the payload, e.g. serializer fields)."""
+    return '"%s"' % hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def set_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    # Let clients keep a copy, but revalidate it on every use; that revalidation is the cheap 304
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def conditional_get(request, etag, last_modified, build):
+    """A 304 if the client's copy is current, else ``build()``; either way with ETag and Last-Modified set.
+
+    ``request`` is the DRF request, after content negotiation.
+    """
+    etag = make_etag(etag, request.accepted_renderer.media_type)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is None:
+        response = build()
+    return set_validators(response, etag, last_modified)
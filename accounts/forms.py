@@ -2,7 +2,7 @@ from django import forms
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 from django.contrib.auth import authenticate
 from rest_framework import serializers
-from .models import User
+from .models import BankConsent, User
 
 
 # Django Forms (for HTML forms)
@@ -121,11 +121,19 @@ class PersonalInformationSerializer(serializers.ModelSerializer):
         return value.upper() if value else value
 
 
+class BankConsentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BankConsent
+        fields = ('consent_id', 'service', 'status', 'scopes', 'valid_until', 'frequency_per_day', 'created_at')
+        read_only_fields = fields
+
+
 class BankLinkingSerializer(serializers.ModelSerializer):
+    consents = BankConsentSerializer(source='bank_consents', many=True, read_only=True)
+    
     class Meta:
         model = User
-        fields = ('piraeus_customer_id', 'bank_consent_ids', 'preferred_sca_method')
-        read_only_fields = ('bank_consent_ids',)
+        fields = ('piraeus_customer_id', 'consents', 'preferred_sca_method')
         extra_kwargs = {
             'piraeus_customer_id': {'required': True, 'help_text': 'Your Piraeus Bank customer ID'},
             'preferred_sca_method': {'required': False, 'default': 'SMS'},
@@ -0,0 +1,83 @@
+"""
+Django management command to benchmark the bulk AIS fetcher offline.
+
+Usage: python manage.py benchmark_ais_fetch --users 2000
+
+Starts the local Piraeus stub server, points a pooled client at it and
+refreshes the given number of synthetic users through BulkAISFetcher,
+then reports throughput and latency percentiles.
+"""
+
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.piraeus.client import PiraeusClient
+from accounts.piraeus.fetcher import BulkAISFetcher, FetchJob
+from accounts.piraeus.stub_server import StubConfig, StubServer
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the bulk AIS fetcher against the local Piraeus stub server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=500, help='Number of synthetic users (default: 500)')
+        parser.add_argument('--concurrency', type=int, default=64, help='Global concurrency cap (default: 64)')
+        parser.add_argument('--per-host', type=int, default=32, help='Per-host concurrency cap (default: 32)')
+        parser.add_argument('--latency-ms', type=int, default=20, help='Stub latency per call (default: 20)')
+        parser.add_argument('--latency-jitter-ms', type=int, default=0,
+                            help='Mean of an exponential latency tail added per call (default: 0)')
+        parser.add_argument('--error-rate', type=float, default=0.0,
+                            help='Share of calls failing with a transient 501/440 (default: 0)')
+        parser.add_argument('--page-size', type=int, default=0,
+                            help='Booked transactions per page, 0 for no paging (default: 0)')
+        parser.add_argument('--days', type=int, default=90, help='Days of history per account (default: 90)')
+
+    def handle(self, *args, **options):
+        users = options['users']
+        per_host = options['per_host']
+
+        config = StubConfig(
+            latency_ms=options['latency_ms'],
+            latency_jitter_ms=options['latency_jitter_ms'],
+            error_rate=options['error_rate'],
+            page_size=options['page_size'],
+        )
+        with StubServer(config) as stub:
+            client = PiraeusClient(
+                api_base_url=stub.api_base_url, oauth_base_url=stub.oauth_base_url, pool_maxsize=per_host
+            )
+            fetcher = BulkAISFetcher(
+                client=client,
+                max_concurrency=options['concurrency'],
+                per_host_concurrency=per_host,
+                history_days=options['days'],
+            )
+            jobs = [FetchJob(key=f"user{i}", access_token='stub-token', consent_id=f"consent{i}") for i in range(users)]
+
+            self.stdout.write(f"🚀 Fetching {users} users from {stub.base_url} ...")
+            start = time.perf_counter()
+            results = fetcher.run(jobs)
+            elapsed = time.perf_counter() - start
+            client.close()
+            served = stub.stats
+
+        total_requests = sum(r.requests for r in results)
+        failed = sum(1 for r in results if not r.ok)
+        transactions = sum(
+            len(report['booked']) + len(report['pending'])
+            for r in results for report in r.transactions.values()
+        )
+        latencies = sorted(fetcher.latencies_ms)
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+
+        self.stdout.write("=" * 60)
+        self.stdout.write(f"👥 Users: {users} ({failed} with errors) in {elapsed:.2f}s")
+        self.stdout.write(f"📡 Requests: {total_requests} ({total_requests / elapsed:.0f}/s)")
+        self.stdout.write(
+            "🏦 Stub responses: " + ', '.join(f"{code}: {count}" for code, count in sorted(served.items()))
+        )
+        self.stdout.write(f"💳 Transactions: {transactions} ({transactions / elapsed:.0f}/s)")
+        self.stdout.write(f"⏱️  Call latency p50={quantiles[49]:.1f}ms p95={quantiles[94]:.1f}ms p99={quantiles[98]:.1f}ms")
+        self.stdout.write("=" * 60)
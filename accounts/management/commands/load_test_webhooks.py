@@ -0,0 +1,86 @@
+"""
+Django management command to load-test the webhook endpoint.
+
+Usage: python manage.py load_test_webhooks --url http://127.0.0.1:8000/api/bank/piraeus/webhook/ --events 5000
+
+Posts signed synthetic deliveries (a share of them redelivered duplicates)
+from a pool of keep-alive connections, then reports ingestion throughput and
+ack latency percentiles. The server must share PIRAEUS_WEBHOOK_SECRET.
+"""
+
+import json
+import statistics
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.piraeus.webhooks import SIGNATURE_HEADER, sign
+
+
+class Command(BaseCommand):
+    help = 'Load-test the Piraeus webhook endpoint and report throughput and ack latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000/api/bank/piraeus/webhook/',
+                            help='Webhook endpoint (default: local runserver)')
+        parser.add_argument('--events', type=int, default=2000, help='Deliveries to send (default: 2000)')
+        parser.add_argument('--concurrency', type=int, default=16, help='Concurrent senders (default: 16)')
+        parser.add_argument('--duplicates', type=float, default=0.1,
+                            help='Share of deliveries that repeat an earlier event id (default: 0.1)')
+        parser.add_argument('--consent-id', default='', help='consentId to put in the events (default: none)')
+
+    def handle(self, *args, **options):
+        secret = settings.PIRAEUS_WEBHOOK_SECRET
+        if not secret:
+            raise CommandError('Set PIRAEUS_WEBHOOK_SECRET (the same value as the server under test)')
+
+        events = options['events']
+        unique = max(int(events * (1 - options['duplicates'])), 1)
+        run_id = uuid.uuid4().hex[:8]
+        bodies = [
+            json.dumps({
+                'eventId': f"load-{run_id}-{i % unique}",
+                'eventType': 'transactions.created',
+                'consentId': options['consent_id'],
+                'createdAt': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            }).encode()
+            for i in range(events)
+        ]
+
+        session = requests.Session()
+        session.mount('http://', HTTPAdapter(pool_maxsize=options['concurrency']))
+        session.mount('https://', HTTPAdapter(pool_maxsize=options['concurrency']))
+
+        def deliver(body):
+            headers = {'Content-Type': 'application/json', SIGNATURE_HEADER: sign(body, secret)}
+            start = time.perf_counter()
+            try:
+                status_code = session.post(options['url'], data=body, headers=headers, timeout=10).status_code
+            except requests.RequestException:
+                status_code = 'error'
+            return status_code, (time.perf_counter() - start) * 1000
+
+        self.stdout.write(f"🚀 Sending {events} webhook(s) ({events - unique} duplicate(s)) to {options['url']} ...")
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            results = list(executor.map(deliver, bodies))
+        elapsed = time.perf_counter() - start
+        session.close()
+
+        statuses = Counter(status_code for status_code, _ in results)
+        latencies = sorted(latency for _, latency in results)
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+
+        self.stdout.write("=" * 60)
+        self.stdout.write(f"📨 Deliveries: {events} in {elapsed:.2f}s ({events / elapsed:.0f}/s)")
+        self.stdout.write("📬 Responses: " + ', '.join(f"{code}: {count}" for code, count in sorted(statuses.items(), key=str)))
+        self.stdout.write(f"⏱️  Ack latency p50={quantiles[49]:.1f}ms p95={quantiles[94]:.1f}ms p99={quantiles[98]:.1f}ms")
+        self.stdout.write("=" * 60)
+        if quantiles[98] > 500:
+            self.stdout.write(self.style.WARNING("⚠️  p99 ack latency is above the 500ms target"))
@@ -0,0 +1,54 @@
+"""
+Django management command to run the local Piraeus stand-in server.
+
+Usage: python manage.py run_piraeus_stub --port 8765 --latency-ms 50 --error-rate 0.02
+
+Serves the OAuth token endpoint and the PSD2 AIS paths with synthetic data
+until interrupted. Point the app at it with the printed base URLs.
+"""
+
+from django.core.management.base import BaseCommand
+
+from accounts.piraeus.stub_server import StubConfig, StubServer
+
+
+class Command(BaseCommand):
+    help = 'Run a local Piraeus OAuth/AIS stand-in server with synthetic data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='Interface to bind (default: 127.0.0.1)')
+        parser.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765)')
+        parser.add_argument('--latency-ms', type=int, default=0, help='Fixed latency per call (default: 0)')
+        parser.add_argument('--latency-jitter-ms', type=int, default=0,
+                            help='Mean of an exponential latency tail added per call (default: 0)')
+        parser.add_argument('--error-rate', type=float, default=0.0,
+                            help='Share of AIS calls answered with a transient 501/440 (default: 0)')
+        parser.add_argument('--page-size', type=int, default=0,
+                            help='Booked transactions per page, 0 for no paging (default: 0)')
+        parser.add_argument('--accounts', type=int, default=2, help='Accounts per consent (default: 2)')
+        parser.add_argument('--cards', type=int, default=1, help='Card accounts per consent (default: 1)')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic data (default: 0)')
+
+    def handle(self, *args, **options):
+        config = StubConfig(
+            latency_ms=options['latency_ms'],
+            latency_jitter_ms=options['latency_jitter_ms'],
+            error_rate=options['error_rate'],
+            page_size=options['page_size'],
+            accounts_per_consent=options['accounts'],
+            cards_per_consent=options['cards'],
+            seed=options['seed'],
+        )
+        stub = StubServer(config, host=options['host'], port=options['port'])
+
+        self.stdout.write(self.style.SUCCESS(f"🏦 Piraeus stub listening on {stub.base_url}"))
+        self.stdout.write(f"   PIRAEUS_API_BASE_URL={stub.api_base_url}")
+        self.stdout.write(f"   PIRAEUS_OAUTH_BASE_URL={stub.oauth_base_url}")
+        self.stdout.write("   Press Ctrl+C to stop")
+        try:
+            stub.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+        served = ', '.join(f"{code}: {count}" for code, count in sorted(stub.stats.items())) or 'none'
+        self.stdout.write(f"\n🛑 Stopped. Responses served: {served}")
@@ -0,0 +1,35 @@
+"""
+Django management command to run an incremental transaction sync.
+
+Usage: python manage.py sync_transactions --username usera
+
+Fetches only entries since each account's watermark and prints the delta
+per account.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.piraeus.exceptions import PiraeusError
+from accounts.piraeus.sync import TransactionSyncEngine
+
+
+class Command(BaseCommand):
+    help = 'Incrementally sync transactions for a user from Piraeus Bank'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', required=True, help='User whose accounts to sync')
+        parser.add_argument('--consent-id', help='AIS consent to use (default: the consent stored for the user)')
+
+    def handle(self, *args, **options):
+        username = options['username']
+        try:
+            batches = TransactionSyncEngine().sync_user(username, options['consent_id'])
+        except PiraeusError as e:
+            raise CommandError(f"Sync failed for {username}: {e}")
+
+        for batch in batches:
+            self.stdout.write(
+                f"💳 {batch.account_ref}: {len(batch.booked)} booked, {len(batch.pending)} pending, "
+                f"{len(batch.settled)} settled, {len(batch.dropped)} dropped ({batch.requests} call(s))"
+            )
+        self.stdout.write(self.style.SUCCESS(f"✅ Synced {len(batches)} account(s) for {username}"))
@@ -10,6 +10,7 @@ This command:
 3. Receives callback via local server
 4. Exchanges authorization code for access token
 5. Prints token information to console
+6. Optionally stores the token for a user (--username)
 """
 
 import os
@@ -20,12 +21,17 @@ import urllib.parse
 import http.server
 import socketserver
 import json
+from datetime import date
 from urllib.parse import urlparse, parse_qs
 
 import requests
 from django.core.management.base import BaseCommand
 from django.conf import settings
 
+from accounts.models import BankConsent, User
+from accounts.piraeus import get_client
+from accounts.piraeus.tokens import get_token_store
+
 
 class CallbackHandler(http.server.BaseHTTPRequestHandler):
     """HTTP handler for OAuth callback"""
@@ -127,6 +133,10 @@ class Command(BaseCommand):
             action='store_true',
             help='Test API calls after getting token (create consent and get accounts)'
         )
+        parser.add_argument(
+            '--username',
+            help='Store the received token for this user so sync workers can refresh and reuse it'
+        )
     
     def handle(self, *args, **options):
         """Main command handler"""
@@ -135,6 +145,7 @@ class Command(BaseCommand):
         timeout = options['timeout']
         no_browser = options['no_browser']
         test_api = options['test_api']
+        self.username = options['username']
         
         self.stdout.write("🚀 Starting Piraeus Bank OAuth Test")
         self.stdout.write(f"📍 Callback URL: {self.redirect_uri}")
@@ -200,7 +211,7 @@ class Command(BaseCommand):
             raise Exception("PIRAEUS_CLIENT_ID not found in settings. Check your .env file.")
         
         # Build OAuth authorization URL
-        base_url = "https://api.rapidlink.piraeusbank.gr/piraeusbank/production/v3/oauth/oauth2/authorize"
+        base_url = f"{settings.PIRAEUS_OAUTH_BASE_URL}/authorize"
         params = {
             'response_type': 'code',
             'client_id': client_id,
@@ -258,38 +269,22 @@ class Command(BaseCommand):
         self.stdout.write("🔄 Exchanging authorization code for access token...")
         
         # Get credentials from settings
-        client_id = settings.PIRAEUS_CLIENT_ID
         client_secret = getattr(settings, 'PIRAEUS_CLIENT_SECRET', None)
         
         if not client_secret:
             raise Exception("PIRAEUS_CLIENT_SECRET not found in settings. Check your .env file.")
         
-        # Token exchange endpoint
-        token_url = "https://api.rapidlink.piraeusbank.gr/piraeusbank/production/v3/oauth/oauth2/token"
-        
-        # Prepare token request
-        token_data = {
-            'grant_type': 'authorization_code',
-            'code': auth_code,
-            'client_id': client_id,
-            'client_secret': client_secret,
-            'redirect_uri': self.redirect_uri
-        }
-        
-        headers = {
-            'Content-Type': 'application/x-www-form-urlencoded',
-            'Accept': 'application/json'
-        }
-        
         try:
             # Make token request
-            response = requests.post(token_url, data=token_data, headers=headers, timeout=30)
+            response = get_client().exchange_code(auth_code, self.redirect_uri)
             
-            self.stdout.write(f"📡 Token request status: {response.status_code}")
+            self.stdout.write(f"📡 Token request status: {response.status_code} ({response.timing.duration_ms:.0f}ms)")
             
             if response.status_code == 200:
                 token_info = response.json()
                 self.display_token_info(token_info)
+                if self.username:
+                    self.store_token(token_info)
                 return token_info
             else:
                 self.stdout.write(self.style.ERROR(f"❌ Token exchange failed: {response.status_code}"))
@@ -343,6 +338,36 @@ class Command(BaseCommand):
         
         self.stdout.write("\\n✅ Test completed successfully!")
     
+    def store_consent(self, consent_response, consent_data):
+        """Record the AIS consent for --username so sync workers can use it"""
+        user = User.objects.filter(username=self.username).first()
+        if user is None:
+            return
+        
+        BankConsent.objects.update_or_create(
+            bank='piraeus',
+            consent_id=consent_response.get('consentId'),
+            defaults={
+                'user': user,
+                'service': 'ais',
+                'status': consent_response.get('consentStatus') or 'received',
+                'scopes': BankConsent.scopes_from_access(consent_data['access']),
+                'valid_until': date.fromisoformat(consent_data['validUntil']),
+                'frequency_per_day': consent_data['frequencyPerDay'],
+            },
+        )
+        self.stdout.write(f"💾 Consent stored for {user.username}")
+    
+    def store_token(self, token_info):
+        """Persist the token for --username in the token store"""
+        user = User.objects.filter(username=self.username).first()
+        if user is None:
+            self.stdout.write(self.style.ERROR(f"❌ User '{self.username}' not found - token not stored"))
+            return
+        
+        token = get_token_store().save(user, token_info)
+        self.stdout.write(self.style.SUCCESS(f"💾 Token stored for {user.username} (expires {token.expires_at:%H:%M:%S} UTC)"))
+    
     def cleanup(self):
         """Clean up resources"""
         if self.server:
@@ -369,22 +394,6 @@ class Command(BaseCommand):
         """Create PSD2 consent for account access"""
         self.stdout.write("\\n📝 Creating PSD2 Consent...")
         
-        # Generate request ID
-        import uuid
-        request_id = str(uuid.uuid4())
-        
-        # Get client ID from settings
-        client_id = settings.PIRAEUS_CLIENT_ID
-        
-        # Prepare headers
-        headers = {
-            'Authorization': f'Bearer {access_token}',
-            'X-Request-ID': request_id,
-            'x-ibm-client-id': client_id,
-            'Content-Type': 'application/json',
-            'Accept': 'application/json'
-        }
-        
         # Prepare consent data
         from datetime import datetime, timedelta
         valid_until = (datetime.now() + timedelta(days=90)).strftime('%Y-%m-%d')
@@ -401,18 +410,10 @@ class Command(BaseCommand):
             "combinedServiceIndicator": False
         }
         
-        consent_url = "https://api.rapidlink.piraeusbank.gr/piraeusbank/production/psd2/v3.1/consents"
-        
         try:
-            response = requests.post(
-                consent_url,
-                headers=headers,
-                json=consent_data,
-                cert=('certificate.crt', 'private.key'),
-                timeout=30
-            )
+            response = get_client().create_consent(access_token, consent_data)
             
-            self.stdout.write(f"📡 Consent creation status: {response.status_code}")
+            self.stdout.write(f"📡 Consent creation status: {response.status_code} ({response.timing.duration_ms:.0f}ms)")
             
             if response.status_code in [200, 201]:
                 consent_response = response.json()
@@ -423,6 +424,9 @@ class Command(BaseCommand):
                 self.stdout.write(f"🆔 Consent ID: {consent_id}")
                 self.stdout.write(f"📊 Status: {consent_status}")
                 
+                if self.username:
+                    self.store_consent(consent_response, consent_data)
+                
                 # Display full response for debugging
                 self.stdout.write("\\nConsent Response:")
                 for key, value in consent_response.items():
@@ -449,36 +453,10 @@ class Command(BaseCommand):
         """Get user accounts after consent is created"""
         self.stdout.write("\\n🏦 Getting User Accounts...")
         
-        # Generate request ID
-        import uuid
-        request_id = str(uuid.uuid4())
-        
-        # Get client ID from settings
-        client_id = settings.PIRAEUS_CLIENT_ID
-        
-        # Prepare headers
-        headers = {
-            'Authorization': f'Bearer {access_token}',
-            'X-Request-ID': request_id,
-            'x-ibm-client-id': client_id,
-            'Accept': 'application/json'
-        }
-        
-        # Add Consent-ID header if provided
-        if consent_id:
-            headers['Consent-ID'] = consent_id
-        
-        accounts_url = "https://api.rapidlink.piraeusbank.gr/piraeusbank/production/psd2/v3.1/accounts"
-        
         try:
-            response = requests.get(
-                accounts_url,
-                headers=headers,
-                cert=('certificate.crt', 'private.key'),
-                timeout=30
-            )
+            response = get_client().get_accounts(access_token, consent_id)
             
-            self.stdout.write(f"📡 Accounts request status: {response.status_code}")
+            self.stdout.write(f"📡 Accounts request status: {response.status_code} ({response.timing.duration_ms:.0f}ms)")
             
             if response.status_code == 200:
                 accounts_data = response.json()
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.3 on 2026-10-18 06:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_banktoken'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('account_ref', models.CharField(max_length=64)),
+                ('resource_id', models.CharField(blank=True, max_length=100)),
+                ('last_booking_date', models.DateField(blank=True, null=True)),
+                ('last_entry_reference', models.CharField(blank=True, max_length=100)),
+                ('recent_fingerprints', models.JSONField(default=dict)),
+                ('pending_entries', models.JSONField(default=dict)),
+                ('last_synced_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='account_sync_states', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'account_ref'), name='unique_account_sync_state')],
+            },
+        ),
+    ]
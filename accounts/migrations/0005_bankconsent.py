@@ -0,0 +1,87 @@
+# Generated by Django 5.2.3 on 2026-10-18 07:06
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.utils.dateparse import parse_date, parse_datetime
+
+STATUSES = {'initiated', 'received', 'valid', 'rejected', 'revoked', 'expired', 'terminated'}
+
+
+def copy_consents(apps, schema_editor):
+    """Move each entry of User.bank_consent_ids into its own BankConsent row."""
+    User = apps.get_model('accounts', 'User')
+    BankConsent = apps.get_model('accounts', 'BankConsent')
+    consents = []
+    for user_id, stored in User.objects.exclude(bank_consent_ids={}).values_list('pk', 'bank_consent_ids').iterator():
+        for service, info in (stored or {}).items():
+            if not isinstance(info, dict):
+                continue
+            status = info.get('status') or 'received'
+            valid_until = info.get('valid_until')
+            timestamp = parse_datetime(info['timestamp']) if info.get('timestamp') else None
+            consents.append(BankConsent(
+                user_id=user_id,
+                service=service[:20],
+                consent_id=info.get('consent_id') or '',
+                status=status if status in STATUSES else 'received',
+                valid_until=parse_date(valid_until[:10]) if valid_until else None,
+                frequency_per_day=info.get('frequency_per_day'),
+                created_at=timestamp or django.utils.timezone.now(),
+            ))
+    BankConsent.objects.bulk_create(consents, batch_size=1000, ignore_conflicts=True)
+
+
+def restore_consents(apps, schema_editor):
+    """Rebuild bank_consent_ids from the latest consent per service."""
+    User = apps.get_model('accounts', 'User')
+    BankConsent = apps.get_model('accounts', 'BankConsent')
+    stored = {}
+    for consent in BankConsent.objects.order_by('created_at').iterator():
+        stored.setdefault(consent.user_id, {})[consent.service] = {
+            'consent_id': consent.consent_id,
+            'status': consent.status,
+            'valid_until': consent.valid_until.isoformat() if consent.valid_until else None,
+            'frequency_per_day': consent.frequency_per_day,
+            'timestamp': str(consent.created_at),
+        }
+    for user_id, consents in stored.items():
+        User.objects.filter(pk=user_id).update(bank_consent_ids=consents)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_webhookevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankConsent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bank', models.CharField(default='piraeus', max_length=20)),
+                ('service', models.CharField(choices=[('ais', 'Account information'), ('pis', 'Payment initiation'), ('account_linking', 'Account linking')], max_length=20)),
+                ('consent_id', models.CharField(blank=True, max_length=100)),
+                ('status', models.CharField(choices=[('initiated', 'Initiated'), ('received', 'Received'), ('valid', 'Valid'), ('rejected', 'Rejected'), ('revoked', 'Revoked by PSU'), ('expired', 'Expired'), ('terminated', 'Terminated by SmartCash')], default='received', max_length=20)),
+                ('scopes', models.JSONField(default=list)),
+                ('valid_until', models.DateField(blank=True, null=True)),
+                ('frequency_per_day', models.PositiveIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bank_consents', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Bank consent',
+                'verbose_name_plural': 'Bank consents',
+                'indexes': [models.Index(fields=['user', 'service', 'status'], name='bank_consent_user_idx'), models.Index(fields=['status', 'valid_until'], name='bank_consent_status_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('consent_id', ''), _negated=True), fields=('bank', 'consent_id'), name='unique_bank_consent_id')],
+            },
+        ),
+        migrations.RunPython(copy_consents, restore_consents),
+        migrations.RemoveField(
+            model_name='user',
+            name='bank_consent_ids',
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.3 on 2026-10-18 07:41
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def date_failed_attempts(apps, schema_editor):
+    """Failed events are retried by claimed_at; date the ones failed so far by their receipt."""
+    WebhookEvent = apps.get_model('accounts', 'WebhookEvent')
+    WebhookEvent.objects.filter(status='failed', claimed_at__isnull=True).update(claimed_at=F('received_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_user_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webhookevent',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='webhookevent',
+            name='status',
+            field=models.CharField(choices=[('received', 'Received'), ('processing', 'Processing'), ('processed', 'Processed'), ('failed', 'Failed'), ('dead', 'Dead')], default='received', max_length=20),
+        ),
+        migrations.RunPython(date_failed_attempts, migrations.RunPython.noop),
+    ]
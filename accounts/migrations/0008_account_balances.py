@@ -0,0 +1,39 @@
+# Generated by Django 5.2.3 on 2026-10-18 08:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_webhook_claims'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accountsyncstate',
+            name='balance_currency',
+            field=models.CharField(blank=True, default='', max_length=3),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='accountsyncstate',
+            name='booked_balance',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=16, null=True),
+        ),
+        migrations.AddField(
+            model_name='accountsyncstate',
+            name='available_balance',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=16, null=True),
+        ),
+        migrations.AddField(
+            model_name='accountsyncstate',
+            name='balance_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='accountsyncstate',
+            name='balances_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
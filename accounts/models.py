@@ -1,3 +1,5 @@
+from datetime import timedelta
+
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 from django.db import models
 from django.utils import timezone
@@ -49,9 +51,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     postal_code = models.CharField(max_length=20, blank=True)
     country = models.CharField(max_length=2, blank=True)  # ISO country code
     
-    # Bank integration
+    # Bank integration (consents live in BankConsent)
     piraeus_customer_id = models.CharField(max_length=100, blank=True, null=True)
-    bank_consent_ids = models.JSONField(default=dict)  # Store active consents
     preferred_sca_method = models.CharField(max_length=20, default='SMS')
     
     # Security
@@ -69,6 +70,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_staff = models.BooleanField(default=False)
     date_joined = models.DateTimeField(default=timezone.now)
     last_login = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)  # version of the profile endpoints' ETags
     
     objects = UserManager()
     
@@ -76,6 +78,12 @@ class User(AbstractBaseUser, PermissionsMixin):
     EMAIL_FIELD = 'email'
     REQUIRED_FIELDS = ['email', 'first_name', 'last_name']
     
+    # Columns per-request user loads skip; they are fetched on demand (see load_deferred_fields)
+    RARELY_USED_FIELDS = (
+        'password', 'date_of_birth', 'phone_number', 'address_line1', 'address_line2',
+        'city', 'postal_code', 'country', 'failed_login_attempts', 'account_locked_until',
+    )
+    
     class Meta:
         db_table = 'auth_user'
         verbose_name = 'User'
@@ -89,3 +97,160 @@ class User(AbstractBaseUser, PermissionsMixin):
     
     def get_short_name(self):
         return self.first_name
+    
+    def load_deferred_fields(self):
+        """Fetch every deferred column in one query instead of one query per attribute access."""
+        deferred = self.get_deferred_fields()
+        if deferred:
+            self.refresh_from_db(fields=deferred)
+
+
+class BankToken(models.Model):
+    """OAuth tokens issued by Piraeus Bank for a user."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='bank_token')
+    access_token = models.TextField()
+    refresh_token = models.TextField(blank=True)
+    token_type = models.CharField(max_length=20, default='Bearer')
+    scope = models.CharField(max_length=255, blank=True)
+    expires_at = models.DateTimeField(db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Bank token'
+        verbose_name_plural = 'Bank tokens'
+    
+    def __str__(self):
+        return f"Bank token for {self.user_id}"
+    
+    def expires_within(self, seconds):
+        """True if the access token expires in less than ``seconds``."""
+        return self.expires_at <= timezone.now() + timedelta(seconds=seconds)
+
+
+class BankConsentQuerySet(models.QuerySet):
+    def active(self):
+        """Consents the bank will currently honour."""
+        today = timezone.localdate()
+        return self.filter(status='valid').filter(models.Q(valid_until__isnull=True) | models.Q(valid_until__gte=today))
+    
+    def current(self, user_id, service='ais'):
+        """The user's most recent active consent for a service, or None."""
+        return self.active().filter(user_id=user_id, service=service).order_by('-created_at').first()
+
+
+class BankConsent(models.Model):
+    """A PSD2 consent the user granted SmartCash at their bank, kept as history."""
+    SERVICE_CHOICES = [
+        ('ais', 'Account information'),
+        ('pis', 'Payment initiation'),
+        ('account_linking', 'Account linking'),
+    ]
+    STATUS_CHOICES = [
+        ('initiated', 'Initiated'),
+        ('received', 'Received'),
+        ('valid', 'Valid'),
+        ('rejected', 'Rejected'),
+        ('revoked', 'Revoked by PSU'),
+        ('expired', 'Expired'),
+        ('terminated', 'Terminated by SmartCash'),
+    ]
+    FINAL_STATUSES = ('rejected', 'revoked', 'expired', 'terminated')
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='bank_consents')
+    bank = models.CharField(max_length=20, default='piraeus')
+    service = models.CharField(max_length=20, choices=SERVICE_CHOICES)
+    consent_id = models.CharField(max_length=100, blank=True)  # issued by the bank; blank until then
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='received')
+    scopes = models.JSONField(default=list)  # e.g. ['accounts', 'balances', 'transactions'] or ['allPsd2']
+    valid_until = models.DateField(null=True, blank=True)
+    frequency_per_day = models.PositiveIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    objects = BankConsentQuerySet.as_manager()
+    
+    class Meta:
+        verbose_name = 'Bank consent'
+        verbose_name_plural = 'Bank consents'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['bank', 'consent_id'], condition=~models.Q(consent_id=''), name='unique_bank_consent_id',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'service', 'status'], name='bank_consent_user_idx'),
+            models.Index(fields=['status', 'valid_until'], name='bank_consent_status_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} {self.service} {self.consent_id or '-'} ({self.status})"
+    
+    @staticmethod
+    def scopes_from_access(access):
+        """Flatten a PSD2 ``access`` block into the list of granted scopes."""
+        if access.get('allPsd2'):
+            return ['allPsd2']
+        return sorted(key for key in ('accounts', 'balances', 'transactions') if key in access)
+
+
+class AccountSyncState(models.Model):
+    """Per-account watermark for incremental transaction sync.
+    
+    Keyed by the account's IBAN (or masked PAN), since AIS resource ids change
+    with every new consent. Also keeps the balances the bank last reported,
+    which anchor everything SmartCash derives about how much is in the account.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='account_sync_states')
+    account_ref = models.CharField(max_length=64)
+    resource_id = models.CharField(max_length=100, blank=True)
+    last_booking_date = models.DateField(null=True, blank=True)
+    last_entry_reference = models.CharField(max_length=100, blank=True)
+    recent_fingerprints = models.JSONField(default=dict)  # transactionId -> content hash, overlap window only
+    pending_entries = models.JSONField(default=dict)  # pending transactionId -> match key
+    last_synced_at = models.DateTimeField(null=True, blank=True)
+    
+    # Balances the bank reported at the last sync (null until it reported any)
+    balance_currency = models.CharField(max_length=3, blank=True)
+    booked_balance = models.DecimalField(max_digits=16, decimal_places=2, null=True, blank=True)  # interimBooked
+    available_balance = models.DecimalField(max_digits=16, decimal_places=2, null=True, blank=True)  # interimAvailable
+    balance_date = models.DateField(null=True, blank=True)  # bank-local day the balances refer to
+    balances_updated_at = models.DateTimeField(null=True, blank=True)  # when they last changed
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'account_ref'], name='unique_account_sync_state'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id}:{self.account_ref}"
+
+
+class WebhookEvent(models.Model):
+    """Raw webhook delivery, stored on receipt and processed in the background.
+    
+    ``event_id`` is unique, so redelivered events are acknowledged without
+    being stored or processed twice. A worker claims an event by moving it to
+    ``processing``; failed events are retried until ``PIRAEUS_WEBHOOK_MAX_ATTEMPTS``,
+    then left ``dead``.
+    """
+    STATUS_CHOICES = [
+        ('received', 'Received'),
+        ('processing', 'Processing'),
+        ('processed', 'Processed'),
+        ('failed', 'Failed'),
+        ('dead', 'Dead'),
+    ]
+    
+    event_id = models.CharField(max_length=100, unique=True)
+    event_type = models.CharField(max_length=50)
+    consent_id = models.CharField(max_length=100, blank=True)
+    payload = models.JSONField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='received')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    received_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)  # start of the latest attempt
+    processed_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.event_type} {self.event_id}"
@@ -0,0 +1 @@
+from .client import PiraeusClient, get_client
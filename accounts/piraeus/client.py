@@ -0,0 +1,302 @@
+"""
+Shared HTTP client for the Piraeus Bank OAuth and PSD2 AIS APIs.
+
+One client is kept per process (see ``get_client``). It holds a keep-alive
+``requests.Session`` per host, so repeated calls reuse TCP/TLS connections
+instead of handshaking every time, and it loads the mTLS client certificate
+into an SSL context exactly once.
+"""
+
+import logging
+import ssl
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+from .ratelimit import get_rate_limiter
+from .resilience import CircuitBreakerRegistry, RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CallTiming:
+    """Wall-clock timing of a single call to the bank."""
+    method: str
+    host: str
+    path: str
+    status_code: int | None
+    duration_ms: float
+
+
+class ClientCertAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools share a pre-built SSL context."""
+
+    def __init__(self, ssl_context=None, **kwargs):
+        self.ssl_context = ssl_context
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        if self.ssl_context is not None:
+            pool_kwargs['ssl_context'] = self.ssl_context
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+
+
+class PiraeusClient:
+    """Pooled client for the Piraeus OAuth and AIS endpoints."""
+
+    def __init__(self, client_id=None, client_secret=None, api_base_url=None, oauth_base_url=None,
+                 cert_file=None, key_file=None, pool_connections=None, pool_maxsize=None, timeout=None,
+                 rate_limiter=None, retry_policy=None, breakers=None):
+        self.client_id = client_id or settings.PIRAEUS_CLIENT_ID
+        self.client_secret = client_secret or settings.PIRAEUS_CLIENT_SECRET
+        self.api_base_url = (api_base_url or settings.PIRAEUS_API_BASE_URL).rstrip('/')
+        self.oauth_base_url = (oauth_base_url or settings.PIRAEUS_OAUTH_BASE_URL).rstrip('/')
+        self.cert_file = cert_file or settings.PIRAEUS_CERT_FILE
+        self.key_file = key_file or settings.PIRAEUS_KEY_FILE
+        self.pool_connections = pool_connections or settings.PIRAEUS_POOL_CONNECTIONS
+        self.pool_maxsize = pool_maxsize or settings.PIRAEUS_POOL_MAXSIZE
+        self.timeout = timeout or (settings.PIRAEUS_CONNECT_TIMEOUT, settings.PIRAEUS_TIMEOUT)
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breakers = breakers or CircuitBreakerRegistry()
+
+        self.timings = deque(maxlen=1000)
+        self._sessions = {}
+        self._ssl_context = None
+        self._lock = threading.Lock()
+
+    # Connection management
+
+    def _client_ssl_context(self):
+        """Build the SSL context with the client certificate, once."""
+        if self._ssl_context is None:
+            context = ssl.create_default_context()
+            context.load_cert_chain(self.cert_file, self.key_file)
+            self._ssl_context = context
+        return self._ssl_context
+
+    def _session_for(self, url, mtls):
+        """Return the keep-alive session for the URL's host, creating it on first use."""
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc, mtls)
+        session = self._sessions.get(key)
+        if session is not None:
+            return session
+
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                ssl_context = self._client_ssl_context() if mtls and parts.scheme == 'https' else None
+                adapter = ClientCertAdapter(
+                    ssl_context=ssl_context,
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                )
+                session = requests.Session()
+                session.mount(f"{parts.scheme}://", adapter)
+                self._sessions[key] = session
+        return session
+
+    def close(self):
+        """Close all pooled connections."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    # Core request
+
+    def request(self, method, url, mtls=True, ais=False, consent_id=None, **kwargs):
+        """Send a request through the pooled session, with retries and circuit breaking.
+
+        Transient failures of idempotent calls are retried with jittered
+        backoff; each attempt of an ``ais`` call is charged to the request
+        budgets. The returned ``requests.Response`` carries a ``timing``
+        attribute. Raises ``CircuitOpenError`` while the endpoint's breaker is
+        open and ``RateLimitExceeded`` when a budget is spent.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        breaker = self.breakers.for_call(method, url)
+        attempts = self.retry_policy.attempts_for(method)
+
+        for attempt in range(1, attempts + 1):
+            breaker.before_call()
+            response, error = None, None
+            try:
+                if ais and self.rate_limiter is not None:
+                    self.rate_limiter.acquire(consent_id)
+                response = self._send(method, url, mtls, **kwargs)
+            except requests.exceptions.SSLError:
+                # Certificate problems are ours, not the bank's
+                breaker.release()
+                raise
+            except (requests.ConnectionError, requests.Timeout) as e:
+                breaker.record_failure()
+                error = e
+            except BaseException:
+                breaker.release()
+                raise
+            else:
+                if response.status_code not in self.retry_policy.status_codes:
+                    breaker.record_success()
+                    if ais and response.status_code == 429 and consent_id and self.rate_limiter is not None:
+                        # The bank counts differently than we do; trust it for the rest of the day
+                        self.rate_limiter.exhaust(consent_id)
+                    return response
+                breaker.record_failure()
+
+            # Out of attempts, or the failure just opened the circuit: report what the bank did
+            if attempt == attempts or breaker.state == breaker.OPEN:
+                if error is not None:
+                    raise error
+                return response
+
+            delay = self.retry_policy.delay(attempt, response)
+            logger.info(
+                "Retrying %s %s in %.2fs (attempt %d/%d)", method, urlsplit(url).path, delay, attempt + 1, attempts
+            )
+            time.sleep(delay)
+
+    def _send(self, method, url, mtls, **kwargs):
+        """One attempt over the pooled session, timed."""
+        session = self._session_for(url, mtls)
+        parts = urlsplit(url)
+
+        status_code = None
+        start = time.perf_counter()
+        try:
+            response = session.request(method, url, **kwargs)
+            status_code = response.status_code
+        finally:
+            timing = CallTiming(
+                method=method,
+                host=parts.netloc,
+                path=parts.path,
+                status_code=status_code,
+                duration_ms=(time.perf_counter() - start) * 1000,
+            )
+            self.timings.append(timing)
+            logger.debug("Piraeus %s %s -> %s in %.1fms", method, parts.path, status_code, timing.duration_ms)
+
+        response.timing = timing
+        return response
+
+    def ais_request(self, method, url, access_token, consent_id=None, **kwargs):
+        """Send an AIS call, charging it to the consent's and the client's request budgets."""
+        if 'headers' not in kwargs:
+            kwargs['headers'] = self.ais_headers(access_token, consent_id)
+        return self.request(method, url, ais=True, consent_id=consent_id, **kwargs)
+
+    def ais_headers(self, access_token, consent_id=None):
+        """Headers required by every PSD2 AIS call."""
+        headers = {
+            'Authorization': f'Bearer {access_token}',
+            'X-Request-ID': str(uuid.uuid4()),
+            'x-ibm-client-id': self.client_id,
+            'Accept': 'application/json',
+        }
+        if consent_id:
+            headers['Consent-ID'] = consent_id
+        return headers
+
+    # OAuth
+
+    def exchange_code(self, auth_code, redirect_uri):
+        """Exchange an authorization code for an access token."""
+        return self.request(
+            'POST',
+            f"{self.oauth_base_url}/token",
+            mtls=False,
+            data={
+                'grant_type': 'authorization_code',
+                'code': auth_code,
+                'client_id': self.client_id,
+                'client_secret': self.client_secret,
+                'redirect_uri': redirect_uri,
+            },
+            headers={
+                'Content-Type': 'application/x-www-form-urlencoded',
+                'Accept': 'application/json',
+            },
+        )
+
+    def refresh_access_token(self, refresh_token):
+        """Obtain a new access token with an ``offline_access`` refresh token."""
+        return self.request(
+            'POST',
+            f"{self.oauth_base_url}/token",
+            mtls=False,
+            data={
+                'grant_type': 'refresh_token',
+                'refresh_token': refresh_token,
+                'client_id': self.client_id,
+                'client_secret': self.client_secret,
+            },
+            headers={
+                'Content-Type': 'application/x-www-form-urlencoded',
+                'Accept': 'application/json',
+            },
+        )
+
+    # AIS
+
+    def create_consent(self, access_token, consent_data):
+        """Create a PSD2 AIS consent."""
+        headers = self.ais_headers(access_token)
+        headers['Content-Type'] = 'application/json'
+        return self.ais_request('POST', f"{self.api_base_url}/consents", access_token, headers=headers, json=consent_data)
+
+    def get_accounts(self, access_token, consent_id=None):
+        """List the accounts covered by a consent."""
+        return self.ais_request('GET', f"{self.api_base_url}/accounts", access_token, consent_id)
+
+    def get_balances(self, access_token, consent_id, account_id):
+        """Read the balances of one account."""
+        return self.ais_request('GET', f"{self.api_base_url}/accounts/{account_id}/balances", access_token, consent_id)
+
+    def get_transactions(self, access_token, consent_id, account_id, params=None, url=None):
+        """Read one page of an account's transactions.
+
+        Pass ``url`` to follow a ``_links.next`` href from a previous page.
+        """
+        if url is None:
+            url = f"{self.api_base_url}/accounts/{account_id}/transactions"
+        return self.ais_request('GET', url, access_token, consent_id, params=params)
+
+    def get_card_accounts(self, access_token, consent_id=None):
+        """List the card accounts covered by a consent."""
+        return self.ais_request('GET', f"{self.api_base_url}/card-accounts", access_token, consent_id)
+
+    def get_card_balances(self, access_token, consent_id, account_id):
+        """Read the balances of one card account."""
+        return self.ais_request(
+            'GET', f"{self.api_base_url}/card-accounts/{account_id}/balances", access_token, consent_id
+        )
+
+    def get_card_transactions(self, access_token, consent_id, account_id, params=None, url=None):
+        """Read one page of a card account's transactions (``cardTransactions`` in the body)."""
+        if url is None:
+            url = f"{self.api_base_url}/card-accounts/{account_id}/transactions"
+        return self.ais_request('GET', url, access_token, consent_id, params=params)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide ``PiraeusClient``."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = PiraeusClient(rate_limiter=get_rate_limiter())
+    return _client
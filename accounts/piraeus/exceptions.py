@@ -0,0 +1,37 @@
+class PiraeusError(Exception):
+    """Base class for errors raised by the Piraeus integration."""
+
+
+class PiraeusConnectionError(PiraeusError):
+    """The bank could not be reached (connection error, TLS failure or timeout)."""
+
+
+class PiraeusAPIError(PiraeusError):
+    """The bank answered with a non-success status code."""
+
+    def __init__(self, status_code, error_code=None, message='', url=''):
+        self.status_code = status_code
+        self.error_code = error_code
+        self.message = message
+        self.url = url
+        super().__init__(f"{status_code} {error_code or ''} {message}".strip())
+
+    @classmethod
+    def from_response(cls, response):
+        """Build the error from a response, using the documented error body when present."""
+        error_code, message = None, response.text[:500]
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        if isinstance(body, dict):
+            error_code = body.get('error')
+            message = body.get('message', message)
+        return cls(response.status_code, error_code, message, response.url)
+
+
+def raise_for_error(response):
+    """Return the decoded JSON body, or raise ``PiraeusAPIError`` for non-2xx responses."""
+    if not 200 <= response.status_code < 300:
+        raise PiraeusAPIError.from_response(response)
+    return response.json()
@@ -0,0 +1,168 @@
+"""
+Asyncio fan-out of AIS reads for many linked users at once.
+
+Each user's ``/accounts`` call is followed by concurrent ``/balances`` and
+``/transactions`` calls (following ``_links.next`` pages) for every account.
+The blocking calls run on the shared pooled ``PiraeusClient`` in a thread
+pool, so they keep reusing its keep-alive connections. Concurrency is bounded
+by a global cap and a per-host cap; keep ``PIRAEUS_POOL_MAXSIZE`` at least as
+large as the per-host cap so no call waits on, or discards, a pooled
+connection.
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from urllib.parse import urljoin, urlsplit
+
+import requests
+from django.conf import settings
+
+from .client import get_client
+from .exceptions import PiraeusConnectionError, PiraeusError, raise_for_error
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FetchJob:
+    """One user's AIS refresh."""
+    key: str
+    access_token: str
+    consent_id: str
+    date_from: date | None = None
+    date_to: date | None = None
+    booking_status: str = 'both'
+
+
+@dataclass
+class FetchResult:
+    """Everything fetched for one ``FetchJob``."""
+    key: str
+    accounts: list = field(default_factory=list)
+    balances: dict = field(default_factory=dict)
+    transactions: dict = field(default_factory=dict)
+    errors: list = field(default_factory=list)
+    requests: int = 0
+    duration_ms: float = 0.0
+
+    @property
+    def ok(self):
+        return not self.errors
+
+
+class BulkAISFetcher:
+    """Fetch accounts, balances and transactions for many users concurrently."""
+
+    def __init__(self, client=None, max_concurrency=None, per_host_concurrency=None, history_days=90):
+        self.client = client or get_client()
+        self.max_concurrency = max_concurrency or settings.PIRAEUS_FETCH_CONCURRENCY
+        self.per_host_concurrency = per_host_concurrency or settings.PIRAEUS_FETCH_PER_HOST_CONCURRENCY
+        self.history_days = history_days
+        self.latencies_ms = []
+        self._api_host = urlsplit(self.client.api_base_url).netloc
+        self._global = None
+        self._hosts = {}
+
+    def run(self, jobs, on_result=None):
+        """Blocking entry point for management commands and Celery tasks."""
+        return asyncio.run(self.fetch_all(jobs, on_result=on_result))
+
+    async def fetch_all(self, jobs, on_result=None):
+        """Fetch every job. Results are passed to ``on_result`` as they finish if given, else returned."""
+        self._global = asyncio.Semaphore(self.max_concurrency)
+        self._hosts = {}
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='ais-fetch')
+        try:
+            tasks = [asyncio.ensure_future(self.fetch_user(job, executor)) for job in jobs]
+            results = []
+            for future in asyncio.as_completed(tasks):
+                result = await future
+                if on_result is not None:
+                    on_result(result)
+                else:
+                    results.append(result)
+            return results
+        finally:
+            executor.shutdown(wait=False)
+
+    async def fetch_user(self, job, executor):
+        result = FetchResult(key=job.key)
+        start = time.perf_counter()
+        try:
+            body = await self._call(
+                executor, result, self._api_host, self.client.get_accounts, job.access_token, job.consent_id
+            )
+            result.accounts = body.get('accounts', [])
+        except PiraeusError as e:
+            result.errors.append(('accounts', None, e))
+        else:
+            await asyncio.gather(*(
+                self._fetch_account(job, executor, result, account['resourceId'])
+                for account in result.accounts if account.get('resourceId')
+            ))
+        result.duration_ms = (time.perf_counter() - start) * 1000
+        return result
+
+    async def _fetch_account(self, job, executor, result, account_id):
+        await asyncio.gather(
+            self._fetch_balances(job, executor, result, account_id),
+            self._fetch_transactions(job, executor, result, account_id),
+        )
+
+    async def _fetch_balances(self, job, executor, result, account_id):
+        try:
+            body = await self._call(
+                executor, result, self._api_host,
+                self.client.get_balances, job.access_token, job.consent_id, account_id,
+            )
+            result.balances[account_id] = body.get('balances', [])
+        except PiraeusError as e:
+            result.errors.append(('balances', account_id, e))
+
+    async def _fetch_transactions(self, job, executor, result, account_id):
+        date_to = job.date_to or date.today()
+        date_from = job.date_from or date_to - timedelta(days=self.history_days)
+        params = {
+            'bookingStatus': job.booking_status,
+            'dateFrom': date_from.isoformat(),
+            'dateTo': date_to.isoformat(),
+        }
+        booked, pending = [], []
+        url = None
+        try:
+            while True:
+                body = await self._call(
+                    executor, result, urlsplit(url).netloc if url else self._api_host,
+                    self.client.get_transactions, job.access_token, job.consent_id, account_id,
+                    None if url else params, url,
+                )
+                report = body.get('transactions', {})
+                booked.extend(report.get('booked', []))
+                pending.extend(report.get('pending', []))
+                next_link = report.get('_links', {}).get('next')
+                if not next_link:
+                    break
+                url = urljoin(self.client.api_base_url + '/', next_link['href'])
+        except PiraeusError as e:
+            result.errors.append(('transactions', account_id, e))
+        result.transactions[account_id] = {'booked': booked, 'pending': pending}
+
+    async def _call(self, executor, result, host, fn, *args):
+        """Run one blocking client call under the global and per-host caps."""
+        host_semaphore = self._hosts.get(host)
+        if host_semaphore is None:
+            host_semaphore = self._hosts[host] = asyncio.Semaphore(self.per_host_concurrency)
+
+        async with host_semaphore, self._global:
+            loop = asyncio.get_running_loop()
+            try:
+                response = await loop.run_in_executor(executor, fn, *args)
+            except requests.RequestException as e:
+                raise PiraeusConnectionError(str(e)) from e
+        result.requests += 1
+        self.latencies_ms.append(response.timing.duration_ms)
+        return raise_for_error(response)
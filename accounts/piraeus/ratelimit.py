@@ -0,0 +1,234 @@
+"""
+Request budgets for the Piraeus AIS API.
+
+Two budgets guard every AIS call:
+
+* per consent: ``frequencyPerDay`` calls per (Athens) calendar day, which is
+  how the bank counts unattended access against a consent;
+* per client id: an optional calls-per-second ceiling for the whole app.
+
+Both are fixed-window counters, not token buckets: a counter is stored per
+window in the Django cache, so all workers share it (``cache.incr`` is atomic
+on Redis and Memcached), and starts again from zero when the next window
+begins. For the consent budget the window is the bank's own calendar day.
+For the client rate a burst straddling a second boundary can reach twice the
+ceiling within one second; calls over it wait for the next window (up to
+``PIRAEUS_CLIENT_RATE_MAX_WAIT`` seconds) rather than fail, so a multi-account
+sync is slowed down instead of aborted halfway. ``LocalBudgetBackend`` keeps
+the same counters in process memory for tests and offline benchmarks.
+
+A consent's daily capacity is the ``frequency_per_day`` the bank granted it
+(``BankConsent``), falling back to ``PIRAEUS_CONSENT_FREQUENCY_PER_DAY``.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.core.cache import caches
+
+from accounts.models import BankConsent
+from .exceptions import PiraeusError
+
+CAPACITY_TTL = 15 * 60  # seconds a consent's looked-up frequencyPerDay is reused
+
+
+class RateLimitExceeded(PiraeusError):
+    """A request budget is exhausted for the current window."""
+
+    def __init__(self, scope, key, retry_after):
+        self.scope = scope
+        self.key = key
+        self.retry_after = retry_after
+        super().__init__(f"{scope} budget exhausted for {key}; retry in {retry_after:.0f}s")
+
+
+@dataclass(frozen=True)
+class Bucket:
+    """A budget of ``capacity`` calls per fixed window of ``period`` seconds."""
+    scope: str
+    capacity: int
+    period: int
+
+    def window(self, now=None):
+        """Index of the current window and seconds until it ends, in bank local time."""
+        now = time.time() if now is None else now
+        offset = datetime.fromtimestamp(now, ZoneInfo(settings.PIRAEUS_TIMEZONE)).utcoffset().total_seconds()
+        local = now + offset
+        index = int(local // self.period)
+        return index, (index + 1) * self.period - local
+
+
+class CacheBudgetBackend:
+    """Budget counters shared through a Django cache alias."""
+
+    def __init__(self, alias='default'):
+        self.cache = caches[alias]
+
+    def consume(self, key, amount, capacity, ttl):
+        """Add ``amount`` to the counter unless that would exceed ``capacity``. Returns success."""
+        self.cache.add(key, 0, timeout=ttl)
+        try:
+            used = self.cache.incr(key, amount)
+        except ValueError:
+            # Expired between add() and incr(); start a fresh window
+            self.cache.add(key, 0, timeout=ttl)
+            used = self.cache.incr(key, amount)
+        if used > capacity:
+            self.cache.decr(key, amount)
+            return False
+        return True
+
+    def refund(self, key, amount):
+        try:
+            self.cache.decr(key, amount)
+        except ValueError:
+            pass
+
+    def set_used(self, key, used, ttl):
+        self.cache.set(key, used, timeout=ttl)
+
+    def used_many(self, keys):
+        values = self.cache.get_many(keys)
+        return {key: values.get(key, 0) for key in keys}
+
+
+class LocalBudgetBackend:
+    """In-process stand-in for ``CacheBudgetBackend``."""
+
+    def __init__(self):
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key):
+        used, expires = self._counters.get(key, (0, 0))
+        return used if expires > time.monotonic() else 0
+
+    def consume(self, key, amount, capacity, ttl):
+        with self._lock:
+            used = self._live(key) + amount
+            if used > capacity:
+                return False
+            self._counters[key] = (used, time.monotonic() + ttl)
+            return True
+
+    def refund(self, key, amount):
+        with self._lock:
+            used, expires = self._counters.get(key, (0, 0))
+            self._counters[key] = (max(used - amount, 0), expires)
+
+    def set_used(self, key, used, ttl):
+        with self._lock:
+            self._counters[key] = (used, time.monotonic() + ttl)
+
+    def used_many(self, keys):
+        with self._lock:
+            return {key: self._live(key) for key in keys}
+
+
+class RateLimiter:
+    """Enforce the per-consent daily budget and the per-client-id rate."""
+
+    def __init__(self, backend=None, client_id=None, consent_per_day=None, client_per_second=None, max_wait=None):
+        self.backend = backend or CacheBudgetBackend(settings.PIRAEUS_RATE_LIMIT_CACHE)
+        self.client_id = client_id or settings.PIRAEUS_CLIENT_ID
+        self.consent_bucket = Bucket('consent', consent_per_day or settings.PIRAEUS_CONSENT_FREQUENCY_PER_DAY, 86400)
+        client_per_second = settings.PIRAEUS_CLIENT_RATE_PER_SECOND if client_per_second is None else client_per_second
+        self.client_bucket = Bucket('client', client_per_second, 1) if client_per_second else None
+        self.max_wait = settings.PIRAEUS_CLIENT_RATE_MAX_WAIT if max_wait is None else max_wait
+        self._capacities = {}  # consent_id -> (frequencyPerDay, monotonic expiry)
+
+    def _key(self, bucket, ident, index):
+        return f"piraeus:budget:{bucket.scope}:{ident}:{index}"
+
+    def _consume(self, bucket, ident, cost, capacity=None):
+        index, retry_after = bucket.window()
+        key = self._key(bucket, ident, index)
+        if not self.backend.consume(key, cost, capacity or bucket.capacity, int(retry_after) + 60):
+            raise RateLimitExceeded(bucket.scope, ident, retry_after)
+        return key
+
+    def _wait_for(self, bucket, ident, cost):
+        """Like ``_consume``, but sleep until the next window while it is full, for up to ``max_wait`` seconds."""
+        waited = 0
+        while True:
+            try:
+                return self._consume(bucket, ident, cost)
+            except RateLimitExceeded as e:
+                if waited + e.retry_after > self.max_wait:
+                    raise
+                time.sleep(e.retry_after)
+                waited += e.retry_after
+
+    def capacity_for(self, consent_id):
+        """The consent's granted ``frequencyPerDay``, else the default daily budget."""
+        now = time.monotonic()
+        cached = self._capacities.get(consent_id)
+        if cached is None or cached[1] < now:
+            granted = BankConsent.objects.filter(consent_id=consent_id).exclude(frequency_per_day=None) \
+                .order_by('-created_at').values_list('frequency_per_day', flat=True).first()
+            cached = self._capacities[consent_id] = (granted or self.consent_bucket.capacity, now + CAPACITY_TTL)
+        return cached[0]
+
+    def acquire(self, consent_id=None, cost=1, capacity=None):
+        """Take ``cost`` calls from the consent's and the client's budgets, or raise ``RateLimitExceeded``.
+
+        A full client window is waited out (see ``max_wait``); a spent consent budget raises at once.
+        ``capacity`` overrides the consent's daily budget; by default it is looked up with ``capacity_for``.
+        """
+        consent_key = None
+        if consent_id:
+            consent_key = self._consume(self.consent_bucket, consent_id, cost, capacity or self.capacity_for(consent_id))
+        if self.client_bucket is not None:
+            try:
+                self._wait_for(self.client_bucket, self.client_id, cost)
+            except RateLimitExceeded:
+                if consent_key:
+                    self.backend.refund(consent_key, cost)
+                raise
+
+    def ensure(self, consent_id, cost, capacity=None):
+        """Raise ``RateLimitExceeded`` unless ``cost`` calls are left today for the consent, without taking them."""
+        if self.remaining(consent_id, capacity) < cost:
+            raise RateLimitExceeded(self.consent_bucket.scope, consent_id, self.consent_bucket.window()[1])
+
+    def exhaust(self, consent_id):
+        """Mark the consent's budget as spent for today, e.g. after the bank answered 429."""
+        index, retry_after = self.consent_bucket.window()
+        key = self._key(self.consent_bucket, consent_id, index)
+        self.backend.set_used(key, self.capacity_for(consent_id), int(retry_after) + 60)
+
+    def remaining_many(self, consent_ids, capacities=None):
+        """Calls left today for each consent, in one cache round-trip.
+
+        ``capacities`` maps consent ids to their daily budget where the caller already knows it.
+        """
+        capacities = capacities or {}
+        index, _ = self.consent_bucket.window()
+        keys = {self._key(self.consent_bucket, cid, index): cid for cid in consent_ids}
+        used = self.backend.used_many(list(keys))
+        return {
+            cid: max((capacities.get(cid) or self.capacity_for(cid)) - used[key], 0)
+            for key, cid in keys.items()
+        }
+
+    def remaining(self, consent_id, capacity=None):
+        """Calls left today for the consent."""
+        return self.remaining_many([consent_id], {consent_id: capacity})[consent_id]
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Return the process-wide ``RateLimiter``."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter()
+    return _limiter
@@ -0,0 +1,166 @@
+"""
+Retry and circuit-breaking policy for calls to Piraeus Bank.
+
+Per ``docs/piraeus-bank-api/error-handling-guide.md``, 440 and 501 are
+transient and worth retrying, while 400/403/404/412 are permanent. Gateway
+errors (502-504), connection errors and timeouts are treated as transient too.
+Retries use full-jitter exponential backoff.
+
+Each endpoint (method + path with ids collapsed) has its own circuit breaker.
+After ``failure_threshold`` consecutive transient failures it opens and calls
+fail fast with ``CircuitOpenError`` for ``reset_timeout`` seconds. It then lets
+a single trial call through (half-open) and closes again if that succeeds.
+"""
+
+import logging
+import random
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+from .exceptions import PiraeusError
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = frozenset({440, 501, 502, 503, 504})
+PERMANENT_STATUS_CODES = frozenset({400, 403, 404, 412})
+
+RESOURCE_ID = re.compile(r'/(accounts|card-accounts|consents|authorisations)/[^/]+')
+
+
+class CircuitOpenError(PiraeusError):
+    """The endpoint's circuit breaker is open; the call was not attempted."""
+
+    def __init__(self, endpoint, retry_after):
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+        super().__init__(f"Circuit open for {endpoint}; retry in {retry_after:.0f}s")
+
+
+def endpoint_key(method, url):
+    """Group URLs by endpoint, e.g. ``GET /psd2/v3.1/accounts/{id}/transactions``."""
+    parts = urlsplit(url)
+    path = RESOURCE_ID.sub(r'/\1/{id}', parts.path)
+    return f"{method} {parts.netloc}{path}"
+
+
+class RetryPolicy:
+    """Which calls to retry, how often, and how long to wait in between."""
+
+    def __init__(self, max_attempts=None, base_delay=None, max_delay=None,
+                 status_codes=RETRYABLE_STATUS_CODES, methods=('GET',)):
+        self.max_attempts = max_attempts or settings.PIRAEUS_RETRY_ATTEMPTS
+        self.base_delay = settings.PIRAEUS_RETRY_BASE_DELAY if base_delay is None else base_delay
+        self.max_delay = settings.PIRAEUS_RETRY_MAX_DELAY if max_delay is None else max_delay
+        self.status_codes = frozenset(status_codes)
+        self.methods = frozenset(methods)
+
+    def attempts_for(self, method):
+        return self.max_attempts if method in self.methods else 1
+
+    def delay(self, attempt, response=None):
+        """Seconds to sleep before retry number ``attempt`` (1-based), honouring Retry-After."""
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one endpoint."""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, endpoint, failure_threshold, reset_timeout):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise ``CircuitOpenError`` unless a call may go through now."""
+        with self._lock:
+            if self.state == self.OPEN:
+                remaining = self.opened_at + self.reset_timeout - time.monotonic()
+                if remaining > 0:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.endpoint, remaining)
+                self._transition(self.HALF_OPEN)
+            if self.state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.endpoint, self.reset_timeout)
+                self._trial_in_flight = True
+            self.calls += 1
+
+    def release(self):
+        """Forget a call that ended without a verdict (e.g. rejected by the rate limiter)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self._trial_in_flight = False
+            self.consecutive_failures = 0
+            if self.state != self.CLOSED:
+                self._transition(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._trial_in_flight = False
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                if self.state != self.OPEN:
+                    self._transition(self.OPEN)
+
+    def _transition(self, state):
+        logger.warning("Circuit for %s: %s -> %s", self.endpoint, self.state, state)
+        self.state = state
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'calls': self.calls,
+                'failures': self.failures,
+                'rejected': self.rejected,
+            }
+
+
+class CircuitBreakerRegistry:
+    """Lazily created breakers, one per endpoint."""
+
+    def __init__(self, failure_threshold=None, reset_timeout=None):
+        self.failure_threshold = failure_threshold or settings.PIRAEUS_BREAKER_FAILURE_THRESHOLD
+        self.reset_timeout = reset_timeout or settings.PIRAEUS_BREAKER_RESET_TIMEOUT
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def for_call(self, method, url):
+        key = endpoint_key(method, url)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(
+                    key, CircuitBreaker(key, self.failure_threshold, self.reset_timeout)
+                )
+        return breaker
+
+    def metrics(self):
+        """State and counters of every breaker, keyed by endpoint."""
+        return {key: breaker.snapshot() for key, breaker in list(self._breakers.items())}
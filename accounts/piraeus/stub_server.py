@@ -0,0 +1,400 @@
+"""
+Local stand-in for the Piraeus OAuth and PSD2 AIS APIs.
+
+Serves deterministic synthetic consents, accounts, card accounts, balances and
+transactions over plain HTTP/1.1 with keep-alive, so the sync pipeline can be
+exercised and benchmarked without certificates, network access or a sandbox
+login. Paths mirror the real hosts:
+
+* ``{base_url}/v3/oauth/oauth2/authorize`` and ``.../token``
+* ``{base_url}/psd2/v3.1/consents``, ``/accounts``, ``/card-accounts`` and
+  their ``/balances`` and ``/transactions`` sub-resources
+
+Latency, transient error rate and transaction page size are configurable
+through ``StubConfig``. Any consent id is accepted by the AIS endpoints so
+benchmarks can invent them; consents created through ``POST /consents`` and
+later revoked are rejected like the bank does.
+"""
+
+import base64
+import json
+import random
+import re
+import threading
+import time
+import uuid
+import http.server
+from collections import Counter
+from datetime import date, timedelta
+from urllib.parse import urlencode, urlparse, parse_qs
+
+API_PREFIX = '/psd2/v3.1'
+OAUTH_PREFIX = '/v3/oauth/oauth2'
+
+AIS_PATH = re.compile(
+    r'^/(?P<kind>accounts|card-accounts)(?:/(?P<account_id>[^/]+)(?:/(?P<resource>balances|transactions))?)?$'
+)
+CONSENT_PATH = re.compile(r'^/consents(?:/(?P<consent_id>[^/]+)(?P<status>/status)?)?$')
+
+# Transient failures as documented in error-handling-guide.md
+TRANSIENT_ERRORS = (
+    (501, 'api-026', 'Service temporarily unavailable'),
+    (440, 'api-006', 'Login timeout'),
+)
+
+
+class StubConfig:
+    """Knobs controlling the stub's behaviour."""
+
+    def __init__(self, latency_ms=0, latency_jitter_ms=0, error_rate=0.0, page_size=0,
+                 accounts_per_consent=2, cards_per_consent=1, transactions_per_day=3,
+                 pending_per_account=1, token_ttl=3600, seed=0):
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms  # mean of an exponential tail added to latency_ms
+        self.error_rate = error_rate  # share of AIS calls answered with a transient 501/440
+        self.page_size = page_size  # booked entries per transactions page; 0 disables paging
+        self.accounts_per_consent = accounts_per_consent
+        self.cards_per_consent = cards_per_consent
+        self.transactions_per_day = transactions_per_day
+        self.pending_per_account = pending_per_account
+        self.token_ttl = token_ttl
+        self.seed = seed
+
+
+class StubData:
+    """Deterministic synthetic data, derived from the consent and account ids."""
+
+    def __init__(self, config):
+        self.config = config
+
+    def _rng(self, *parts):
+        return random.Random('|'.join(str(p) for p in (self.config.seed, *parts)))
+
+    def accounts(self, consent_id):
+        accounts = []
+        for idx in range(self.config.accounts_per_consent):
+            rng = self._rng(consent_id, idx)
+            account_id = f"{consent_id}-acc{idx}"
+            accounts.append({
+                'resourceId': account_id,
+                'iban': f"GR{rng.randrange(10**25, 10**26)}",
+                'currency': 'EUR',
+                'name': 'ΤΑΜΙΕΥΤΗΡΙΟ' if idx else 'ΛΟΓΑΡΙΑΣΜΟΣ ΠΕΙΡΑΙΩΣ',
+                'product': 'ΤΑΜΙΕΥΤΗΡΙΟ -Κ-',
+                'status': 'enabled',
+            })
+        return accounts
+
+    def card_accounts(self, consent_id):
+        cards = []
+        for idx in range(self.config.cards_per_consent):
+            rng = self._rng(consent_id, 'card', idx)
+            cards.append({
+                'resourceId': f"{consent_id}-card{idx}",
+                'maskedPan': f"430589******{rng.randrange(10**4):04d}",
+                'currency': 'EUR',
+                'name': 'Primary',
+                'displayName': 'Visa Classic',
+                'product': 'Visa Classic',
+                'status': 'enabled',
+                'creditLimit': {'currency': 'EUR', 'amount': 6000},
+            })
+        return cards
+
+    def balances(self, account_id):
+        amount = round(self._rng(account_id, 'balance').uniform(-500, 25000), 2)
+        return [
+            {'balanceAmount': {'currency': 'EUR', 'amount': amount}, 'balanceType': balance_type}
+            for balance_type in ('interimAvailable', 'interimBooked')
+        ]
+
+    def transactions(self, account_id, date_from, date_to, card=False):
+        """Booked entries between the two dates, newest first like the bank returns them."""
+        booked = []
+        day = date_to
+        while day >= date_from:
+            rng = self._rng(account_id, day.isoformat())
+            for n in range(rng.randint(0, self.config.transactions_per_day * 2)):
+                booked.append(self._entry(rng, account_id, day, str(n), card))
+            day -= timedelta(days=1)
+        return booked
+
+    def pending(self, account_id, today, card=False):
+        rng = self._rng(account_id, 'pending', today.isoformat())
+        entries = [
+            self._entry(rng, account_id, today, f"p{n}", card)
+            for n in range(self.config.pending_per_account)
+        ]
+        for entry in entries:
+            entry.pop('bookingDate')
+        return entries
+
+    def _entry(self, rng, account_id, day, suffix, card):
+        amount = {'currency': 'EUR', 'amount': round(rng.uniform(-120, 40), 2)}
+        stamp = f"{day.isoformat()}T00:00:00"
+        if card:
+            return {
+                'cardTransactionId': f"{account_id}-{day:%Y%m%d}-{suffix}",
+                'transactionDate': stamp,
+                'bookingDate': stamp,
+                'transactionAmount': amount,
+                'transactionDetails': rng.choice(('ΑΓΟΡΑ -SKLAVENITIS ATHENS GR', 'ΑΓΟΡΑ -SHELL PIRAEUS GR')),
+                'proprietaryBankTransactionCode': 'POS',
+            }
+        return {
+            'transactionId': f"{account_id}-{day:%Y%m%d}-{suffix}",
+            'entryReference': f"{day:%Y%m%d}{suffix:0>4}",
+            'bookingDate': stamp,
+            'valueDate': stamp,
+            'transactionAmount': amount,
+            'additionalInformation': 'ΑΓΟΡΑ ΜΕ ΚΑΡΤΑ',
+            'proprietaryBankTransactionCode': 'POS',
+        }
+
+
+class StubRequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.dispatch('GET')
+
+    def do_POST(self):
+        self.dispatch('POST')
+
+    def do_DELETE(self):
+        self.dispatch('DELETE')
+
+    def dispatch(self, method):
+        config = self.server.config
+        delay_ms = config.latency_ms
+        if config.latency_jitter_ms:
+            delay_ms += self.server.rng.expovariate(1 / config.latency_jitter_ms)
+        if delay_ms:
+            time.sleep(delay_ms / 1000)
+
+        parsed = urlparse(self.path)
+        self.params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        self.body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+        if parsed.path.startswith(OAUTH_PREFIX):
+            return self.handle_oauth(method, parsed.path[len(OAUTH_PREFIX):])
+        if parsed.path.startswith(API_PREFIX):
+            return self.handle_ais(method, parsed.path[len(API_PREFIX):])
+        return self.send_error_json(404, 'api-007', 'Not found')
+
+    # OAuth
+
+    def handle_oauth(self, method, path):
+        if method == 'GET' and path == '/authorize':
+            # No browser login: approve straight away and bounce back with a code
+            query = urlencode({'code': uuid.uuid4().hex, 'state': self.params.get('state', '')})
+            self.send_response(302)
+            self.send_header('Location', f"{self.params.get('redirect_uri', '/')}?{query}")
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return self.count(302)
+
+        if method == 'POST' and path == '/token':
+            form = {k: v[0] for k, v in parse_qs(self.body.decode()).items()}
+            grant_type = form.get('grant_type')
+            if grant_type not in ('authorization_code', 'refresh_token'):
+                return self.send_json(400, {'error': 'unsupported_grant_type'})
+            if not form.get('code' if grant_type == 'authorization_code' else 'refresh_token'):
+                return self.send_json(400, {'error': 'invalid_grant'})
+            return self.send_json(200, {
+                'token_type': 'Bearer',
+                'access_token': uuid.uuid4().hex,
+                'expires_in': self.server.config.token_ttl,
+                'refresh_token': uuid.uuid4().hex,
+                'scope': 'sandboxapi offline_access',
+            })
+
+        return self.send_error_json(404, 'api-007', 'Not found')
+
+    # AIS
+
+    def handle_ais(self, method, path):
+        if not self.headers.get('Authorization', '').startswith('Bearer '):
+            return self.send_error_json(401, 'api-002', 'Token expired or invalid')
+        if self.server.config.error_rate and self.server.rng.random() < self.server.config.error_rate:
+            return self.send_error_json(*self.server.rng.choice(TRANSIENT_ERRORS))
+
+        match = CONSENT_PATH.match(path)
+        if match:
+            return self.handle_consent(method, match['consent_id'], bool(match['status']))
+
+        match = AIS_PATH.match(path)
+        if not match or method != 'GET':
+            return self.send_error_json(404, 'api-007', 'Not found')
+
+        consent_id = self.headers.get('Consent-ID', 'consent')
+        consent = self.server.consents.get(consent_id)
+        if consent is not None and consent['consentStatus'] != 'valid':
+            return self.send_error_json(401, 'CONSENT_INVALID', f"Consent is {consent['consentStatus']}")
+
+        data = self.server.data
+        card = match['kind'] == 'card-accounts'
+        account_id = match['account_id']
+        if account_id is None:
+            if card:
+                return self.send_json(200, {'cardAccounts': data.card_accounts(consent_id)})
+            return self.send_json(200, {'accounts': data.accounts(consent_id)})
+        if match['resource'] == 'balances':
+            return self.send_json(200, {'balances': data.balances(account_id)})
+        if match['resource'] == 'transactions':
+            return self.send_transactions(path, account_id, card)
+        return self.send_error_json(404, 'api-007', 'Not found')
+
+    def handle_consent(self, method, consent_id, status_only):
+        consents = self.server.consents
+        if consent_id is None:
+            if method != 'POST':
+                return self.send_error_json(404, 'api-007', 'Not found')
+            try:
+                request = json.loads(self.body or b'{}')
+            except ValueError:
+                return self.send_error_json(400, 'FORMAT_ERROR', 'Body is not valid JSON')
+            consent_id = str(uuid.uuid4())
+            consents[consent_id] = {
+                'access': request.get('access', {}),
+                'recurringIndicator': request.get('recurringIndicator', True),
+                'validUntil': request.get('validUntil', (date.today() + timedelta(days=90)).isoformat()),
+                'frequencyPerDay': request.get('frequencyPerDay', 4),
+                'lastActionDate': date.today().isoformat(),
+                'consentStatus': 'valid',
+            }
+            self_href = f"{self.server.api_base_url}/consents/{consent_id}"
+            return self.send_json(201, {
+                'consentStatus': 'valid',
+                'consentId': consent_id,
+                '_links': {
+                    'self': {'href': self_href, 'verb': 'GET'},
+                    'status': {'href': f"{self_href}/status", 'verb': 'GET'},
+                },
+            })
+
+        consent = consents.get(consent_id)
+        if consent is None:
+            return self.send_error_json(403, 'CONSENT_UNKNOWN', 'Consent not found')
+        if method == 'DELETE':
+            consent['consentStatus'] = 'revoked'
+            self.send_response(204)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return self.count(204)
+        if method != 'GET':
+            return self.send_error_json(404, 'api-007', 'Not found')
+        if status_only:
+            return self.send_json(200, {'consentStatus': consent['consentStatus']})
+        return self.send_json(200, consent)
+
+    def send_transactions(self, path, account_id, card):
+        params = self.params
+        today = date.today()
+        date_to = date.fromisoformat(params['dateTo'][:10]) if 'dateTo' in params else today
+        date_from = date.fromisoformat(params['dateFrom'][:10]) if 'dateFrom' in params else date_to - timedelta(days=90)
+        booking_status = params.get('bookingStatus', 'booked')
+        offset = int(base64.urlsafe_b64decode(params['entryReferenceFrom'])) if 'entryReferenceFrom' in params else 0
+
+        data = self.server.data
+        booked = data.transactions(account_id, date_from, date_to, card) if booking_status != 'pending' else []
+        pending = data.pending(account_id, today, card) if booking_status != 'booked' and offset == 0 else []
+
+        kind = 'card-accounts' if card else 'accounts'
+        links = {('cardAccount' if card else 'account'): {
+            'href': f"{self.server.api_base_url}/{kind}/{account_id}", 'verb': 'GET',
+        }}
+        page_size = self.server.config.page_size
+        if page_size:
+            if offset + page_size < len(booked):
+                cursor = base64.urlsafe_b64encode(str(offset + page_size).encode()).decode()
+                query = urlencode({**params, 'entryReferenceFrom': cursor})
+                links['next'] = {'href': f"{self.server.api_base_url}{path}?{query}", 'verb': 'GET'}
+            booked = booked[offset:offset + page_size]
+
+        report = {'booked': booked, 'pending': pending, '_links': links}
+        if card:
+            return self.send_json(200, {'cardAccount': {'resourceId': account_id}, 'cardTransactions': report})
+        return self.send_json(200, {'account': {'resourceId': account_id}, 'transactions': report})
+
+    # Responses
+
+    def send_error_json(self, status_code, error_code, message):
+        self.send_json(status_code, {'error': error_code, 'message': message, 'status': status_code})
+
+    def send_json(self, status_code, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.count(status_code)
+
+    def count(self, status_code):
+        with self.server.stats_lock:
+            self.server.stats[status_code] += 1
+
+    def log_message(self, format, *args):
+        """Suppress default HTTP server logging"""
+        pass
+
+
+class StubServer:
+    """Run the stub in a background thread; usable as a context manager."""
+
+    def __init__(self, config=None, host='127.0.0.1', port=0):
+        self.config = config or StubConfig()
+        self.httpd = http.server.ThreadingHTTPServer((host, port), StubRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.config = self.config
+        self.httpd.data = StubData(self.config)
+        self.httpd.rng = random.Random(self.config.seed)
+        self.httpd.consents = {}
+        self.httpd.stats = Counter()
+        self.httpd.stats_lock = threading.Lock()
+        self.httpd.api_base_url = self.api_base_url
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_base_url(self):
+        """Drop-in value for ``PIRAEUS_API_BASE_URL``."""
+        return f"{self.base_url}{API_PREFIX}"
+
+    @property
+    def oauth_base_url(self):
+        """Drop-in value for ``PIRAEUS_OAUTH_BASE_URL``."""
+        return f"{self.base_url}{OAUTH_PREFIX}"
+
+    @property
+    def stats(self):
+        """Responses served so far, by status code."""
+        with self.httpd.stats_lock:
+            return dict(self.httpd.stats)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve in the calling thread until interrupted."""
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.httpd.server_close()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,302 @@
+"""
+Incremental AIS transaction sync.
+
+Each account keeps an ``AccountSyncState`` watermark: the latest booking date
+seen, fingerprints of the booked entries inside the overlap window, and the
+currently pending entries. A refresh only asks the bank for
+``bookingStatus=both`` from ``watermark - PIRAEUS_SYNC_OVERLAP_DAYS`` onwards,
+and only entries that are new or whose content changed are handed to the sink.
+Pending entries that disappear are reconciled against the newly booked ones
+(same transaction id, else same amount/reference) or reported as dropped.
+
+Each account refresh also reads the account's balances and stores the
+``interimBooked``/``interimAvailable`` amounts on its state; when they
+changed, ``account_balances_updated`` is sent once they are committed.
+"""
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+from urllib.parse import urljoin
+from zoneinfo import ZoneInfo
+
+import requests
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from accounts.models import AccountSyncState, BankConsent
+from accounts.signals import account_balances_updated
+from .client import get_client
+from .exceptions import PiraeusAPIError, PiraeusConnectionError, raise_for_error
+from .tokens import get_token_store
+
+logger = logging.getLogger(__name__)
+
+# Balance types in order of preference, per stored balance
+BOOKED_BALANCE_TYPES = ('interimBooked', 'closingBooked', 'openingBooked')
+AVAILABLE_BALANCE_TYPES = ('interimAvailable', 'expected', 'forwardAvailable')
+
+
+@dataclass
+class SyncBatch:
+    """The delta produced by one account refresh."""
+    user_id: str
+    account_ref: str
+    resource_id: str
+    booked: list = field(default_factory=list)
+    pending: list = field(default_factory=list)
+    settled: dict = field(default_factory=dict)  # pending transactionId -> booked transactionId
+    dropped: list = field(default_factory=list)  # pending transactionIds that vanished unbooked
+    requests: int = 0
+
+    @property
+    def is_empty(self):
+        return not (self.booked or self.pending or self.settled or self.dropped)
+
+
+def entry_id(entry):
+    """Stable identifier of an account or card transaction entry."""
+    return (
+        entry.get('transactionId')
+        or entry.get('cardTransactionId')
+        or entry.get('entryReference')
+        or fingerprint(entry)
+    )
+
+
+def entry_date(entry):
+    """Booking date of an entry (falling back to value/transaction date for pending ones)."""
+    raw = entry.get('bookingDate') or entry.get('valueDate') or entry.get('transactionDate')
+    return date.fromisoformat(raw[:10]) if raw else None
+
+
+def fingerprint(entry):
+    """Short content hash used to spot entries the bank changed."""
+    content = {k: v for k, v in entry.items() if k != '_links'}
+    return hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def match_key(entry):
+    """Key pairing a pending entry with its later booked counterpart when the id changes."""
+    amount = entry.get('transactionAmount', {})
+    reference = (
+        entry.get('endToEndId')
+        or entry.get('remittanceInformationUnstructured')
+        or entry.get('additionalInformation')
+        or entry.get('transactionDetails')
+        or ''
+    )
+    return f"{amount.get('amount')}|{amount.get('currency')}|{reference}"
+
+
+def reconcile(state, booked, pending, overlap_days):
+    """Diff a fetched window against ``state`` and advance the watermark in place.
+
+    Returns the ``SyncBatch`` of new or changed entries.
+    """
+    batch = SyncBatch(user_id=state.user_id, account_ref=state.account_ref, resource_id=state.resource_id)
+    known = state.recent_fingerprints
+
+    booked_ids = {}
+    latest_date, latest_reference = state.last_booking_date, state.last_entry_reference
+    fingerprints = {}
+    for entry in booked:
+        tid, booked_on = entry_id(entry), entry_date(entry)
+        booked_ids[tid] = entry
+        fp = fingerprint(entry)
+        fingerprints[tid] = [fp, booked_on.isoformat() if booked_on else None]
+        if (known.get(tid) or [None])[0] != fp:
+            batch.booked.append(entry)
+        if booked_on and (latest_date is None or booked_on >= latest_date):
+            latest_date = booked_on
+            latest_reference = entry.get('entryReference') or latest_reference
+
+    previous_pending = state.pending_entries
+    current_pending = {}
+    for entry in pending:
+        pid, key = entry_id(entry), match_key(entry)
+        current_pending[pid] = key
+        if previous_pending.get(pid) != key:
+            batch.pending.append(entry)
+
+    # Pending entries that are gone: booked under the same id, booked under a new id, or dropped
+    unmatched_booked = {match_key(e): entry_id(e) for e in batch.booked if entry_id(e) not in previous_pending}
+    for pid, key in previous_pending.items():
+        if pid in current_pending:
+            continue
+        if pid in booked_ids:
+            batch.settled[pid] = pid
+        elif key in unmatched_booked:
+            batch.settled[pid] = unmatched_booked.pop(key)
+        else:
+            batch.dropped.append(pid)
+
+    # Only the overlap window needs fingerprints on the next run
+    if latest_date is not None:
+        horizon = (latest_date - timedelta(days=overlap_days)).isoformat()
+        merged = {**known, **fingerprints}
+        state.recent_fingerprints = {tid: v for tid, v in merged.items() if v[1] and v[1] >= horizon}
+    state.last_booking_date = latest_date
+    state.last_entry_reference = latest_reference or ''
+    state.pending_entries = current_pending
+    return batch
+
+
+def parse_balances(balances, today):
+    """The ``balance_*`` fields of ``AccountSyncState`` for a ``/balances`` response, or None without usable ones.
+
+    An available balance in another currency than the booked one is ignored.
+    """
+    by_type = {}
+    for balance in balances:
+        amount = balance.get('balanceAmount') or {}
+        try:
+            value = Decimal(str(amount['amount']))
+        except (KeyError, InvalidOperation):
+            continue
+        by_type.setdefault(balance.get('balanceType'), (value, amount.get('currency') or '', balance.get('referenceDate')))
+
+    booked = next((by_type[t] for t in BOOKED_BALANCE_TYPES if t in by_type), None)
+    available = next((by_type[t] for t in AVAILABLE_BALANCE_TYPES if t in by_type), None)
+    if booked is None and available is None:
+        return None
+    _, currency, reference = booked or available
+    if booked is not None and available is not None and available[1] not in ('', currency):
+        available = None
+    return {
+        'balance_currency': currency[:3],
+        'booked_balance': booked[0] if booked else None,
+        'available_balance': available[0] if available else None,
+        'balance_date': date.fromisoformat(reference[:10]) if reference else today,
+    }
+
+
+def ais_consent_id(user_id):
+    """The id of the user's current AIS consent, if any."""
+    consent = BankConsent.objects.current(user_id, 'ais')
+    return consent.consent_id if consent else None
+
+
+def expected_calls(accounts):
+    """AIS calls a sync of a user with ``accounts`` known accounts is expected to make (at least one account)."""
+    return 1 + max(accounts, 1) * settings.PIRAEUS_SYNC_CALLS_PER_ACCOUNT
+
+
+class TransactionSyncEngine:
+    """Refresh users' accounts incrementally and hand the deltas to a sink."""
+
+    def __init__(self, client=None, token_store=None, sink=None, overlap_days=None, initial_days=None):
+        self.client = client or get_client()
+        self.token_store = token_store or get_token_store()
+        if sink is None and settings.PIRAEUS_SYNC_SINK:
+            sink = import_string(settings.PIRAEUS_SYNC_SINK)
+        self.sink = sink
+        self.overlap_days = overlap_days if overlap_days is not None else settings.PIRAEUS_SYNC_OVERLAP_DAYS
+        self.initial_days = initial_days if initial_days is not None else settings.PIRAEUS_SYNC_INITIAL_DAYS
+
+    def sync_user(self, user_id, consent_id=None):
+        """Sync every account covered by the user's consent. Returns one ``SyncBatch`` per account.
+
+        Raises ``RateLimitExceeded`` up front when the consent's budget left
+        today cannot cover a full sync, rather than running into a 429 halfway.
+        """
+        consent_id = consent_id or ais_consent_id(user_id)
+        rate_limiter = getattr(self.client, 'rate_limiter', None)
+        if rate_limiter is not None and consent_id:
+            rate_limiter.ensure(consent_id, expected_calls(AccountSyncState.objects.filter(user_id=user_id).count()))
+        access_token = self.token_store.get_access_token(user_id)
+        accounts = self._call(self.client.get_accounts, access_token, consent_id).get('accounts', [])
+        return [
+            self.sync_account(user_id, access_token, consent_id, account)
+            for account in accounts if account.get('resourceId')
+        ]
+
+    def window_params(self, state, today=None):
+        """Query parameters covering everything since the watermark, minus the overlap."""
+        today = today or timezone.localdate(timezone=ZoneInfo(settings.PIRAEUS_TIMEZONE))
+        if state.last_booking_date:
+            date_from = state.last_booking_date - timedelta(days=self.overlap_days)
+        else:
+            date_from = today - timedelta(days=self.initial_days)
+        return {
+            'bookingStatus': 'both',
+            'dateFrom': min(date_from, today).isoformat(),
+            'dateTo': today.isoformat(),
+        }
+
+    def sync_account(self, user_id, access_token, consent_id, account):
+        account_ref = account.get('iban') or account.get('maskedPan') or account['resourceId']
+        state, created = AccountSyncState.objects.get_or_create(user_id=user_id, account_ref=account_ref)
+        state.resource_id = account['resourceId']
+
+        window = self.window_params(state)
+        booked, pending, requests_made = self._fetch(access_token, consent_id, state.resource_id, window)
+        batch = reconcile(state, booked, pending, self.overlap_days)
+        balances_changed = self._update_balances(state, access_token, consent_id, date.fromisoformat(window['dateTo']))
+        batch.requests = requests_made + 1
+
+        # The watermark only moves once the sink has stored the delta
+        with transaction.atomic():
+            if self.sink is not None and not batch.is_empty:
+                self.sink(batch)
+            state.last_synced_at = timezone.now()
+            state.save()
+            if balances_changed:
+                transaction.on_commit(lambda: account_balances_updated.send(
+                    sender=AccountSyncState, user_id=user_id, account_ref=account_ref, state=state,
+                ))
+
+        logger.info(
+            "Synced %s/%s: %d booked, %d pending, %d settled, %d dropped in %d call(s)",
+            user_id, account_ref, len(batch.booked), len(batch.pending),
+            len(batch.settled), len(batch.dropped), batch.requests,
+        )
+        return batch
+
+    def _update_balances(self, state, access_token, consent_id, today):
+        """Read the account's balances into ``state``; returns whether they changed.
+
+        Balances are read after the transactions, so they already count every
+        entry just fetched. A consent without balance access keeps the stored ones.
+        """
+        try:
+            body = self._call(self.client.get_balances, access_token, consent_id, state.resource_id)
+        except PiraeusAPIError as e:
+            logger.warning("Balances of %s/%s unavailable: %s", state.user_id, state.account_ref, e)
+            return False
+        fields = parse_balances(body.get('balances', []), today)
+        if fields is None:
+            return False
+        changed = any(getattr(state, name) != value for name, value in fields.items() if name != 'balance_date')
+        for name, value in fields.items():
+            setattr(state, name, value)
+        if changed:
+            state.balances_updated_at = timezone.now()
+        return changed
+
+    def _call(self, method, *args):
+        """Call the bank and decode the response, reporting network failures as ``PiraeusConnectionError``."""
+        try:
+            return raise_for_error(method(*args))
+        except requests.RequestException as e:
+            raise PiraeusConnectionError(str(e)) from e
+
+    def _fetch(self, access_token, consent_id, account_id, params):
+        booked, pending = [], []
+        url, requests_made = None, 0
+        while True:
+            report = self._call(
+                self.client.get_transactions, access_token, consent_id, account_id, None if url else params, url,
+            ).get('transactions', {})
+            requests_made += 1
+            booked.extend(report.get('booked', []))
+            pending.extend(report.get('pending', []))
+            next_link = report.get('_links', {}).get('next')
+            if not next_link:
+                return booked, pending, requests_made
+            url = urljoin(self.client.api_base_url + '/', next_link['href'])
@@ -0,0 +1,131 @@
+"""
+Per-user OAuth token store with proactive, single-flight refresh.
+
+Access tokens are refreshed ``PIRAEUS_TOKEN_REFRESH_MARGIN`` seconds before
+they expire. Concurrent callers needing the same user's token are coalesced
+into one refresh call: threads in a process queue on a striped lock, and
+processes queue on the token row's ``SELECT ... FOR UPDATE`` lock. Whoever
+gets the lock second finds the token already fresh and skips the bank call.
+"""
+
+import logging
+import threading
+import zlib
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import BankToken
+from .client import get_client
+from .exceptions import PiraeusAPIError, PiraeusConnectionError, PiraeusError, raise_for_error
+
+logger = logging.getLogger(__name__)
+
+LOCK_STRIPES = 64
+
+
+class TokenMissingError(PiraeusError):
+    """The user has no stored token, or it expired and cannot be refreshed."""
+
+
+class TokenStore:
+    """Load, persist and refresh users' Piraeus OAuth tokens."""
+
+    def __init__(self, client=None, refresh_margin=None):
+        self.client = client or get_client()
+        self.refresh_margin = refresh_margin if refresh_margin is not None else settings.PIRAEUS_TOKEN_REFRESH_MARGIN
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+    def _lock_for(self, user_id):
+        return self._locks[zlib.crc32(str(user_id).encode()) % LOCK_STRIPES]
+
+    def save(self, user, token_info):
+        """Store a token endpoint response for ``user``."""
+        token, created = BankToken.objects.update_or_create(
+            user=user,
+            defaults=self._token_fields(token_info),
+        )
+        return token
+
+    def _token_fields(self, token_info, previous_refresh_token=''):
+        return {
+            'access_token': token_info['access_token'],
+            # Providers may omit the refresh token on refresh; keep the old one then
+            'refresh_token': token_info.get('refresh_token') or previous_refresh_token,
+            'token_type': token_info.get('token_type', 'Bearer'),
+            'scope': token_info.get('scope', ''),
+            'expires_at': timezone.now() + timedelta(seconds=int(token_info.get('expires_in', 3600))),
+        }
+
+    def get_access_token(self, user_id):
+        """Return a usable access token for the user, refreshing it first if it is about to expire."""
+        token = BankToken.objects.filter(user_id=user_id).only('access_token', 'expires_at').first()
+        if token is None:
+            raise TokenMissingError(f"No bank token stored for {user_id}")
+        if not token.expires_within(self.refresh_margin):
+            return token.access_token
+        return self.refresh(user_id)
+
+    def refresh(self, user_id, margin=None, force=False):
+        """Refresh the user's token unless another caller already did."""
+        margin = self.refresh_margin if margin is None else margin
+        with self._lock_for(user_id), transaction.atomic():
+            token = BankToken.objects.select_for_update().filter(user_id=user_id).first()
+            if token is None:
+                raise TokenMissingError(f"No bank token stored for {user_id}")
+            if not force and not token.expires_within(margin):
+                return token.access_token
+            if not token.refresh_token:
+                raise TokenMissingError(f"Token for {user_id} has no refresh token; the user must re-authorize")
+
+            try:
+                token_info = raise_for_error(self.client.refresh_access_token(token.refresh_token))
+            except PiraeusAPIError as e:
+                logger.warning("Token refresh for %s failed: %s", user_id, e)
+                raise
+            except requests.RequestException as e:
+                raise PiraeusConnectionError(str(e)) from e
+
+            for field, value in self._token_fields(token_info, token.refresh_token).items():
+                setattr(token, field, value)
+            token.save()
+            logger.info("Refreshed bank token for %s", user_id)
+            return token.access_token
+
+    def refresh_expiring(self, within=None):
+        """Proactively refresh every token expiring within ``within`` seconds.
+
+        Returns the number of tokens refreshed.
+        """
+        within = self.refresh_margin if within is None else within
+        user_ids = (
+            BankToken.objects
+            .filter(expires_at__lte=timezone.now() + timedelta(seconds=within))
+            .exclude(refresh_token='')
+            .values_list('user_id', flat=True)
+        )
+        refreshed = 0
+        for user_id in user_ids:
+            try:
+                self.refresh(user_id, margin=within)
+                refreshed += 1
+            except PiraeusError as e:
+                logger.warning("Skipping token refresh for %s: %s", user_id, e)
+        return refreshed
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_token_store():
+    """Return the process-wide ``TokenStore``."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = TokenStore()
+    return _store
@@ -0,0 +1,61 @@
+"""
+Webhook signing and event handling.
+
+Deliveries are signed with HMAC-SHA256 over the raw request body using
+``PIRAEUS_WEBHOOK_SECRET`` and carry the hex digest in the
+``X-Piraeus-Signature`` header as ``sha256=<digest>``. The receiving view
+only verifies, deduplicates and stores; ``process_event`` does the actual work
+from a Celery task.
+"""
+
+import hashlib
+import hmac
+import logging
+
+from accounts.models import BankConsent
+from .sync import TransactionSyncEngine
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = 'X-Piraeus-Signature'
+
+
+def sign(body, secret):
+    """Signature header value for a raw body."""
+    digest = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+def verify_signature(body, signature, secret):
+    """Constant-time check of a delivery's signature header."""
+    if not secret or not signature:
+        return False
+    return hmac.compare_digest(sign(body, secret), signature)
+
+
+def process_event(event, engine=None):
+    """Apply one stored event.
+
+    ``consent.*`` events update the status of the matching ``BankConsent``;
+    anything else that names a consent (new transactions, balance changes)
+    triggers an incremental sync of that consent's owner.
+    """
+    if not event.consent_id:
+        logger.info("Ignoring webhook %s without a consent id", event.event_id)
+        return
+
+    consent = BankConsent.objects.filter(consent_id=event.consent_id).first()
+    if consent is None:
+        logger.info("Ignoring webhook %s for unknown consent %s", event.event_id, event.consent_id)
+        return
+
+    if event.event_type.startswith('consent.'):
+        consent_status = event.payload.get('consentStatus')
+        if consent_status in dict(BankConsent.STATUS_CHOICES):
+            consent.status = consent_status
+            consent.save(update_fields=['status', 'updated_at'])
+        elif consent_status:
+            logger.warning("Webhook %s carries unknown consent status %r", event.event_id, consent_status)
+        return
+
+    (engine or TransactionSyncEngine()).sync_user(consent.user_id, event.consent_id)
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent once a sync committed balances for an account that differ from the ones stored before.
+# Arguments: user_id, account_ref, state (the AccountSyncState holding them)
+account_balances_updated = Signal()
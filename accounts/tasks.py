@@ -0,0 +1,204 @@
+"""
+Celery tasks for the Piraeus integration.
+
+``schedule_sync`` runs once every ``PIRAEUS_SYNC_INTERVAL`` seconds (see
+``CELERY_BEAT_SCHEDULE``). Instead of syncing everyone at once it splits the
+linked users into chunks of ``PIRAEUS_SYNC_CHUNK_SIZE`` and gives each chunk
+its own slot across the interval, with a random offset inside the slot, so the
+load on Postgres and on the bank stays flat. Recently active users get the
+earliest slots; users idle for more than ``PIRAEUS_SYNC_ACTIVE_DAYS`` are only
+included every ``IDLE_ROUNDS``-th round. Users whose consent has too little
+request budget left today for a full sync are deferred to a later round, and
+those that can afford at most ``LOW_BUDGET_SYNCS`` more go first, while their
+budget still covers one.
+
+Webhook deliveries are stored by the view and processed here by
+``process_webhook_event``, which first claims the event with a conditional
+UPDATE so two workers never process it at once. ``requeue_webhook_events``
+picks up events whose task was lost, failed events that still have attempts
+left, and events claimed by a worker that died.
+"""
+
+import logging
+import random
+import zlib
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import AccountSyncState, BankConsent, WebhookEvent
+from .piraeus.exceptions import PiraeusConnectionError, PiraeusError
+from .piraeus.ratelimit import RateLimitExceeded, get_rate_limiter
+from .piraeus.resilience import CircuitOpenError
+from .piraeus.sync import TransactionSyncEngine, expected_calls
+from .piraeus.tokens import get_token_store
+from .piraeus.webhooks import process_event
+
+logger = logging.getLogger(__name__)
+
+IDLE_ROUNDS = 4
+LOW_BUDGET_SYNCS = 2
+TRANSIENT_ERRORS = (CircuitOpenError, RateLimitExceeded, PiraeusConnectionError)
+
+
+def sync_candidates(now=None, interval=None, active_days=None):
+    """Ids of the users due in this round whose consent can afford a full sync.
+
+    Users with budget for at most ``LOW_BUDGET_SYNCS`` syncs come first; each group is ordered by recent activity.
+    """
+    now = now or timezone.now()
+    interval = interval or settings.PIRAEUS_SYNC_INTERVAL
+    active_days = settings.PIRAEUS_SYNC_ACTIVE_DAYS if active_days is None else active_days
+    active_since = now - timedelta(days=active_days)
+    round_index = int(now.timestamp() // interval) % IDLE_ROUNDS
+
+    consents = (
+        BankConsent.objects.active()
+        .filter(service='ais', user__is_active=True, user__bank_token__isnull=False)
+        .exclude(consent_id='')
+        .order_by(F('user__last_login').desc(nulls_last=True), 'user_id', '-created_at')
+        .values_list('user_id', 'user__last_login', 'consent_id', 'frequency_per_day')
+    )
+    due, seen = [], set()
+    for user_id, last_login, consent_id, frequency_per_day in consents:
+        # Only the newest active consent of each user is synced
+        if user_id in seen:
+            continue
+        seen.add(user_id)
+        # Idle users are spread over IDLE_ROUNDS rounds by a stable hash of their id
+        if (last_login is None or last_login < active_since) and \
+                zlib.crc32(user_id.encode()) % IDLE_ROUNDS != round_index:
+            continue
+        due.append((user_id, consent_id, frequency_per_day))
+
+    remaining = get_rate_limiter().remaining_many(
+        {consent_id for _, consent_id, _ in due},
+        {consent_id: frequency_per_day for _, consent_id, frequency_per_day in due},
+    )
+    accounts = dict(
+        AccountSyncState.objects.filter(user_id__in=[user_id for user_id, _, _ in due])
+        .values('user_id').annotate(count=Count('id')).values_list('user_id', 'count')
+    )
+    tight, rest = [], []
+    for user_id, consent_id, _ in due:
+        syncs_left = remaining[consent_id] // expected_calls(accounts.get(user_id, 0))
+        if syncs_left:
+            (tight if syncs_left <= LOW_BUDGET_SYNCS else rest).append(user_id)
+    return tight + rest
+
+
+def plan_sync(user_ids, interval, chunk_size, jitter=0.8, rng=random):
+    """Split ``user_ids`` into chunks and give each a start offset within ``interval``.
+
+    Chunk ``i`` of ``n`` starts at ``i * interval / n`` plus a random share
+    (up to ``jitter``) of its slot, so order is kept but starts never align.
+    Returns ``[(countdown_seconds, chunk), ...]``.
+    """
+    chunks = [user_ids[i:i + chunk_size] for i in range(0, len(user_ids), chunk_size)]
+    if not chunks:
+        return []
+    slot = interval / len(chunks)
+    return [(round(i * slot + rng.uniform(0, slot * jitter), 3), chunk) for i, chunk in enumerate(chunks)]
+
+
+@shared_task
+def schedule_sync():
+    """Fan out one round of transaction syncs across the sync interval."""
+    interval = settings.PIRAEUS_SYNC_INTERVAL
+    user_ids = sync_candidates(interval=interval)
+    plan = plan_sync(user_ids, interval, settings.PIRAEUS_SYNC_CHUNK_SIZE, settings.PIRAEUS_SYNC_JITTER)
+    for countdown, chunk in plan:
+        sync_users.apply_async(args=(chunk,), countdown=countdown)
+    logger.info("Scheduled sync of %d user(s) in %d chunk(s) over %ds", len(user_ids), len(plan), interval)
+    return len(user_ids)
+
+
+@shared_task(bind=True, max_retries=3)
+def sync_users(self, user_ids):
+    """Sync a chunk of users one after another."""
+    engine = TransactionSyncEngine()
+    synced = 0
+    for index, user_id in enumerate(user_ids):
+        try:
+            engine.sync_user(user_id)
+            synced += 1
+        except CircuitOpenError as e:
+            # The bank is struggling: hand the rest of the chunk back instead of piling on
+            countdown = max(e.retry_after, 1) * (1 + random.random())
+            logger.warning("Deferring %d user(s) by %.0fs: %s", len(user_ids) - index, countdown, e)
+            raise self.retry(args=(user_ids[index:],), countdown=countdown)
+        except PiraeusError as e:
+            logger.warning("Sync failed for %s: %s", user_id, e)
+    return synced
+
+
+@shared_task
+def refresh_expiring_tokens():
+    """Refresh OAuth tokens before they expire so syncs never wait on the bank's token endpoint."""
+    return get_token_store().refresh_expiring()
+
+
+@shared_task(bind=True, max_retries=5)
+def process_webhook_event(self, event_pk):
+    """Process a stored webhook event, retrying with backoff while the bank is unavailable."""
+    now = timezone.now()
+    claimable = Q(status__in=['received', 'failed']) | Q(
+        status='processing', claimed_at__lt=now - timedelta(seconds=settings.PIRAEUS_WEBHOOK_STALE_SECONDS),
+    )
+    if not WebhookEvent.objects.filter(claimable, pk=event_pk).update(status='processing', claimed_at=now):
+        return  # processed, dead, or being processed by another worker
+    event = WebhookEvent.objects.get(pk=event_pk)
+    event.attempts += 1
+    retry = False
+    try:
+        process_event(event)
+        event.status = 'processed'
+        event.processed_at = timezone.now()
+    except TRANSIENT_ERRORS as e:
+        event.status = 'failed'
+        event.last_error = str(e)
+        retry = True
+    except PiraeusError as e:
+        event.status = 'failed'
+        event.last_error = str(e)
+        logger.warning("Webhook %s failed: %s", event.event_id, e)
+    except Exception as e:
+        event.status = 'failed'
+        event.last_error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        # Saved however the attempt ended; an event still 'processing' is picked up again once stale
+        if event.status == 'failed' and event.attempts >= settings.PIRAEUS_WEBHOOK_MAX_ATTEMPTS:
+            event.status = 'dead'
+            logger.error("Webhook %s gave up after %d attempt(s): %s", event.event_id, event.attempts, event.last_error)
+        event.save(update_fields=['status', 'attempts', 'last_error', 'processed_at'])
+    if retry and event.status == 'failed':
+        raise self.retry(countdown=30 * 2 ** self.request.retries * (1 + random.random()))
+
+
+@shared_task
+def requeue_webhook_events(older_than=300):
+    """Re-enqueue events left unprocessed for ``older_than`` seconds.
+
+    That is events received but never attempted (e.g. lost by the broker),
+    failed ones whose task retries ran out, and ones claimed by a worker that
+    died mid-event.
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=older_than)
+    event_pks = list(
+        WebhookEvent.objects
+        .filter(
+            Q(status='received', received_at__lt=cutoff)
+            | Q(status='failed', claimed_at__lt=cutoff)
+            | Q(status='processing', claimed_at__lt=now - timedelta(seconds=settings.PIRAEUS_WEBHOOK_STALE_SECONDS))
+        )
+        .order_by('received_at')
+        .values_list('pk', flat=True)[:1000]
+    )
+    for event_pk in event_pks:
+        process_webhook_event.delay(event_pk)
+    return len(event_pks)
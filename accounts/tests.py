@@ -1,3 +1,576 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import requests
+from celery.exceptions import Retry
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from . import tasks, views
+from .authentication import TokenAuthentication
+from .signals import account_balances_updated
+from .models import AccountSyncState, BankConsent, BankToken, User, WebhookEvent
+from .piraeus import ratelimit, resilience, webhooks
+from .piraeus.client import PiraeusClient
+from .piraeus.exceptions import PiraeusConnectionError
+from .piraeus.ratelimit import Bucket, LocalBudgetBackend, RateLimiter, RateLimitExceeded
+from .piraeus.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, endpoint_key
+from .piraeus.sync import TransactionSyncEngine, parse_balances, reconcile
+
+
+def make_user(username, **fields):
+    return User.objects.create(username=username, email=f"{username}@example.com", **fields)
+
+
+def entry(transaction_id, booking_date, amount, reference='', **fields):
+    return {
+        'transactionId': transaction_id,
+        'bookingDate': booking_date,
+        'transactionAmount': {'amount': amount, 'currency': 'EUR'},
+        'remittanceInformationUnstructured': reference,
+        **fields,
+    }
+
+
+def make_response(status_code, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    return response
+
+
+class RateLimiterTests(TestCase):
+    def setUp(self):
+        self.limiter = RateLimiter(backend=LocalBudgetBackend(), client_id='client', consent_per_day=5,
+                                   client_per_second=0)
+
+    def test_consent_budget_is_enforced(self):
+        for _ in range(5):
+            self.limiter.acquire('consent-1')
+        with self.assertRaises(RateLimitExceeded) as raised:
+            self.limiter.acquire('consent-1')
+        self.assertEqual(raised.exception.scope, 'consent')
+        self.assertEqual(self.limiter.remaining('consent-1'), 0)
+        # Other consents keep their own budget
+        self.assertEqual(self.limiter.remaining('consent-2'), 5)
+
+    def test_failed_acquire_takes_nothing(self):
+        self.limiter.acquire('consent-1', cost=4)
+        with self.assertRaises(RateLimitExceeded):
+            self.limiter.acquire('consent-1', cost=2)
+        self.assertEqual(self.limiter.remaining('consent-1'), 1)
+
+    def test_granted_frequency_per_day_is_the_capacity(self):
+        user = make_user('budget')
+        BankConsent.objects.create(user=user, service='ais', consent_id='consent-1', status='valid',
+                                   frequency_per_day=2)
+        self.assertEqual(self.limiter.capacity_for('consent-1'), 2)
+        self.assertEqual(self.limiter.capacity_for('unknown'), 5)
+        self.limiter.acquire('consent-1', cost=2)
+        with self.assertRaises(RateLimitExceeded):
+            self.limiter.acquire('consent-1')
+
+    def test_exhaust_and_ensure(self):
+        self.limiter.ensure('consent-1', 5)
+        self.limiter.acquire('consent-1', cost=3)
+        with self.assertRaises(RateLimitExceeded):
+            self.limiter.ensure('consent-1', 3)
+        self.assertEqual(self.limiter.remaining('consent-1'), 2)  # ensure() does not take calls
+        self.limiter.exhaust('consent-1')
+        self.assertEqual(self.limiter.remaining('consent-1'), 0)
+
+    def test_client_budget_refunds_the_consent(self):
+        limiter = RateLimiter(backend=LocalBudgetBackend(), client_id='client', consent_per_day=5,
+                              client_per_second=1, max_wait=0)
+        with mock.patch.object(Bucket, 'window', return_value=(1, 0.5)):
+            limiter.acquire('consent-1')
+            with self.assertRaises(RateLimitExceeded) as raised:
+                limiter.acquire('consent-2')
+            self.assertEqual(limiter.remaining_many(['consent-1', 'consent-2']), {'consent-1': 4, 'consent-2': 5})
+        self.assertEqual(raised.exception.scope, 'client')
+
+    def test_full_client_window_is_waited_out(self):
+        limiter = RateLimiter(backend=LocalBudgetBackend(), client_id='client', consent_per_day=5,
+                              client_per_second=2, max_wait=1)
+        windows = iter([(1, 0.4), (1, 0.4), (2, 1.0)])
+        with mock.patch.object(Bucket, 'window', side_effect=lambda: next(windows)), \
+                mock.patch.object(ratelimit.time, 'sleep') as sleep:
+            limiter.acquire(cost=2)
+            limiter.acquire(cost=1)  # waits 0.4s for the next window
+        sleep.assert_called_once_with(0.4)
+
+
+@override_settings(PIRAEUS_SYNC_CALLS_PER_ACCOUNT=2)
+class SyncCandidatesTests(TestCase):
+    def setUp(self):
+        self.limiter = RateLimiter(backend=LocalBudgetBackend(), client_id='client', consent_per_day=255,
+                                   client_per_second=0)
+        now = timezone.now()
+        for index, (username, frequency, used) in enumerate([
+            ('plenty', None, 0),  # 255 calls left
+            ('tight', 6, 0),  # two syncs of three calls left
+            ('spent', 6, 4),  # not enough for a whole sync
+        ]):
+            user = make_user(username, last_login=now - timedelta(minutes=index))
+            BankToken.objects.create(user=user, access_token='token', expires_at=now + timedelta(hours=1))
+            BankConsent.objects.create(user=user, service='ais', consent_id=f"consent-{username}", status='valid',
+                                       frequency_per_day=frequency)
+            AccountSyncState.objects.create(user=user, account_ref=f"GR{index}")
+            if used:
+                self.limiter.acquire(f"consent-{username}", cost=used)
+
+    def test_low_budgets_first_and_unaffordable_syncs_deferred(self):
+        with mock.patch.object(tasks, 'get_rate_limiter', return_value=self.limiter):
+            self.assertEqual(tasks.sync_candidates(), ['tight', 'plenty'])
+
+
+class RetryPolicyTests(SimpleTestCase):
+    def test_only_idempotent_methods_are_retried(self):
+        policy = RetryPolicy(max_attempts=4)
+        self.assertEqual(policy.attempts_for('GET'), 4)
+        self.assertEqual(policy.attempts_for('POST'), 1)
+
+    def test_delay_is_jittered_and_capped(self):
+        policy = RetryPolicy(base_delay=1, max_delay=5)
+        for attempt in range(1, 6):
+            self.assertLessEqual(policy.delay(attempt), min(5, 2 ** attempt))
+
+    def test_retry_after_is_honoured_up_to_the_cap(self):
+        policy = RetryPolicy(base_delay=1, max_delay=5)
+        self.assertEqual(policy.delay(1, make_response(503, {'Retry-After': '3'})), 3)
+        self.assertEqual(policy.delay(1, make_response(503, {'Retry-After': '60'})), 5)
+
+    def test_endpoint_key_collapses_resource_ids(self):
+        self.assertEqual(
+            endpoint_key('GET', 'https://api.example.com/psd2/v3.1/accounts/abc123/transactions?page=2'),
+            'GET api.example.com/psd2/v3.1/accounts/{id}/transactions',
+        )
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch.object(resilience.time, 'monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker('GET /accounts', failure_threshold=3, reset_timeout=30)
+
+    def fail(self, times):
+        for _ in range(times):
+            self.breaker.before_call()
+            self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        self.fail(2)
+        self.breaker.before_call()
+        self.breaker.record_success()  # a success resets the streak
+        self.fail(2)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.fail(1)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError) as raised:
+            self.breaker.before_call()
+        self.assertAlmostEqual(raised.exception.retry_after, 30)
+
+    def test_half_open_lets_one_trial_through(self):
+        self.fail(3)
+        self.now += 31
+        self.breaker.before_call()
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()  # the trial is still in flight
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_failed_trial_reopens(self):
+        self.fail(3)
+        self.now += 31
+        self.fail(1)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+
+
+class ClientRetryTests(SimpleTestCase):
+    def setUp(self):
+        self.client = PiraeusClient(
+            api_base_url='https://api.example.com', oauth_base_url='https://oauth.example.com',
+            retry_policy=RetryPolicy(max_attempts=3, base_delay=0, max_delay=0),
+            breakers=resilience.CircuitBreakerRegistry(failure_threshold=10, reset_timeout=30),
+        )
+
+    def test_transient_statuses_are_retried(self):
+        responses = [make_response(503), make_response(503), make_response(200)]
+        with mock.patch.object(self.client, '_send', side_effect=responses) as send:
+            response = self.client.request('GET', 'https://api.example.com/psd2/v3.1/accounts')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(send.call_count, 3)
+
+    def test_permanent_errors_and_posts_are_not_retried(self):
+        for method, status_code in [('GET', 400), ('POST', 503)]:
+            with mock.patch.object(self.client, '_send', return_value=make_response(status_code)) as send:
+                response = self.client.request(method, 'https://api.example.com/psd2/v3.1/consents')
+            self.assertEqual(response.status_code, status_code)
+            self.assertEqual(send.call_count, 1)
+
+    def test_connection_errors_are_raised_once_attempts_run_out(self):
+        with mock.patch.object(self.client, '_send', side_effect=requests.ConnectionError('reset')) as send:
+            with self.assertRaises(requests.ConnectionError):
+                self.client.request('GET', 'https://api.example.com/psd2/v3.1/accounts')
+        self.assertEqual(send.call_count, 3)
+
+
+class ReconcileTests(SimpleTestCase):
+    def setUp(self):
+        self.state = AccountSyncState(user_id='sync', account_ref='GR1', resource_id='acc-1')
+
+    def test_first_window_is_all_new(self):
+        batch = reconcile(self.state, [entry('b1', '2026-10-01', '-10.00'), entry('b2', '2026-10-03', '-5.00')],
+                          [entry('p1', '2026-10-04', '-7.00', 'CAFE')], overlap_days=5)
+        self.assertEqual([e['transactionId'] for e in batch.booked], ['b1', 'b2'])
+        self.assertEqual([e['transactionId'] for e in batch.pending], ['p1'])
+        self.assertEqual(self.state.last_booking_date, date(2026, 10, 3))
+        self.assertEqual(set(self.state.pending_entries), {'p1'})
+
+    def test_overlap_only_reports_new_or_changed_entries(self):
+        reconcile(self.state, [entry('b1', '2026-10-01', '-10.00'), entry('b2', '2026-10-03', '-5.00')], [], 5)
+        batch = reconcile(self.state, [
+            entry('b1', '2026-10-01', '-10.00'),  # unchanged
+            entry('b2', '2026-10-03', '-5.50'),  # amended by the bank
+            entry('b3', '2026-10-05', '-1.00'),
+        ], [], 5)
+        self.assertEqual([(e['transactionId'], e['transactionAmount']['amount']) for e in batch.booked],
+                         [('b2', '-5.50'), ('b3', '-1.00')])
+        self.assertFalse(batch.is_empty)
+        self.assertTrue(reconcile(self.state, [entry('b3', '2026-10-05', '-1.00')], [], 5).is_empty)
+
+    def test_pending_entries_settle_or_drop(self):
+        reconcile(self.state, [], [
+            entry('p1', '2026-10-04', '-7.00', 'CAFE'),
+            entry('p2', '2026-10-04', '-3.00', 'KIOSK'),
+            entry('p3', '2026-10-04', '-9.00', 'FUEL'),
+        ], 5)
+        batch = reconcile(self.state, [
+            entry('p1', '2026-10-05', '-7.00', 'CAFE'),  # booked under the same id
+            entry('b9', '2026-10-05', '-3.00', 'KIOSK'),  # booked under a new id
+        ], [], 5)
+        self.assertEqual(batch.settled, {'p1': 'p1', 'p2': 'b9'})
+        self.assertEqual(batch.dropped, ['p3'])
+        self.assertEqual(self.state.pending_entries, {})
+
+    def test_fingerprints_outside_the_overlap_are_forgotten(self):
+        reconcile(self.state, [entry('old', '2026-09-01', '-1.00')], [], 5)
+        reconcile(self.state, [entry('new', '2026-10-01', '-1.00')], [], 5)
+        self.assertEqual(set(self.state.recent_fingerprints), {'new'})
+
+
+class SyncUsersTests(TestCase):
+    def setUp(self):
+        self.client = mock.Mock(rate_limiter=None)
+        self.engine = TransactionSyncEngine(client=self.client, token_store=mock.Mock(), sink=mock.Mock())
+
+    def test_network_failures_are_reported_as_connection_errors(self):
+        self.client.get_accounts.side_effect = requests.Timeout('read timed out')
+        with self.assertRaises(PiraeusConnectionError):
+            self.engine.sync_user('sync')
+
+    def test_one_users_network_failure_does_not_skip_the_rest(self):
+        self.client.get_accounts.side_effect = [
+            requests.ConnectionError('reset'), make_response(200), make_response(200),
+        ]
+        with mock.patch.object(requests.Response, 'json', return_value={'accounts': []}), \
+                mock.patch.object(tasks, 'TransactionSyncEngine', return_value=self.engine):
+            self.assertEqual(tasks.sync_users(['a', 'b', 'c']), 2)
+        self.assertEqual(self.client.get_accounts.call_count, 3)
+
+
+@override_settings(PIRAEUS_WEBHOOK_SECRET='secret')
+class WebhookViewTests(TestCase):
+    url = '/api/bank/piraeus/webhook/'
+    body = b'{"eventId": "evt-1", "eventType": "transactions.created", "consentId": "consent-1"}'
+
+    def post(self, body, signature=None):
+        signature = signature or webhooks.sign(body, 'secret')
+        return APIClient().post(self.url, body, content_type='application/json',
+                                headers={webhooks.SIGNATURE_HEADER: signature})
+
+    def test_bad_signatures_are_rejected(self):
+        self.assertEqual(self.post(self.body, webhooks.sign(self.body, 'other')).status_code, 401)
+        self.assertEqual(self.post(self.body, 'sha256=').status_code, 401)
+        self.assertFalse(WebhookEvent.objects.exists())
+
+    def test_events_are_stored_once_and_queued_on_commit(self):
+        with mock.patch.object(views.process_webhook_event, 'delay') as delay, \
+                self.captureOnCommitCallbacks(execute=True):
+            first = self.post(self.body)
+            again = self.post(self.body)
+        self.assertEqual((first.status_code, first.json()['status']), (202, 'accepted'))
+        self.assertEqual((again.status_code, again.json()['status']), (200, 'duplicate'))
+        event = WebhookEvent.objects.get()
+        self.assertEqual((event.event_type, event.consent_id, event.status), ('transactions.created', 'consent-1',
+                                                                             'received'))
+        delay.assert_called_once_with(event.pk)
+
+    def test_malformed_events_are_rejected(self):
+        for body in [b'not json', b'[]', b'{"eventType": "transactions.created"}']:
+            self.assertEqual(self.post(body).status_code, 400)
+
+
+@override_settings(PIRAEUS_WEBHOOK_MAX_ATTEMPTS=3, PIRAEUS_WEBHOOK_STALE_SECONDS=900)
+class WebhookProcessingTests(TestCase):
+    def setUp(self):
+        user = make_user('hooked')
+        BankConsent.objects.create(user=user, service='ais', consent_id='consent-1', status='valid')
+        self.event = WebhookEvent.objects.create(event_id='evt-1', event_type='transactions.created',
+                                                 consent_id='consent-1', payload={})
+        self.client = mock.Mock(rate_limiter=None)
+        engine = TransactionSyncEngine(client=self.client, token_store=mock.Mock(), sink=mock.Mock())
+        patcher = mock.patch.object(webhooks, 'TransactionSyncEngine', return_value=engine)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def process(self):
+        with mock.patch.object(tasks.process_webhook_event, 'retry', side_effect=Retry()) as retry:
+            try:
+                tasks.process_webhook_event(self.event.pk)
+            except Retry:
+                pass
+        self.event.refresh_from_db()
+        return retry
+
+    def test_bank_timeouts_are_retried(self):
+        self.client.get_accounts.side_effect = requests.Timeout('read timed out')
+        retry = self.process()
+        retry.assert_called_once()
+        self.assertEqual((self.event.status, self.event.attempts), ('failed', 1))
+        self.assertIn('read timed out', self.event.last_error)
+
+    def test_events_die_after_the_last_attempt(self):
+        WebhookEvent.objects.filter(pk=self.event.pk).update(status='failed', attempts=2)
+        self.client.get_accounts.side_effect = requests.Timeout('read timed out')
+        retry = self.process()
+        retry.assert_not_called()
+        self.assertEqual((self.event.status, self.event.attempts), ('dead', 3))
+
+    def test_events_are_claimed_once(self):
+        self.client.get_accounts.return_value = mock.Mock(status_code=200, json=lambda: {'accounts': []})
+        self.process()
+        self.assertEqual((self.event.status, self.event.attempts), ('processed', 1))
+        self.process()  # already processed
+        self.assertEqual(self.event.attempts, 1)
+
+        # A fresh claim belongs to another worker; a stale one to a worker that died
+        WebhookEvent.objects.filter(pk=self.event.pk).update(status='processing', claimed_at=timezone.now())
+        self.process()
+        self.assertEqual((self.event.status, self.event.attempts), ('processing', 1))
+        WebhookEvent.objects.filter(pk=self.event.pk).update(claimed_at=timezone.now() - timedelta(hours=1))
+        self.process()
+        self.assertEqual((self.event.status, self.event.attempts), ('processed', 2))
+        self.assertEqual(self.client.get_accounts.call_count, 2)
+
+    def test_sweeper_requeues_lost_failed_and_stale_events(self):
+        now = timezone.now()
+        WebhookEvent.objects.filter(pk=self.event.pk).update(received_at=now - timedelta(hours=1))
+        for event_id, status, claimed in [
+            ('failed', 'failed', now - timedelta(hours=1)),
+            ('stale', 'processing', now - timedelta(hours=1)),
+            ('busy', 'processing', now),
+            ('dead', 'dead', now - timedelta(hours=1)),
+            ('done', 'processed', now - timedelta(hours=1)),
+        ]:
+            WebhookEvent.objects.create(event_id=event_id, event_type='transactions.created', payload={},
+                                        status=status, claimed_at=claimed)
+        with mock.patch.object(tasks.process_webhook_event, 'delay') as delay:
+            self.assertEqual(tasks.requeue_webhook_events(), 3)
+        requeued = WebhookEvent.objects.filter(pk__in=[call.args[0] for call in delay.call_args_list])
+        self.assertEqual(set(requeued.values_list('event_id', flat=True)), {'evt-1', 'failed', 'stale'})
+
+
+def balance(balance_type, amount, currency='EUR', **fields):
+    return {'balanceType': balance_type, 'balanceAmount': {'amount': amount, 'currency': currency}, **fields}
+
+
+class BalanceSyncTests(TestCase):
+    def setUp(self):
+        make_user('balanced')
+        self.client = mock.Mock(rate_limiter=None, api_base_url='https://api.example.com')
+        self.client.get_accounts.return_value = self.ok({'accounts': [{'resourceId': 'acc-1', 'iban': 'GR1'}]})
+        self.client.get_transactions.return_value = self.ok({'transactions': {'booked': [], 'pending': []}})
+        self.engine = TransactionSyncEngine(client=self.client, token_store=mock.Mock(), sink=mock.Mock())
+
+    def ok(self, body):
+        return mock.Mock(status_code=200, json=lambda: body)
+
+    def sync(self, *balances):
+        self.client.get_balances.return_value = self.ok({'balances': list(balances)})
+        with mock.patch.object(account_balances_updated, 'send') as send, self.captureOnCommitCallbacks(execute=True):
+            batch, = self.engine.sync_user('balanced', 'consent-1')
+        return AccountSyncState.objects.get(account_ref='GR1'), send, batch
+
+    def test_parse_balances_prefers_interim_amounts(self):
+        fields = parse_balances([
+            balance('closingBooked', 90), balance('interimBooked', '100.50', referenceDate='2026-10-17T09:51:42+03:00'),
+            balance('interimAvailable', 80), balance('expected', 70),
+        ], date(2026, 10, 18))
+        self.assertEqual(fields, {'balance_currency': 'EUR', 'booked_balance': Decimal('100.50'),
+                                  'available_balance': Decimal('80'), 'balance_date': date(2026, 10, 17)})
+        self.assertEqual(parse_balances([balance('interimAvailable', 5, 'USD')], date(2026, 10, 18))['booked_balance'],
+                         None)
+        self.assertIsNone(parse_balances([{'balanceType': 'interimBooked'}], date(2026, 10, 18)))
+
+    def test_balances_are_stored_and_changes_signalled(self):
+        state, send, batch = self.sync(balance('interimBooked', 1200), balance('interimAvailable', 1150))
+        self.assertEqual((state.booked_balance, state.available_balance, state.balance_currency),
+                         (Decimal('1200'), Decimal('1150'), 'EUR'))
+        self.assertIsNotNone(state.balances_updated_at)
+        send.assert_called_once()
+        self.assertEqual(send.call_args.kwargs['account_ref'], 'GR1')
+        self.assertEqual(batch.requests, 2)
+
+        # Unchanged balances are not signalled again
+        _, send, _ = self.sync(balance('interimBooked', '1200.00'), balance('interimAvailable', 1150))
+        send.assert_not_called()
+
+    def test_missing_balance_access_keeps_the_stored_balances(self):
+        self.sync(balance('interimBooked', 1200))
+        self.client.get_balances.return_value = mock.Mock(status_code=403, text='', url='', json=lambda: {})
+        with mock.patch.object(account_balances_updated, 'send') as send:
+            self.engine.sync_user('balanced', 'consent-1')
+        send.assert_not_called()
+        self.assertEqual(AccountSyncState.objects.get(account_ref='GR1').booked_balance, Decimal('1200'))
+
+
+class ConsentMigrationTests(TransactionTestCase):
+    before = [('accounts', '0004_webhookevent')]
+    after = [('accounts', '0005_bankconsent')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+        executor.loader.build_graph()
+        return executor.loader.project_state(targets).apps
+
+    def setUp(self):
+        self.addCleanup(lambda: self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes()))
+        apps = self.migrate(self.before)
+        apps.get_model('accounts', 'User').objects.create(
+            username='legacy', email='legacy@example.com', password='', bank_consent_ids={
+                'ais': {'consent_id': 'consent-1', 'status': 'valid', 'valid_until': '2027-01-31T00:00:00',
+                        'frequency_per_day': 4, 'timestamp': '2026-09-01T10:00:00+00:00'},
+                'pis': {'consent_id': '', 'status': 'bogus'},
+                'junk': 'not a consent',
+            },
+        )
+
+    def test_consents_move_into_their_own_table_and_back(self):
+        apps = self.migrate(self.after)
+        consents = {
+            consent.service: consent for consent in apps.get_model('accounts', 'BankConsent').objects.all()
+        }
+        self.assertEqual(set(consents), {'ais', 'pis'})
+        ais = consents['ais']
+        self.assertEqual((ais.user_id, ais.consent_id, ais.status, ais.valid_until, ais.frequency_per_day),
+                         ('legacy', 'consent-1', 'valid', date(2027, 1, 31), 4))
+        self.assertEqual(ais.created_at.isoformat(), '2026-09-01T10:00:00+00:00')
+        self.assertEqual((consents['pis'].consent_id, consents['pis'].status), ('', 'received'))
+
+        apps = self.migrate(self.before)
+        stored = apps.get_model('accounts', 'User').objects.get(pk='legacy').bank_consent_ids
+        self.assertEqual(set(stored), {'ais', 'pis'})
+        self.assertEqual(
+            {key: stored['ais'][key] for key in ('consent_id', 'status', 'valid_until', 'frequency_per_day')},
+            {'consent_id': 'consent-1', 'status': 'valid', 'valid_until': '2027-01-31', 'frequency_per_day': 4},
+        )
+
+
+class DeferredUserFieldsTests(TestCase):
+    def setUp(self):
+        self.user = make_user('deferred', first_name='Maria', phone_number='+30 210 0000000', city='Athens')
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_authentication_defers_rarely_used_columns(self):
+        with self.assertNumQueries(1):
+            user, _ = TokenAuthentication().authenticate_credentials(self.token.key)
+        self.assertEqual(user.get_deferred_fields(), set(User.RARELY_USED_FIELDS))
+        with self.assertNumQueries(1):
+            user.load_deferred_fields()
+        self.assertEqual((user.phone_number, user.city), ('+30 210 0000000', 'Athens'))
+
+    def test_views_reading_deferred_fields_still_work(self):
+        response = self.client.get('/api/auth/personal-info/')
+        self.assertEqual((response.json()['phone_number'], response.json()['city']), ('+30 210 0000000', 'Athens'))
+        response = self.client.put('/api/auth/personal-info/', {'city': 'Piraeus'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.city, self.user.phone_number), ('Piraeus', '+30 210 0000000'))
+        self.assertEqual(self.client.get('/api/auth/profile/').json()['phone_number'], '+30 210 0000000')
+
+    def test_consents_are_read_from_their_table(self):
+        response = self.client.post('/api/bank/piraeus/', {'piraeus_customer_id': 'C-1'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        BankConsent.objects.create(user=self.user, service='ais', consent_id='consent-1', status='valid')
+        BankConsent.objects.create(user=self.user, service='pis', consent_id='consent-2', status='revoked')
+        linking = self.client.get('/api/bank/piraeus/').json()
+        self.assertEqual(linking['linked_services'], ['account_linking', 'ais'])
+
+        self.assertEqual(self.client.delete('/api/bank/piraeus/').status_code, 200)
+        self.assertEqual(set(self.user.bank_consents.values_list('status', flat=True)), {'terminated', 'revoked'})
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.piraeus_customer_id)
+        self.assertEqual(self.user.phone_number, '+30 210 0000000')  # deferred columns were not overwritten
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.user = make_user('cached', first_name='Nikos')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_matching_etag_gets_a_bare_304_until_the_data_changes(self):
+        first = self.client.get('/api/auth/profile/')
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('Accept', first['Vary'])
+        self.assertIn('no-cache', first['Cache-Control'])
+
+        cached = self.client.get('/api/auth/profile/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.content, b'')
+        self.assertEqual((cached['ETag'], cached['Last-Modified']), (first['ETag'], first['Last-Modified']))
+
+        self.user.first_name = 'Nikolaos'
+        self.user.save()
+        changed = self.client.get('/api/auth/profile/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json()['first_name'], 'Nikolaos')
+        self.assertNotEqual(changed['ETag'], first['ETag'])
+
+    def test_if_modified_since_is_honoured(self):
+        first = self.client.get('/api/auth/personal-info/')
+        self.assertEqual(
+            self.client.get('/api/auth/personal-info/', HTTP_IF_MODIFIED_SINCE=first['Last-Modified']).status_code, 304,
+        )
+
+    def test_consent_changes_invalidate_the_linking_status(self):
+        first = self.client.get('/api/bank/piraeus/')
+        self.assertEqual(self.client.get('/api/bank/piraeus/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+        BankConsent.objects.create(user=self.user, service='ais', consent_id='consent-1', status='valid')
+        self.assertEqual(self.client.get('/api/bank/piraeus/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
+
+    def test_each_renderer_gets_its_own_etag(self):
+        def get(accept, etag=''):
+            return self.client.get('/api/bank/', HTTP_ACCEPT=accept, HTTP_IF_NONE_MATCH=etag)
+
+        as_json, as_html = get('application/json'), get('text/html')
+        self.assertEqual((as_json.status_code, as_html.status_code), (200, 200))
+        self.assertEqual(as_json.json()['total_banks'], 1)
+        self.assertNotEqual(as_json['ETag'], as_html['ETag'])
+        # A browser revalidating its HTML copy must not get a 304 meant for the JSON one
+        self.assertEqual(get('text/html', as_json['ETag']).status_code, 200)
+        self.assertEqual(get('application/json', as_json['ETag']).status_code, 304)
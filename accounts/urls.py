@@ -13,4 +13,6 @@ urlpatterns = [
     path('api/auth/delete-account/', views.DeleteAccountView.as_view(), name='delete_account'),
     path('api/bank/', views.BankOptionsView.as_view(), name='bank_options'),
     path('api/bank/piraeus/', views.PiraeusLinkingView.as_view(), name='piraeus_linking'),
+    path('api/bank/piraeus/health/', views.PiraeusHealthView.as_view(), name='piraeus_health'),
+    path('api/bank/piraeus/webhook/', views.PiraeusWebhookView.as_view(), name='piraeus_webhook'),
 ]
\ No newline at end of file
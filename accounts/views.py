@@ -1,12 +1,24 @@
+import json
+from functools import partial
+
+from django.conf import settings
 from django.contrib.auth import login
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max
 from django.shortcuts import render
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.views import APIView
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
+from .conditional import conditional_get, make_etag
 from .forms import UserRegistrationSerializer, UserLoginSerializer, UserProfileSerializer, PersonalInformationSerializer, BankLinkingSerializer
+from .models import BankConsent, WebhookEvent
+from .piraeus import get_client
+from .piraeus.webhooks import SIGNATURE_HEADER, verify_signature
+from .tasks import process_webhook_event
 
 
 def test_api(request):
@@ -90,12 +102,18 @@ class ProfileView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
-        """Get user profile information."""
-        serializer = UserProfileSerializer(request.user)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        """Get user profile information (304 while the client's ETag still matches)."""
+        user = request.user
+        etag = make_etag('profile', user.pk, user.updated_at.isoformat(), UserProfileSerializer.Meta.fields)
+        return conditional_get(request, etag, user.updated_at, partial(self.profile, user))
+    
+    def profile(self, user):
+        user.load_deferred_fields()
+        return Response(UserProfileSerializer(user).data, status=status.HTTP_200_OK)
     
     def put(self, request):
         """Update user profile information."""
+        request.user.load_deferred_fields()
         serializer = UserProfileSerializer(request.user, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
@@ -134,12 +152,18 @@ class PersonalInformationView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
-        """Get user's personal information (DoB, phone, address)."""
-        serializer = PersonalInformationSerializer(request.user)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        """Get user's personal information (DoB, phone, address); 304 while the client's ETag still matches."""
+        user = request.user
+        etag = make_etag('personal', user.pk, user.updated_at.isoformat(), PersonalInformationSerializer.Meta.fields)
+        return conditional_get(request, etag, user.updated_at, partial(self.personal_information, user))
+    
+    def personal_information(self, user):
+        user.load_deferred_fields()
+        return Response(PersonalInformationSerializer(user).data, status=status.HTTP_200_OK)
     
     def put(self, request):
         """Update user's personal information."""
+        request.user.load_deferred_fields()
         serializer = PersonalInformationSerializer(request.user, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
@@ -150,36 +174,49 @@ class PersonalInformationView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+BANKS = [
+    {
+        'bank_code': 'piraeus',
+        'bank_name': 'Piraeus Bank',
+        'country': 'GR',
+        'supported_services': ['PSD2_AIS', 'PSD2_PIS'],
+        'link_endpoint': '/api/bank/piraeus/',
+        'description': 'Link your Piraeus Bank account for account information and payment services',
+        'requirements': ['customer_id', 'sca_method']
+    }
+]
+
+BANK_OPTIONS = {
+    'available_banks': BANKS,
+    'total_banks': len(BANKS),
+    'message': 'Available banks for account linking'
+}
+# The bank list only changes with a deploy, so its ETag is computed once when the URLconf loads
+BANK_OPTIONS_ETAG = make_etag('bank-options', JSONRenderer().render(BANK_OPTIONS).decode())
+
+
 class BankOptionsView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
         """Get available banks for linking."""
-        banks = [
-            {
-                'bank_code': 'piraeus',
-                'bank_name': 'Piraeus Bank',
-                'country': 'GR',
-                'supported_services': ['PSD2_AIS', 'PSD2_PIS'],
-                'link_endpoint': '/api/bank/piraeus/',
-                'description': 'Link your Piraeus Bank account for account information and payment services',
-                'requirements': ['customer_id', 'sca_method']
-            }
-        ]
-        
-        return Response({
-            'available_banks': banks,
-            'total_banks': len(banks),
-            'message': 'Available banks for account linking'
-        }, status=status.HTTP_200_OK)
+        return conditional_get(
+            request, BANK_OPTIONS_ETAG, None, partial(Response, BANK_OPTIONS, status=status.HTTP_200_OK),
+        )
 
 
 class PiraeusLinkingView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
-        """Get current Piraeus bank linking status."""
+        """Get current Piraeus bank linking status (304 while the client's ETag still matches)."""
         user = request.user
+        consents = user.bank_consents.aggregate(count=Count('id'), changed=Max('updated_at'))
+        last_modified = max(filter(None, (user.updated_at, consents['changed'])))
+        etag = make_etag('piraeus-linking', user.pk, user.updated_at.isoformat(), consents['count'], consents['changed'])
+        return conditional_get(request, etag, last_modified, partial(self.linking_status, user))
+    
+    def linking_status(self, user):
         is_linked = bool(user.piraeus_customer_id)
         
         response_data = {
@@ -189,11 +226,14 @@ class PiraeusLinkingView(APIView):
         }
         
         if is_linked:
+            linked_services = sorted(set(
+                user.bank_consents.exclude(status__in=BankConsent.FINAL_STATUSES).values_list('service', flat=True)
+            ))
             response_data.update({
                 'customer_id': user.piraeus_customer_id,
                 'preferred_sca_method': user.preferred_sca_method,
-                'consent_status': 'active' if user.bank_consent_ids else 'none',
-                'linked_services': list(user.bank_consent_ids.keys()) if user.bank_consent_ids else []
+                'consent_status': 'active' if linked_services else 'none',
+                'linked_services': linked_services
             })
         else:
             response_data['message'] = 'Piraeus Bank account not linked'
@@ -207,15 +247,8 @@ class PiraeusLinkingView(APIView):
             user = serializer.save()
             
             # Initialize consent tracking
-            if not user.bank_consent_ids:
-                user.bank_consent_ids = {
-                    'account_linking': {
-                        'status': 'initiated',
-                        'timestamp': str(timezone.now()),
-                        'customer_id': user.piraeus_customer_id
-                    }
-                }
-                user.save()
+            if not user.bank_consents.exists():
+                BankConsent.objects.create(user=user, service='account_linking', status='initiated')
             
             return Response({
                 'message': 'Piraeus Bank account linked successfully',
@@ -244,14 +277,79 @@ class PiraeusLinkingView(APIView):
         # Store customer ID for response
         customer_id = user.piraeus_customer_id
         
-        # Clear bank linking data
-        user.piraeus_customer_id = None
-        user.bank_consent_ids = {}
-        user.preferred_sca_method = 'SMS'
-        user.save()
+        # Clear bank linking data; consents are kept as history
+        with transaction.atomic():
+            user.bank_consents.exclude(status__in=BankConsent.FINAL_STATUSES).update(
+                status='terminated', updated_at=timezone.now()
+            )
+            user.piraeus_customer_id = None
+            user.preferred_sca_method = 'SMS'
+            user.save(update_fields=['piraeus_customer_id', 'preferred_sca_method', 'updated_at'])
         
         return Response({
             'message': 'Piraeus Bank account unlinked successfully',
             'unlinked_customer_id': customer_id,
             'status': 'unlinked'
         }, status=status.HTTP_200_OK)
+
+
+
+class PiraeusHealthView(APIView):
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        """Circuit breaker state and recent call latency for this worker's Piraeus client."""
+        client = get_client()
+        durations = sorted(timing.duration_ms for timing in client.timings)
+        breakers = client.breakers.metrics()
+        
+        return Response({
+            'circuit_breakers': breakers,
+            'open_circuits': [endpoint for endpoint, metrics in breakers.items() if metrics['state'] != 'closed'],
+            'recent_calls': len(durations),
+            'latency_ms': {
+                'p50': durations[len(durations) // 2] if durations else None,
+                'p99': durations[int(len(durations) * 0.99)] if durations else None,
+            },
+        }, status=status.HTTP_200_OK)
+
+
+class PiraeusWebhookView(APIView):
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    
+    def post(self, request):
+        """Verify, deduplicate and store a webhook delivery; processing happens in the background."""
+        body = request.body
+        if not verify_signature(body, request.headers.get(SIGNATURE_HEADER), settings.PIRAEUS_WEBHOOK_SECRET):
+            return Response({'error': 'Invalid signature'}, status=status.HTTP_401_UNAUTHORIZED)
+        
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return Response({'error': 'Body is not valid JSON'}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(payload, dict):
+            return Response({'error': 'Body must be a JSON object'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        event_id, event_type = payload.get('eventId'), payload.get('eventType')
+        consent_id = payload.get('consentId') or ''
+        if not (isinstance(event_id, str) and 0 < len(event_id) <= 100) or \
+                not (isinstance(event_type, str) and 0 < len(event_type) <= 50) or \
+                not (isinstance(consent_id, str) and len(consent_id) <= 100):
+            return Response({'error': 'eventId, eventType or consentId missing or invalid'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            with transaction.atomic():
+                event = WebhookEvent.objects.create(
+                    event_id=event_id,
+                    event_type=event_type,
+                    consent_id=consent_id,
+                    payload=payload,
+                )
+                transaction.on_commit(partial(process_webhook_event.delay, event.pk))
+        except IntegrityError:
+            # Redelivery of an event we already have
+            return Response({'status': 'duplicate', 'event_id': event_id}, status=status.HTTP_200_OK)
+        
+        return Response({'status': 'accepted', 'event_id': event_id}, status=status.HTTP_202_ACCEPTED)
@@ -0,0 +1,31 @@
+from django.contrib import admin
+from .models import DailyBalance, MonthlySummary, SafeToSpend
+
+
+class MonthlySummaryAdmin(admin.ModelAdmin):
+    list_display = ('user', 'month', 'category', 'currency', 'spent', 'income', 'transaction_count', 'refreshed_at')
+    list_filter = ('currency', 'month')
+    search_fields = ('user__username', 'category')
+    raw_id_fields = ('user',)
+    ordering = ('-month', 'user')
+
+
+class DailyBalanceAdmin(admin.ModelAdmin):
+    list_display = ('user', 'account_ref', 'day', 'currency', 'net_change', 'balance', 'transaction_count')
+    list_filter = ('currency',)
+    search_fields = ('user__username', 'account_ref')
+    raw_id_fields = ('user',)
+    ordering = ('-day', 'user')
+
+
+class SafeToSpendAdmin(admin.ModelAdmin):
+    list_display = ('user', 'amount', 'currency', 'available', 'upcoming_debits', 'next_income', 'computed_at')
+    list_filter = ('currency', 'income_predicted')
+    search_fields = ('user__username',)
+    raw_id_fields = ('user',)
+    ordering = ('-computed_at',)
+
+
+admin.site.register(MonthlySummary, MonthlySummaryAdmin)
+admin.site.register(DailyBalance, DailyBalanceAdmin)
+admin.site.register(SafeToSpend, SafeToSpendAdmin)
@@ -0,0 +1,180 @@
+"""
+Daily balance snapshots per account.
+
+``DailyBalance`` holds one row per account, currency and day with booked
+transactions: the day's net change and the closing balance. Balances are
+anchored to the booked balance the bank last reported for the account
+(``AccountSyncState.booked_balance`` on ``balance_date``): the balance before
+the refreshed range is that amount minus what was booked between the range
+and the balance's day, and a ``sum() OVER (ORDER BY day)`` window carries it
+through the range. Ingest only recomputes an account from the earliest month
+it touched, and balance history reads those rows instead of summing every
+transaction per request. Until the bank reported a balance in a currency the
+account's balances in it are unknown and stored as NULL; the day's net change
+is still kept.
+"""
+
+import logging
+from datetime import date
+
+from django.db import connection, transaction
+
+from accounts.models import AccountSyncState
+from transactions.models import Transaction
+from .models import DailyBalance
+
+logger = logging.getLogger(__name__)
+
+BALANCE_TABLE = DailyBalance._meta.db_table
+STATE_TABLE = AccountSyncState._meta.db_table
+TRANSACTION_TABLE = Transaction._meta.db_table
+
+REFRESH = f"""
+WITH anchor AS (
+    SELECT balance_currency AS currency, booked_balance AS balance, balance_date AS day
+    FROM {STATE_TABLE}
+    WHERE user_id = %(user_id)s AND account_ref = %(account_ref)s AND booked_balance IS NOT NULL
+),
+opening AS (
+    -- Closing balance of the day before since: the reported balance, less what was booked from since up to its day,
+    -- or plus what was booked after its day and before since
+    SELECT a.currency,
+           a.balance - coalesce(sum(t.amount) FILTER (WHERE t.booking_date >= %(since)s), 0)
+                     + coalesce(sum(t.amount) FILTER (WHERE t.booking_date < %(since)s), 0) AS balance
+    FROM anchor a
+    LEFT JOIN {TRANSACTION_TABLE} t
+        ON t.user_id = %(user_id)s AND t.account_ref = %(account_ref)s AND t.currency = a.currency
+       AND t.status = 'booked'
+       AND t.booking_date > least(a.day, %(since)s - 1) AND t.booking_date <= greatest(a.day, %(since)s - 1)
+    GROUP BY a.currency, a.balance
+),
+days AS (
+    SELECT booking_date AS day, currency, sum(amount) AS net_change, count(*) AS transaction_count
+    FROM {TRANSACTION_TABLE}
+    WHERE user_id = %(user_id)s AND account_ref = %(account_ref)s
+      AND booking_date >= %(since)s AND status = 'booked'
+    GROUP BY booking_date, currency
+),
+fresh AS (
+    SELECT d.day, d.currency, d.net_change, d.transaction_count,
+           o.balance + sum(d.net_change) OVER (PARTITION BY d.currency ORDER BY d.day) AS balance
+    FROM days d
+    LEFT JOIN opening o ON o.currency = d.currency
+),
+upserted AS (
+    INSERT INTO {BALANCE_TABLE} (user_id, account_ref, currency, day, net_change, balance, transaction_count, refreshed_at)
+    SELECT %(user_id)s, %(account_ref)s, currency, day, net_change, balance, transaction_count, now() FROM fresh
+    ON CONFLICT (user_id, account_ref, currency, day) DO UPDATE SET
+        net_change = EXCLUDED.net_change,
+        balance = EXCLUDED.balance,
+        transaction_count = EXCLUDED.transaction_count,
+        refreshed_at = EXCLUDED.refreshed_at
+    WHERE ({BALANCE_TABLE}.net_change, {BALANCE_TABLE}.balance, {BALANCE_TABLE}.transaction_count)
+          IS DISTINCT FROM (EXCLUDED.net_change, EXCLUDED.balance, EXCLUDED.transaction_count)
+    RETURNING 1
+),
+removed AS (
+    DELETE FROM {BALANCE_TABLE} b
+    WHERE b.user_id = %(user_id)s AND b.account_ref = %(account_ref)s AND b.day >= %(since)s
+      AND NOT EXISTS (SELECT 1 FROM fresh f WHERE f.day = b.day AND f.currency = b.currency)
+    RETURNING 1
+)
+SELECT (SELECT count(*) FROM upserted), (SELECT count(*) FROM removed)
+"""
+
+ALL_ACCOUNTS = f"""
+SELECT DISTINCT user_id, account_ref FROM {TRANSACTION_TABLE} WHERE status = 'booked'
+UNION
+SELECT DISTINCT user_id, account_ref FROM {BALANCE_TABLE}
+ORDER BY 1, 2
+"""
+
+
+def refresh_account(user_id, account_ref, since=None):
+    """Recompute an account's snapshots from ``since`` (default: its whole history) onwards.
+
+    Returns ``(rows_written, rows_removed)``.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(REFRESH, {'user_id': user_id, 'account_ref': account_ref, 'since': since or date.min})
+        written, removed = cursor.fetchone()
+    logger.debug("Refreshed balances of %s/%s since %s: %d written, %d removed",
+                 user_id, account_ref, since, written, removed)
+    return written, removed
+
+
+def rebuild_all():
+    """Recompute the snapshots of every account. Returns ``(accounts, rows_written, rows_removed)``."""
+    with connection.cursor() as cursor:
+        cursor.execute(ALL_ACCOUNTS)
+        accounts = cursor.fetchall()
+
+    written = removed = 0
+    for user_id, account_ref in accounts:
+        account_written, account_removed = refresh_account(user_id, account_ref)
+        written += account_written
+        removed += account_removed
+    return len(accounts), written, removed
+
+
+def opening_balances(user_id, account_ref, before):
+    """Closing balance per currency of the day before ``before`` (None while not anchored to a bank balance).
+
+    Taken from the last snapshot before ``before``, else from the first one
+    after it, less that day's net change.
+    """
+    rows = (
+        DailyBalance.objects
+        .filter(user_id=user_id, account_ref=account_ref)
+        .order_by('currency', '-day')
+        .distinct('currency')
+    )
+    balances = dict(rows.filter(day__lt=before).values_list('currency', 'balance'))
+    for currency, balance, net_change in rows.filter(day__gte=before).order_by('currency', 'day') \
+            .values_list('currency', 'balance', 'net_change'):
+        if currency not in balances:
+            balances[currency] = None if balance is None else balance - net_change
+    return balances
+
+
+def anchor_drifted(user_id, account_ref):
+    """Whether the account's snapshots disagree with the booked balance the bank last reported.
+
+    That is the case until they were first computed against it, and when the
+    bank's balance moved by something the synced transactions do not show.
+    """
+    state = AccountSyncState.objects.filter(
+        user_id=user_id, account_ref=account_ref, booked_balance__isnull=False,
+    ).values('balance_currency', 'booked_balance', 'balance_date').first()
+    if state is None:
+        return False
+    stored = opening_balances(user_id, account_ref, date.fromordinal(state['balance_date'].toordinal() + 1))
+    return state['balance_currency'] in stored and stored[state['balance_currency']] != state['booked_balance']
+
+
+def daily_series(user_id, account_ref, start, end):
+    """One entry per currency and day from ``start`` to ``end``, carrying balances over days without activity."""
+    balances = opening_balances(user_id, account_ref, start)
+    snapshots = {
+        (row.currency, row.day): row
+        for row in DailyBalance.objects.filter(user_id=user_id, account_ref=account_ref, day__gte=start, day__lte=end)
+    }
+    currencies = sorted(set(balances) | {currency for currency, _ in snapshots})
+
+    series = []
+    for offset in range((end - start).days + 1):
+        day = date.fromordinal(start.toordinal() + offset)
+        for currency in currencies:
+            snapshot = snapshots.get((currency, day))
+            if snapshot is not None:
+                balances[currency] = snapshot.balance
+            elif currency not in balances:
+                continue  # no history yet
+            series.append({
+                'day': day,
+                'currency': currency,
+                'balance': balances[currency],
+                'net_change': snapshot.net_change if snapshot else 0,
+                'transaction_count': snapshot.transaction_count if snapshot else 0,
+            })
+    return series
@@ -0,0 +1,49 @@
+from rest_framework import serializers
+from transactions.forms import TransactionSerializer
+from .models import MonthlySummary, SafeToSpend
+
+
+# DRF Serializers (for REST API)
+class MonthlySummarySerializer(serializers.ModelSerializer):
+    category = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = MonthlySummary
+        fields = ('category', 'currency', 'spent', 'income', 'transaction_count')
+        read_only_fields = fields
+    
+    def get_category(self, obj):
+        return obj.category or 'uncategorized'
+
+
+class MonthlyTotalSerializer(serializers.Serializer):
+    month = serializers.DateField(format='%Y-%m')
+    currency = serializers.CharField()
+    spent = serializers.DecimalField(max_digits=16, decimal_places=2)
+    income = serializers.DecimalField(max_digits=16, decimal_places=2)
+    transaction_count = serializers.IntegerField()
+
+
+class DailyBalanceSerializer(serializers.Serializer):
+    day = serializers.DateField()
+    currency = serializers.CharField()
+    balance = serializers.DecimalField(max_digits=16, decimal_places=2, allow_null=True)
+    net_change = serializers.DecimalField(max_digits=16, decimal_places=2)
+    transaction_count = serializers.IntegerField()
+
+
+class RunningBalanceSerializer(TransactionSerializer):
+    """A booked transaction with the account balance right after it (null until the bank reported a balance)."""
+    running_balance = serializers.DecimalField(max_digits=16, decimal_places=2, read_only=True, allow_null=True)
+    
+    class Meta(TransactionSerializer.Meta):
+        fields = TransactionSerializer.Meta.fields + ('running_balance',)
+        read_only_fields = fields
+
+
+class SafeToSpendSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SafeToSpend
+        fields = ('currency', 'amount', 'available', 'booked_balance', 'pending', 'upcoming_debits', 'upcoming',
+                  'next_income', 'income_predicted', 'computed_at')
+        read_only_fields = fields
@@ -0,0 +1,102 @@
+"""
+Django management command to benchmark the vectorized insights engine.
+
+Usage: python manage.py benchmark_insights --transactions 50000 --months 24
+
+Stores a synthetic history for one user, then times loading it into arrays
+and computing the insights payload, against the 2-second insight target.
+Pass --user to time an existing user's data instead. Synthetic data is removed
+afterwards.
+"""
+
+import json
+import random
+import statistics
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from accounts.models import User
+from analytics.engine import TransactionArrays, insights
+from transactions.ingest import TransactionIngestor
+from transactions.models import Transaction
+
+TARGET_SECONDS = 2.0
+CATEGORIES = (
+    '', 'groceries', 'restaurants', 'transport', 'fuel', 'utilities', 'rent', 'health',
+    'shopping', 'entertainment', 'travel', 'subscriptions', 'salary', 'transfers',
+)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark per-user insight computation on a large transaction history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--transactions', type=int, default=50000, help='Synthetic transactions (default: 50000)')
+        parser.add_argument('--months', type=int, default=24, help='Months of history (default: 24)')
+        parser.add_argument('--runs', type=int, default=5, help='Timed runs (default: 5)')
+        parser.add_argument('--user', help='Benchmark this existing username instead of synthetic data')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        username = options['user'] or 'bench-insights'
+        if options['user']:
+            user = User.objects.filter(username=username).first()
+            if user is None:
+                raise CommandError(f"User '{username}' not found")
+        else:
+            user, _ = User.objects.get_or_create(
+                username=username,
+                defaults={'email': f"{username}@example.com", 'first_name': 'Bench', 'last_name': 'Insights'},
+            )
+            self.generate(user, options['transactions'], options['months'], random.Random(options['seed']))
+
+        try:
+            self.run(user, options['runs'])
+        finally:
+            if not options['user']:
+                Transaction.objects.filter(user=user).delete()
+                user.delete()
+                self.stdout.write("🧹 Synthetic user removed")
+
+    def generate(self, user, count, months, rng):
+        today = timezone.localdate()
+        span = months * 30
+        rows = []
+        for i in range(count):
+            booked = today - timedelta(days=rng.randrange(span))
+            income = rng.random() < 0.05
+            amount = Decimal(f"{rng.uniform(500, 2500) if income else -rng.lognormvariate(3, 1):.2f}")
+            rows.append((
+                user.pk, f"GR{i % 3}", f"bench-{i}", booked, booked, amount, user.currency, 'booked',
+                '', '', '', json.dumps({'transactionId': f"bench-{i}"}), rng.choice(CATEGORIES),
+            ))
+        stats = TransactionIngestor().ingest(rows)
+        self.stdout.write(f"📥 Stored {stats.written} synthetic transactions over {months} months in {stats.seconds:.2f}s")
+
+    def run(self, user, runs):
+        load_times, compute_times = [], []
+        for _ in range(runs):
+            start = time.perf_counter()
+            data = TransactionArrays.load(user.pk, user.currency)
+            loaded = time.perf_counter()
+            payload = insights(data, months=12)
+            load_times.append(loaded - start)
+            compute_times.append(time.perf_counter() - loaded)
+
+        totals = [load + compute for load, compute in zip(load_times, compute_times)]
+        self.stdout.write(f"🔢 {len(data)} transactions, {len(data.labels)} categories, "
+                          f"{(data.cents.nbytes + data.days.nbytes + data.categories.nbytes) / 1024:.0f} KiB of arrays")
+        self.stdout.write(f"⏱️  Load:    median {statistics.median(load_times) * 1000:.1f}ms, max {max(load_times) * 1000:.1f}ms")
+        self.stdout.write(f"⏱️  Compute: median {statistics.median(compute_times) * 1000:.1f}ms, max {max(compute_times) * 1000:.1f}ms")
+        self.stdout.write(f"📊 {len(payload['categories'])} categories, spending trend {payload['spending_trend']['direction']}, "
+                          f"p90 transaction {payload['percentiles']['transaction'].get('p90', '-')}")
+
+        worst = max(totals)
+        if worst <= TARGET_SECONDS:
+            self.stdout.write(self.style.SUCCESS(f"✅ Worst run {worst * 1000:.0f}ms, within the {TARGET_SECONDS:.0f}s target"))
+        else:
+            self.stdout.write(self.style.ERROR(f"❌ Worst run {worst * 1000:.0f}ms exceeds the {TARGET_SECONDS:.0f}s target"))
@@ -0,0 +1,45 @@
+"""
+Django management command to refresh the daily balance snapshots.
+
+Usage: python manage.py refresh_daily_balances [--user USERNAME --account GR16... --since 2025-01-01]
+
+Without arguments every account is rebuilt from its first transaction.
+"""
+
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.balances import rebuild_all, refresh_account
+
+
+class Command(BaseCommand):
+    help = 'Recompute daily account balance snapshots'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only refresh this username (requires --account)')
+        parser.add_argument('--account', help='Account reference (IBAN or masked PAN)')
+        parser.add_argument('--since', help='Only recompute days from this date (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        if bool(options['user']) != bool(options['account']):
+            raise CommandError('--user and --account go together')
+        if options['since'] and not options['user']:
+            raise CommandError('--since requires --user and --account')
+        try:
+            since = date.fromisoformat(options['since']) if options['since'] else None
+        except ValueError:
+            raise CommandError('--since must be formatted YYYY-MM-DD')
+
+        start = time.perf_counter()
+        if options['user']:
+            written, removed = refresh_account(options['user'], options['account'], since)
+            accounts = 1
+        else:
+            accounts, written, removed = rebuild_all()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Refreshed {accounts} account(s): {written} row(s) written, {removed} removed "
+            f"in {time.perf_counter() - start:.2f}s"
+        ))
@@ -0,0 +1,50 @@
+"""
+Django management command to refresh the monthly spending summaries.
+
+Usage: python manage.py refresh_spending_summaries [--user USERNAME --month 2025-06 ...]
+
+Without arguments every slice is rebuilt in batches of
+ANALYTICS_SUMMARY_BATCH_SIZE. With --user only that user's months are
+recomputed (all of them unless --month is given).
+"""
+
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.summaries import rebuild_all, refresh_user_months
+from transactions.models import Transaction
+
+
+class Command(BaseCommand):
+    help = 'Recompute materialized monthly spending summaries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only refresh this username')
+        parser.add_argument('--month', action='append', default=[],
+                            help='Month to refresh as YYYY-MM (repeatable; requires --user)')
+        parser.add_argument('--batch-size', type=int,
+                            help='Slices per transaction for a full rebuild (default: ANALYTICS_SUMMARY_BATCH_SIZE)')
+
+    def handle(self, *args, **options):
+        if options['month'] and not options['user']:
+            raise CommandError('--month requires --user')
+        try:
+            months = [date.fromisoformat(f"{month}-01") for month in options['month']]
+        except ValueError:
+            raise CommandError('--month must be formatted YYYY-MM')
+
+        start = time.perf_counter()
+        if options['user']:
+            if not months:
+                months = Transaction.objects.filter(user_id=options['user']).dates('booking_date', 'month')
+            written, removed = refresh_user_months(options['user'], months)
+            slices = len(months)
+        else:
+            slices, written, removed = rebuild_all(options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Refreshed {slices} slice(s): {written} row(s) written, {removed} removed "
+            f"in {time.perf_counter() - start:.2f}s"
+        ))
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.3 on 2026-10-18 07:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('category', models.CharField(blank=True, max_length=50)),
+                ('currency', models.CharField(max_length=3)),
+                ('spent', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('income', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('transaction_count', models.PositiveIntegerField(default=0)),
+                ('refreshed_at', models.DateTimeField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_summaries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Monthly summary',
+                'verbose_name_plural': 'Monthly summaries',
+                'constraints': [models.UniqueConstraint(fields=('user', 'month', 'category', 'currency'), name='unique_monthly_summary')],
+            },
+        ),
+    ]
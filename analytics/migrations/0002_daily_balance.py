@@ -0,0 +1,35 @@
+# Generated by Django 5.2.3 on 2026-10-18 07:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('account_ref', models.CharField(max_length=64)),
+                ('currency', models.CharField(max_length=3)),
+                ('day', models.DateField()),
+                ('net_change', models.DecimalField(decimal_places=2, max_digits=16)),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=16)),
+                ('transaction_count', models.PositiveIntegerField(default=0)),
+                ('refreshed_at', models.DateTimeField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_balances', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Daily balance',
+                'verbose_name_plural': 'Daily balances',
+                'constraints': [models.UniqueConstraint(fields=('user', 'account_ref', 'currency', 'day'), name='unique_daily_balance')],
+            },
+        ),
+    ]
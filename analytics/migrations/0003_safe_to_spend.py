@@ -0,0 +1,36 @@
+# Generated by Django 5.2.3 on 2026-10-18 07:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_bankconsent'),
+        ('analytics', '0002_daily_balance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SafeToSpend',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='safe_to_spend', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('currency', models.CharField(max_length=3)),
+                ('booked_balance', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('pending', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('available', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('upcoming_debits', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('upcoming', models.JSONField(default=list)),
+                ('next_income', models.DateField()),
+                ('income_predicted', models.BooleanField(default=False)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('computed_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Safe to spend',
+                'verbose_name_plural': 'Safe to spend',
+            },
+        ),
+    ]
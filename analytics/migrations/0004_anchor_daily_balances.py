@@ -0,0 +1,39 @@
+# Generated by Django 5.2.3 on 2026-10-18 08:40
+
+from django.db import migrations, models
+
+
+def forget_unanchored_balances(apps, schema_editor):
+    """Balances so far started from 0 at the first synced transaction; they are rebuilt once the bank reports one."""
+    DailyBalance = apps.get_model('analytics', 'DailyBalance')
+    DailyBalance.objects.update(balance=None)
+
+
+def restore_cumulative_balances(apps, schema_editor):
+    """Back to cumulative net change, which the NOT NULL column held before."""
+    DailyBalance = apps.get_model('analytics', 'DailyBalance')
+    table = DailyBalance._meta.db_table
+    schema_editor.execute(f"""
+        UPDATE {table} b SET balance = c.balance
+        FROM (
+            SELECT id, sum(net_change) OVER (PARTITION BY user_id, account_ref, currency ORDER BY day) AS balance
+            FROM {table}
+        ) c
+        WHERE b.id = c.id
+    """)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_safe_to_spend'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dailybalance',
+            name='balance',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=16, null=True),
+        ),
+        migrations.RunPython(forget_unanchored_balances, restore_cumulative_balances),
+    ]
@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.db import models
+
+
+class MonthlySummary(models.Model):
+    """Booked spending and income of one user, month, category and currency.
+    
+    Rows are derived from ``transactions.Transaction`` and only ever written by
+    ``analytics.summaries``; a row exists for every (category, currency) that
+    had booked transactions in the month.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='monthly_summaries')
+    month = models.DateField()  # first day of the month
+    category = models.CharField(max_length=50, blank=True)  # '' while uncategorized
+    currency = models.CharField(max_length=3)
+    spent = models.DecimalField(max_digits=16, decimal_places=2, default=0)  # debits, as a positive amount
+    income = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    transaction_count = models.PositiveIntegerField(default=0)
+    refreshed_at = models.DateTimeField()
+    
+    class Meta:
+        verbose_name = 'Monthly summary'
+        verbose_name_plural = 'Monthly summaries'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'month', 'category', 'currency'], name='unique_monthly_summary'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} {self.month:%Y-%m} {self.category or 'uncategorized'}: -{self.spent} +{self.income} {self.currency}"
+
+
+class DailyBalance(models.Model):
+    """End-of-day balance of one account, for each day with booked transactions.
+    
+    Balances are anchored to the booked balance the bank last reported for the
+    account and are NULL until it reported one; ``analytics.balances`` keeps
+    them current.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='daily_balances')
+    account_ref = models.CharField(max_length=64)
+    currency = models.CharField(max_length=3)
+    day = models.DateField()
+    net_change = models.DecimalField(max_digits=16, decimal_places=2)
+    balance = models.DecimalField(max_digits=16, decimal_places=2, null=True, blank=True)
+    transaction_count = models.PositiveIntegerField(default=0)
+    refreshed_at = models.DateTimeField()
+    
+    class Meta:
+        verbose_name = 'Daily balance'
+        verbose_name_plural = 'Daily balances'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'account_ref', 'currency', 'day'], name='unique_daily_balance'),
+        ]
+    
+    def __str__(self):
+        return f"{self.account_ref} {self.day}: {self.balance} {self.currency}"
+
+
+class SafeToSpend(models.Model):
+    """What one user can spend until their next salary, kept current by ``analytics.safe_to_spend``.
+    
+    ``booked_balance`` and ``available`` add up the balances the bank reported
+    for the user's accounts in their currency (an account without an available
+    balance counts its booked one plus its pending entries); ``upcoming_debits``
+    sums the subscription debits expected before ``next_income``.
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True,
+                                related_name='safe_to_spend')
+    currency = models.CharField(max_length=3)
+    booked_balance = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    pending = models.DecimalField(max_digits=16, decimal_places=2, default=0)  # signed sum of pending entries
+    available = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    upcoming_debits = models.DecimalField(max_digits=16, decimal_places=2, default=0)  # positive
+    upcoming = models.JSONField(default=list)  # [{'name', 'amount', 'date'}] behind upcoming_debits
+    next_income = models.DateField()  # predicted salary date, or the fallback horizon
+    income_predicted = models.BooleanField(default=False)
+    amount = models.DecimalField(max_digits=16, decimal_places=2, default=0)  # available - upcoming_debits
+    computed_at = models.DateTimeField()
+    
+    class Meta:
+        verbose_name = 'Safe to spend'
+        verbose_name_plural = 'Safe to spend'
+    
+    def __str__(self):
+        return f"{self.user_id}: {self.amount} {self.currency} until {self.next_income}"
@@ -0,0 +1,138 @@
+"""
+"Safe to spend": available balance minus the recurring debits expected
+before the next salary.
+
+``refresh_user`` rebuilds a user's ``SafeToSpend`` row from already
+maintained state only: the balances the bank last reported for each account
+(kept on ``AccountSyncState`` by the sync), the pending entries, the last
+salary credit and the ``RecurringPayment`` subscriptions with their expected
+dates and cadence. It never scans the transaction history, so it runs after
+every balance change, ingest or recurring-payment update, and reads just
+return the stored row.
+"""
+
+import calendar
+import logging
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Sum
+from django.utils import timezone
+
+from accounts.models import AccountSyncState, User
+from subscriptions.models import RecurringPayment
+from transactions.models import Transaction
+from .models import SafeToSpend
+
+logger = logging.getLogger(__name__)
+
+
+def add_month(day):
+    """Same day of the following month, clamped to its last day."""
+    year, month = (day.year + 1, 1) if day.month == 12 else (day.year, day.month + 1)
+    return day.replace(year=year, month=month, day=min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def bank_balances(user_id, currency):
+    """``(booked, pending, available)`` over the user's accounts that reported balances in ``currency``.
+
+    The available balance is the bank's ``interimAvailable``; an account
+    without one counts its booked balance plus its pending entries.
+    """
+    pending = dict(
+        Transaction.objects
+        .filter(user_id=user_id, currency=currency, status='pending')
+        .values('account_ref')
+        .annotate(total=Sum('amount'))
+        .values_list('account_ref', 'total')
+    )
+    booked_total = pending_total = available_total = Decimal('0')
+    for account_ref, booked, available in AccountSyncState.objects.filter(
+        user_id=user_id, balance_currency=currency,
+    ).values_list('account_ref', 'booked_balance', 'available_balance'):
+        account_pending = pending.get(account_ref) or Decimal('0')
+        booked_total += booked or 0
+        pending_total += account_pending
+        available_total += available if available is not None else (booked or 0) + account_pending
+    return booked_total, pending_total, available_total
+
+
+def next_income(user_id, currency, today):
+    """Predicted date of the next salary and whether one was found.
+
+    The salary is assumed monthly, on the same day as the last credit in
+    ``SAFE_TO_SPEND_INCOME_CATEGORY``; without one the horizon is
+    ``SAFE_TO_SPEND_DEFAULT_DAYS`` ahead.
+    """
+    last = (
+        Transaction.objects
+        .filter(user_id=user_id, currency=currency, status='booked', amount__gt=0,
+                category=settings.SAFE_TO_SPEND_INCOME_CATEGORY,
+                booking_date__gte=today - timedelta(days=62), booking_date__lte=today)
+        .order_by('-booking_date')
+        .values_list('booking_date', flat=True)
+        .first()
+    )
+    if last is None:
+        return today + timedelta(days=settings.SAFE_TO_SPEND_DEFAULT_DAYS), False
+    day = add_month(last)
+    while day <= today:
+        day = add_month(day)
+    return day, True
+
+
+def upcoming_debits(user_id, currency, today, until):
+    """Expected subscription debits in ``[today, until)`` as ``{'name', 'amount', 'date'}``, by date."""
+    upcoming = []
+    subscriptions = RecurringPayment.objects.filter(
+        user_id=user_id, currency=currency, is_subscription=True, next_expected__isnull=False,
+    )
+    for payment in subscriptions:
+        step = timedelta(days=max(round(payment.interval_mean), 1))
+        day = payment.next_expected
+        if day + step <= today:
+            continue  # a whole cycle missed: most likely cancelled
+        day = max(day, today)  # late rather than cancelled, so still due
+        while day < until:
+            upcoming.append({'name': payment.display_name, 'amount': payment.last_amount, 'date': day})
+            day += step
+    return sorted(upcoming, key=lambda debit: (debit['date'], debit['name']))
+
+
+def refresh_user(user_id, today=None):
+    """Recompute and store one user's safe-to-spend figure."""
+    today = today or timezone.localdate()
+    currency = User.objects.filter(pk=user_id).values_list('currency', flat=True).first()
+    if currency is None:
+        return None
+
+    balance, pending, available = bank_balances(user_id, currency)
+    until, predicted = next_income(user_id, currency, today)
+    upcoming = upcoming_debits(user_id, currency, today, until)
+    debits = sum((debit['amount'] for debit in upcoming), Decimal('0'))
+
+    safe, _ = SafeToSpend.objects.update_or_create(user_id=user_id, defaults={
+        'currency': currency,
+        'booked_balance': balance,
+        'pending': pending,
+        'available': available,
+        'upcoming_debits': debits,
+        'upcoming': [
+            {'name': debit['name'], 'amount': str(debit['amount']), 'date': debit['date'].isoformat()}
+            for debit in upcoming
+        ],
+        'next_income': until,
+        'income_predicted': predicted,
+        'amount': available - debits,
+        'computed_at': timezone.now(),
+    })
+    return safe
+
+
+def current(user_id):
+    """The stored figure, recomputed first if missing or computed before today (the horizon moved)."""
+    safe = SafeToSpend.objects.filter(user_id=user_id).first()
+    if safe is None or timezone.localdate(safe.computed_at) < timezone.localdate():
+        safe = refresh_user(user_id)
+    return safe
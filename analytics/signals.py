@@ -0,0 +1,43 @@
+from django.dispatch import Signal, receiver
+
+from accounts.signals import account_balances_updated
+from transactions.signals import transactions_ingested
+
+# Sent after a refresh task changed a user's monthly summaries.
+# Arguments: user_id, months (ISO dates of the first day of each refreshed month)
+monthly_summaries_refreshed = Signal()
+
+# Sent after a user's safe-to-spend figure was recomputed (bank balances, pending entries or subscriptions changed).
+# Arguments: user_id, safe (the SafeToSpend row)
+safe_to_spend_refreshed = Signal()
+
+
+@receiver(transactions_ingested, dispatch_uid='analytics_refresh_monthly_summaries')
+def refresh_summaries_on_ingest(sender, user_id, months, changed, **kwargs):
+    """Queue a refresh of the months an ingest batch changed."""
+    if changed:
+        from .tasks import refresh_monthly_summaries
+        refresh_monthly_summaries.delay(user_id, [f"{year:04d}-{month:02d}-01" for year, month in sorted(months)])
+
+
+@receiver(transactions_ingested, dispatch_uid='analytics_refresh_daily_balances')
+def refresh_balances_on_ingest(sender, user_id, account_ref, months, changed, **kwargs):
+    """Queue a refresh of the account's balance snapshots from the earliest month the batch changed."""
+    if changed:
+        from .tasks import refresh_daily_balances
+        year, month = min(months)
+        refresh_daily_balances.delay(user_id, account_ref, f"{year:04d}-{month:02d}-01")
+
+
+@receiver(account_balances_updated, dispatch_uid='analytics_refresh_safe_to_spend')
+def refresh_safe_to_spend_on_balances(sender, user_id, **kwargs):
+    """Queue a recomputation of safe-to-spend from the balances the bank just reported."""
+    from .tasks import refresh_safe_to_spend
+    refresh_safe_to_spend.delay(user_id)
+
+
+@receiver(account_balances_updated, dispatch_uid='analytics_reanchor_daily_balances')
+def reanchor_balances_on_update(sender, user_id, account_ref, **kwargs):
+    """Queue a check of the account's snapshots against the balances the bank just reported."""
+    from .tasks import reanchor_daily_balances
+    reanchor_daily_balances.delay(user_id, account_ref)
@@ -0,0 +1,129 @@
+"""
+Per-user monthly spending summaries.
+
+``MonthlySummary`` is a materialized aggregate of booked transactions, kept as
+an ordinary table rather than a PostgreSQL materialized view: ``REFRESH
+MATERIALIZED VIEW CONCURRENTLY`` always recomputes every user's history,
+whereas new ingest batches only touch a few (user, month) slices.
+
+``refresh_slices`` recomputes just those slices in one statement. The upsert
+only rewrites rows whose totals changed and the delete only removes rows whose
+category disappeared, so readers keep seeing the previous totals (MVCC) until
+the refresh commits and are never blocked by it.
+"""
+
+import logging
+from datetime import date
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from transactions.models import Transaction
+from .models import MonthlySummary
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_TABLE = MonthlySummary._meta.db_table
+TRANSACTION_TABLE = Transaction._meta.db_table
+
+REFRESH = f"""
+WITH slices (user_id, month) AS (
+    SELECT * FROM unnest(%s::varchar[], %s::date[])
+),
+fresh AS (
+    SELECT t.user_id, s.month, t.category, t.currency,
+           coalesce(sum(-t.amount) FILTER (WHERE t.amount < 0), 0) AS spent,
+           coalesce(sum(t.amount) FILTER (WHERE t.amount > 0), 0) AS income,
+           count(*) AS transaction_count
+    FROM slices s
+    JOIN {TRANSACTION_TABLE} t
+      ON t.user_id = s.user_id
+     AND t.booking_date >= s.month
+     AND t.booking_date < s.month + interval '1 month'
+    WHERE t.status = 'booked'
+    GROUP BY t.user_id, s.month, t.category, t.currency
+),
+upserted AS (
+    INSERT INTO {SUMMARY_TABLE} (user_id, month, category, currency, spent, income, transaction_count, refreshed_at)
+    SELECT user_id, month, category, currency, spent, income, transaction_count, now() FROM fresh
+    ON CONFLICT (user_id, month, category, currency) DO UPDATE SET
+        spent = EXCLUDED.spent,
+        income = EXCLUDED.income,
+        transaction_count = EXCLUDED.transaction_count,
+        refreshed_at = EXCLUDED.refreshed_at
+    WHERE ({SUMMARY_TABLE}.spent, {SUMMARY_TABLE}.income, {SUMMARY_TABLE}.transaction_count)
+          IS DISTINCT FROM (EXCLUDED.spent, EXCLUDED.income, EXCLUDED.transaction_count)
+    RETURNING 1
+),
+removed AS (
+    DELETE FROM {SUMMARY_TABLE} m
+    USING slices s
+    WHERE m.user_id = s.user_id AND m.month = s.month
+      AND NOT EXISTS (
+          SELECT 1 FROM fresh f
+          WHERE f.user_id = m.user_id AND f.month = m.month
+            AND f.category = m.category AND f.currency = m.currency
+      )
+    RETURNING 1
+)
+SELECT (SELECT count(*) FROM upserted), (SELECT count(*) FROM removed)
+"""
+
+ALL_SLICES = f"""
+SELECT DISTINCT user_id, date_trunc('month', booking_date)::date FROM {TRANSACTION_TABLE}
+WHERE status = 'booked' AND booking_date >= %s
+UNION
+SELECT DISTINCT user_id, month FROM {SUMMARY_TABLE} WHERE month >= %s
+ORDER BY 1, 2
+"""
+
+
+def month_start(value):
+    """First day of the month of a date or a ``(year, month)`` pair."""
+    if isinstance(value, date):
+        return value.replace(day=1)
+    year, month = value
+    return date(year, month, 1)
+
+
+def refresh_slices(slices):
+    """Recompute the summaries of the given ``(user_id, month)`` slices.
+
+    ``month`` may be any date in the month or a ``(year, month)`` pair.
+    Returns ``(rows_written, rows_removed)``.
+    """
+    slices = sorted({(user_id, month_start(month)) for user_id, month in slices})
+    if not slices:
+        return 0, 0
+    user_ids, months = zip(*slices)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(REFRESH, [list(user_ids), list(months)])
+        written, removed = cursor.fetchone()
+    logger.debug("Refreshed %d summary slice(s): %d row(s) written, %d removed", len(slices), written, removed)
+    return written, removed
+
+
+def refresh_user_months(user_id, months):
+    """Recompute one user's summaries for the given months."""
+    return refresh_slices((user_id, month) for month in months)
+
+
+def rebuild_all(batch_size=None, since=None):
+    """Recompute every slice that has booked transactions or a stale summary, in batches.
+
+    ``since`` limits the rebuild to months from that date on. Each batch
+    commits on its own, so a full rebuild never holds one long transaction.
+    Returns ``(slices, rows_written, rows_removed)``.
+    """
+    batch_size = batch_size or settings.ANALYTICS_SUMMARY_BATCH_SIZE
+    since = month_start(since) if since else date.min
+    with connection.cursor() as cursor:
+        cursor.execute(ALL_SLICES, [since, since])
+        slices = cursor.fetchall()
+
+    written = removed = 0
+    for i in range(0, len(slices), batch_size):
+        batch_written, batch_removed = refresh_slices(slices[i:i + batch_size])
+        written += batch_written
+        removed += batch_removed
+    return len(slices), written, removed
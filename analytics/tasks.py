@@ -0,0 +1,59 @@
+import logging
+from datetime import date
+
+from celery import shared_task
+from django.utils import timezone
+
+from .balances import anchor_drifted, refresh_account
+from .models import MonthlySummary, SafeToSpend
+from .safe_to_spend import refresh_user
+from .signals import monthly_summaries_refreshed, safe_to_spend_refreshed
+from .summaries import rebuild_all, refresh_user_months
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def refresh_monthly_summaries(user_id, months):
+    """Recompute one user's summaries for ``months`` (ISO dates of any day in each month)."""
+    written, removed = refresh_user_months(user_id, [date.fromisoformat(month) for month in months])
+    if written or removed:
+        monthly_summaries_refreshed.send(sender=MonthlySummary, user_id=user_id, months=months)
+    return written, removed
+
+
+@shared_task
+def refresh_daily_balances(user_id, account_ref, since=None):
+    """Recompute an account's daily balance snapshots from ``since`` (ISO date) onwards."""
+    written, removed = refresh_account(user_id, account_ref, date.fromisoformat(since) if since else None)
+    refresh_safe_to_spend.delay(user_id)
+    return written, removed
+
+
+@shared_task
+def reanchor_daily_balances(user_id, account_ref):
+    """Recompute all of an account's snapshots if they disagree with the balance the bank reported."""
+    if not anchor_drifted(user_id, account_ref):
+        return 0, 0
+    return refresh_account(user_id, account_ref)
+
+
+@shared_task
+def refresh_safe_to_spend(user_id):
+    """Recompute the user's safe-to-spend figure from their snapshots and subscriptions."""
+    safe = refresh_user(user_id)
+    if safe is None:
+        return None
+    safe_to_spend_refreshed.send(sender=SafeToSpend, user_id=user_id, safe=safe)
+    return str(safe.amount)
+
+
+@shared_task
+def rebuild_monthly_summaries(months_back=1):
+    """Recompute all users' recent summaries, catching changes no ingest signal covered
+    (e.g. a refresh task lost by the broker)."""
+    today = timezone.localdate()
+    index = today.year * 12 + today.month - 1 - months_back
+    slices, written, removed = rebuild_all(since=date(index // 12, index % 12 + 1, 1))
+    logger.info("Rebuilt %d summary slice(s): %d row(s) written, %d removed", slices, written, removed)
+    return slices, written, removed
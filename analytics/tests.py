@@ -0,0 +1,131 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from accounts.models import AccountSyncState, User
+from accounts.signals import account_balances_updated
+from subscriptions.models import RecurringPayment
+from transactions.models import Transaction
+from . import signals
+from .balances import anchor_drifted, refresh_account
+from .models import DailyBalance
+from .safe_to_spend import refresh_user
+
+
+class DailyBalanceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='anchored', email='anchored@example.com')
+        self.state = AccountSyncState.objects.create(user=self.user, account_ref='GR1')
+        Transaction.objects.bulk_create([
+            Transaction(user=self.user, account_ref='GR1', transaction_id=transaction_id, booking_date=day,
+                        amount=Decimal(amount))
+            for transaction_id, day, amount in [
+                ('t1', date(2026, 8, 30), '2000'),
+                ('t2', date(2026, 9, 2), '-150'),
+                ('t3', date(2026, 9, 2), '-50'),
+                ('t4', date(2026, 10, 5), '-300'),
+            ]
+        ])
+
+    def report(self, booked, day=date(2026, 10, 10)):
+        AccountSyncState.objects.filter(pk=self.state.pk).update(balance_currency='EUR', booked_balance=booked,
+                                                                   balance_date=day)
+
+    def balances(self):
+        return list(DailyBalance.objects.filter(user=self.user).order_by('day').values_list('day', 'net_change',
+                                                                                             'balance'))
+
+    def test_balances_are_unknown_until_the_bank_reports_one(self):
+        refresh_account('anchored', 'GR1')
+        self.assertEqual([balance for _, _, balance in self.balances()], [None, None, None])
+        self.assertEqual([net for _, net, _ in self.balances()], [2000, -200, -300])
+
+    def test_balances_are_anchored_to_the_reported_balance(self):
+        self.report(5000)
+        refresh_account('anchored', 'GR1')
+        self.assertEqual([balance for _, _, balance in self.balances()], [5500, 5300, 5000])
+
+        # A balance dated before later bookings is carried forward through them
+        self.report(5300, date(2026, 9, 20))
+        refresh_account('anchored', 'GR1')
+        self.assertEqual([balance for _, _, balance in self.balances()], [5500, 5300, 5000])
+
+    def test_partial_refresh_matches_a_full_one(self):
+        self.report(5000)
+        refresh_account('anchored', 'GR1')
+        Transaction.objects.create(user=self.user, account_ref='GR1', transaction_id='t5',
+                                   booking_date=date(2026, 10, 8), amount=Decimal('-25'))
+        self.report(4975)
+        refresh_account('anchored', 'GR1', date(2026, 10, 1))
+        partial = self.balances()
+        refresh_account('anchored', 'GR1')
+        self.assertEqual(self.balances(), partial)
+        self.assertEqual(partial[-1][2], 4975)
+
+    def test_drift_from_the_reported_balance_is_detected_and_fixed(self):
+        refresh_account('anchored', 'GR1')
+        self.assertFalse(anchor_drifted('anchored', 'GR1'))  # nothing reported yet
+        self.report(5000)
+        self.assertTrue(anchor_drifted('anchored', 'GR1'))
+        account_balances_updated.send(sender=AccountSyncState, user_id='anchored', account_ref='GR1', state=None)
+        self.assertFalse(anchor_drifted('anchored', 'GR1'))
+        self.assertEqual(self.balances()[0][2], 5500)
+
+    def test_history_endpoints_report_anchored_balances(self):
+        self.report(5000)
+        refresh_account('anchored', 'GR1')
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.get('/api/analytics/accounts/GR1/running-balance/', {'month': '2026-09'})
+        self.assertEqual(response.json()['opening_balances'], {'EUR': '5500.00'})
+        self.assertEqual([row['running_balance'] for row in response.json()['transactions']],
+                         ['5350.00', '5300.00'])
+
+        with mock.patch('django.utils.timezone.localdate', return_value=date(2026, 10, 6)):
+            response = client.get('/api/analytics/accounts/GR1/balances/', {'days': 40})
+        balances = {row['day']: row['balance'] for row in response.json()['balances']}
+        self.assertEqual((balances['2026-08-28'], balances['2026-09-01'], balances['2026-10-06']),
+                         ('3500.00', '5500.00', '5000.00'))
+
+
+@override_settings(SAFE_TO_SPEND_DEFAULT_DAYS=30)
+class SafeToSpendTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='saver', email='saver@example.com')
+        self.today = date(2026, 10, 18)
+        AccountSyncState.objects.create(user=self.user, account_ref='GR1', balance_currency='EUR',
+                                        booked_balance=1000, available_balance=950, balance_date=self.today)
+        # No available balance reported: booked plus pending entries
+        AccountSyncState.objects.create(user=self.user, account_ref='GR2', balance_currency='EUR',
+                                        booked_balance=200, balance_date=self.today)
+        # Never reported a balance; its transactions alone say nothing about what is in it
+        AccountSyncState.objects.create(user=self.user, account_ref='GR3')
+        Transaction.objects.bulk_create([
+            Transaction(user=self.user, account_ref='GR2', transaction_id='p1', booking_date=self.today,
+                        amount=Decimal('-30'), status='pending'),
+            Transaction(user=self.user, account_ref='GR3', transaction_id='t1', booking_date=self.today,
+                        amount=Decimal('-5000'), status='booked'),
+        ])
+        RecurringPayment.objects.create(
+            user=self.user, merchant_key='STREAM', display_name='Stream', first_date=self.today - timedelta(days=60),
+            last_date=self.today - timedelta(days=25), interval_mean=30, last_amount=Decimal('12.99'),
+            is_subscription=True, cadence='monthly', next_expected=self.today + timedelta(days=5),
+        )
+
+    def test_figure_is_built_on_the_reported_balances(self):
+        safe = refresh_user('saver', self.today)
+        self.assertEqual((safe.booked_balance, safe.pending, safe.available), (1200, -30, 1120))
+        self.assertEqual(safe.upcoming_debits, Decimal('12.99'))
+        self.assertEqual(safe.amount, Decimal('1107.01'))
+        self.assertEqual(safe.next_income, self.today + timedelta(days=30))
+
+    def test_balance_changes_refresh_the_figure(self):
+        AccountSyncState.objects.filter(account_ref='GR1').update(available_balance=50)
+        with mock.patch.object(signals.safe_to_spend_refreshed, 'send') as send:
+            account_balances_updated.send(sender=AccountSyncState, user_id='saver', account_ref='GR1', state=None)
+        safe = send.call_args.kwargs['safe']
+        self.assertEqual(safe.available, 220)
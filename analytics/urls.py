@@ -0,0 +1,14 @@
+from django.urls import path
+from . import views
+
+app_name = 'analytics'
+
+urlpatterns = [
+    path('api/analytics/monthly/', views.MonthlyTotalsView.as_view(), name='monthly_totals'),
+    path('api/analytics/monthly/<int:year>/<int:month>/', views.MonthlySummaryView.as_view(), name='monthly_summary'),
+    path('api/analytics/insights/', views.InsightsView.as_view(), name='insights'),
+    path('api/analytics/safe-to-spend/', views.SafeToSpendView.as_view(), name='safe_to_spend'),
+    path('api/analytics/accounts/<str:account_ref>/balances/', views.BalanceHistoryView.as_view(), name='balance_history'),
+    path('api/analytics/accounts/<str:account_ref>/running-balance/', views.RunningBalanceView.as_view(),
+         name='running_balance'),
+]
@@ -0,0 +1,152 @@
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db.models import F, Sum, Window
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from transactions.models import Transaction
+from .balances import daily_series, opening_balances
+from .engine import TransactionArrays, insights
+from .forms import (
+    DailyBalanceSerializer, MonthlySummarySerializer, MonthlyTotalSerializer, RunningBalanceSerializer,
+    SafeToSpendSerializer,
+)
+from .models import DailyBalance, MonthlySummary
+from .safe_to_spend import current
+
+
+class MonthlyTotalsView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        """Spending and income per month and currency (?months=N, default 12, max 60)."""
+        try:
+            months = min(max(int(request.query_params.get('months', 12)), 1), 60)
+        except ValueError:
+            return Response({'error': 'months must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        today = timezone.localdate()
+        index = today.year * 12 + today.month - 1 - (months - 1)
+        since = date(index // 12, index % 12 + 1, 1)
+        totals = (
+            MonthlySummary.objects
+            .filter(user=request.user, month__gte=since)
+            .values('month', 'currency')
+            .annotate(spent=Sum('spent'), income=Sum('income'), transaction_count=Sum('transaction_count'))
+            .order_by('-month', 'currency')
+        )
+        return Response({
+            'since': f"{since:%Y-%m}",
+            'months': MonthlyTotalSerializer(totals, many=True).data,
+        }, status=status.HTTP_200_OK)
+
+
+class MonthlySummaryView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, year, month):
+        """Spending and income per category for one month."""
+        if not 1 <= month <= 12:
+            return Response({'error': 'month must be between 1 and 12'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        summaries = list(
+            MonthlySummary.objects
+            .filter(user=request.user, month=date(year, month, 1))
+            .order_by('currency', '-spent', 'category')
+        )
+        refreshed_at = max((summary.refreshed_at for summary in summaries), default=None)
+        return Response({
+            'month': f"{year:04d}-{month:02d}",
+            'refreshed_at': refreshed_at,
+            'categories': MonthlySummarySerializer(summaries, many=True).data,
+        }, status=status.HTTP_200_OK)
+
+
+class BalanceHistoryView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, account_ref):
+        """End-of-day balances of one account for the last N days (?days=N, default 365, max 1825)."""
+        try:
+            days = min(max(int(request.query_params.get('days', 365)), 1), 1825)
+        except ValueError:
+            return Response({'error': 'days must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not DailyBalance.objects.filter(user=request.user, account_ref=account_ref).exists():
+            return Response({'error': 'No balance history for this account'}, status=status.HTTP_404_NOT_FOUND)
+        
+        end = timezone.localdate()
+        start = end - timedelta(days=days - 1)
+        series = daily_series(request.user.pk, account_ref, start, end)
+        return Response({
+            'account_ref': account_ref,
+            'from': start,
+            'to': end,
+            'balances': DailyBalanceSerializer(series, many=True).data,
+        }, status=status.HTTP_200_OK)
+
+
+class RunningBalanceView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, account_ref):
+        """Booked transactions of one account for a month with the balance after each (?month=YYYY-MM)."""
+        month = request.query_params.get('month')
+        try:
+            start = date.fromisoformat(f"{month}-01") if month else timezone.localdate().replace(day=1)
+        except ValueError:
+            return Response({'error': 'month must be formatted YYYY-MM'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Running sum within the month, on top of the closing balance before it
+        opening = opening_balances(request.user.pk, account_ref, start)
+        transactions = list(
+            Transaction.objects
+            .for_month(request.user, start.year, start.month)
+            .filter(account_ref=account_ref, status='booked')
+            .for_listing()
+            .annotate(running_balance=Window(
+                Sum('amount'), partition_by=[F('currency')], order_by=[F('booking_date').asc(), F('id').asc()],
+            ))
+            .order_by('booking_date', 'id')
+        )
+        for transaction in transactions:
+            balance = opening.get(transaction.currency)
+            transaction.running_balance = None if balance is None else balance + transaction.running_balance
+        
+        return Response({
+            'account_ref': account_ref,
+            'month': f"{start:%Y-%m}",
+            'opening_balances': {
+                currency: None if balance is None else str(balance) for currency, balance in opening.items()
+            },
+            'transactions': RunningBalanceSerializer(transactions, many=True).data,
+        }, status=status.HTTP_200_OK)
+
+
+class InsightsView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        """Spending trends, month-over-month changes, categories and percentiles (?months=N, default 12, max 36)."""
+        try:
+            months = min(max(int(request.query_params.get('months', 12)), 2), 36)
+        except ValueError:
+            return Response({'error': 'months must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        currency = request.query_params.get('currency', request.user.currency).upper()
+        
+        data = TransactionArrays.load(request.user.pk, currency)
+        return Response(insights(data, months), status=status.HTTP_200_OK)
+
+
+class SafeToSpendView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        """Available balance minus subscription debits due before the next salary, as last computed."""
+        response = Response(SafeToSpendSerializer(current(request.user.pk)).data, status=status.HTTP_200_OK)
+        patch_cache_control(response, private=True, max_age=settings.SAFE_TO_SPEND_CACHE_SECONDS)
+        return response
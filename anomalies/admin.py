@@ -0,0 +1,30 @@
+from django.contrib import admin
+from .models import KnownMerchant, SpendingAnomaly, SpendingBaseline
+
+
+class SpendingBaselineAdmin(admin.ModelAdmin):
+    list_display = ('user', 'category', 'currency', 'observations', 'mean', 'variance', 'updated_at')
+    list_filter = ('currency',)
+    search_fields = ('user__username', 'category')
+    raw_id_fields = ('user',)
+    ordering = ('user', 'category')
+
+
+class KnownMerchantAdmin(admin.ModelAdmin):
+    list_display = ('user', 'merchant_key', 'first_seen', 'last_seen')
+    search_fields = ('user__username', 'merchant_key')
+    raw_id_fields = ('user',)
+    ordering = ('user', 'merchant_key')
+
+
+class SpendingAnomalyAdmin(admin.ModelAdmin):
+    list_display = ('user', 'booking_date', 'counterparty', 'amount', 'currency', 'category', 'score', 'reasons')
+    list_filter = ('currency', 'booking_date')
+    search_fields = ('user__username', 'counterparty', 'category')
+    raw_id_fields = ('user',)
+    ordering = ('-booking_date', 'user')
+
+
+admin.site.register(SpendingBaseline, SpendingBaselineAdmin)
+admin.site.register(KnownMerchant, KnownMerchantAdmin)
+admin.site.register(SpendingAnomaly, SpendingAnomalyAdmin)
@@ -0,0 +1,167 @@
+"""
+Streaming detection of unusual debits.
+
+Every debit is scored once, when it is ingested, against the user's
+``SpendingBaseline`` for its category: an exponentially weighted mean and
+variance of ``log(1 + amount)``. The score is how many standard deviations
+the debit lies above that mean; the baseline is then updated in O(1), so no
+history is rescanned. A debit to a counterparty the user never paid before
+(``KnownMerchant``) counts as unusual at a lower score.
+
+Only booked debits are scored: a pending entry may still change amount, or
+book under a new id. ``score_user`` records every debit it folds in as a
+``ScoredDebit`` keyed by the bank's (account, transaction id), which survives
+the re-insert of a row whose booking date moved, so it can be run after each
+ingest, and again, without double counting.
+"""
+
+import logging
+import math
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from subscriptions.detector import normalize_counterparty
+from transactions.models import Transaction
+from .models import DetectorCursor, KnownMerchant, ScoredDebit, SpendingAnomaly, SpendingBaseline
+from .signals import anomalies_detected
+
+logger = logging.getLogger(__name__)
+
+MIN_STD = 0.25  # in log space; keeps near-identical amounts from making every change look extreme
+
+
+def ewma(mean, variance, value, alpha):
+    """Fold ``value`` into an exponentially weighted (mean, variance)."""
+    delta = value - mean
+    increment = alpha * delta
+    return mean + increment, (1 - alpha) * (variance + delta * increment)
+
+
+def observe(baseline, value, alpha=None):
+    """Update ``baseline`` with one debit (``value`` in log space)."""
+    alpha = alpha or settings.ANOMALY_EWMA_ALPHA
+    if baseline.observations >= settings.ANOMALY_MIN_OBSERVATIONS:
+        # Cap outliers at the alert threshold, so one huge debit does not mask the next unusual ones
+        value = min(value, baseline.mean + settings.ANOMALY_Z_THRESHOLD * max(math.sqrt(baseline.variance), MIN_STD))
+    # Plain running mean until there are 1/alpha observations, so early values are not over-weighted
+    baseline.mean, baseline.variance = ewma(baseline.mean, baseline.variance, value,
+                                            max(alpha, 1 / (baseline.observations + 1)))
+    baseline.observations += 1
+
+
+def z_score(baseline, value):
+    """Standard deviations ``value`` lies above the baseline mean; 0 while it has no observations."""
+    if not baseline.observations:
+        return 0.0
+    return (value - baseline.mean) / max(math.sqrt(baseline.variance), MIN_STD)
+
+
+def score_debit(baseline, value, novel, history):
+    """Reasons (``SpendingAnomaly.REASON_CHOICES``) to flag a debit, and its score.
+
+    ``novel`` is whether its merchant is new to the user and ``history`` the
+    number of debits the user had before it.
+    """
+    min_observations = settings.ANOMALY_MIN_OBSERVATIONS
+    warmed_up = baseline.observations >= min_observations
+    score = z_score(baseline, value) if warmed_up else 0.0
+    reasons = []
+    if warmed_up and score >= settings.ANOMALY_Z_THRESHOLD:
+        reasons.append('amount')
+    if novel and history >= min_observations and (not warmed_up or score >= settings.ANOMALY_NEW_MERCHANT_Z_THRESHOLD):
+        reasons.append('new_merchant')
+    return reasons, score
+
+
+def score_user(user_id):
+    """Score and fold in the user's booked debits not scored yet. Returns the new ``SpendingAnomaly`` rows."""
+    with transaction.atomic():
+        # Serializes concurrent runs for the same user; the second one sees the first one's ScoredDebit rows
+        cursor, _ = DetectorCursor.objects.select_for_update().get_or_create(user_id=user_id)
+        started = timezone.now()
+        debits = Transaction.objects.filter(user_id=user_id, status='booked', amount__lt=0)
+        if cursor.scanned_until:
+            debits = debits.filter(
+                created_at__gte=cursor.scanned_until - timedelta(minutes=settings.ANOMALY_RESCAN_MINUTES),
+            )
+        already_scored = ScoredDebit.objects.filter(
+            user_id=user_id, account_ref=OuterRef('account_ref'), transaction_id=OuterRef('transaction_id'),
+        )
+        rows = list(
+            debits
+            .exclude(Exists(already_scored))
+            .order_by('booking_date', 'id')
+            .values_list('account_ref', 'transaction_id', 'booking_date', 'amount', 'currency', 'category',
+                         'counterparty')
+            .iterator(chunk_size=2000)
+        )
+        cursor.scanned_until = started
+        if not rows:
+            cursor.save()
+            return []
+
+        baselines = {
+            (baseline.category, baseline.currency): baseline
+            for baseline in SpendingBaseline.objects.filter(user_id=user_id)
+        }
+        keys = {normalize_counterparty(row[6]) for row in rows} - {''}
+        known = set(
+            KnownMerchant.objects.filter(user_id=user_id, merchant_key__in=keys).values_list('merchant_key', flat=True)
+        )
+        seen, scored, anomalies = {}, {}, []
+        for account_ref, transaction_id, day, amount, currency, category, counterparty in rows:
+            if (account_ref, transaction_id) in scored:
+                continue
+            scored[(account_ref, transaction_id)] = ScoredDebit(
+                user_id=user_id, account_ref=account_ref, transaction_id=transaction_id,
+            )
+            debit = -amount
+            value = math.log1p(float(debit))
+            baseline = baselines.get((category, currency))
+            if baseline is None:
+                baseline = baselines[(category, currency)] = SpendingBaseline(
+                    user_id=user_id, category=category, currency=currency,
+                )
+            key = normalize_counterparty(counterparty)
+            reasons, score = score_debit(baseline, value, bool(key) and key not in known, cursor.scored)
+            if reasons:
+                anomalies.append(SpendingAnomaly(
+                    user_id=user_id, account_ref=account_ref, transaction_id=transaction_id, booking_date=day,
+                    amount=debit, currency=currency, category=category, counterparty=counterparty, score=round(score, 2),
+                    expected_amount=Decimal(f"{math.expm1(baseline.mean):.2f}"), reasons=reasons,
+                ))
+            if key:
+                known.add(key)
+                first, last = seen.get(key, (day, day))
+                seen[key] = (min(first, day), max(last, day))
+            observe(baseline, value)
+            cursor.scored += 1
+
+        SpendingBaseline.objects.bulk_create(
+            baselines.values(), update_conflicts=True, unique_fields=['user', 'category', 'currency'],
+            update_fields=['observations', 'mean', 'variance', 'updated_at'],
+        )
+        KnownMerchant.objects.bulk_create(
+            [KnownMerchant(user_id=user_id, merchant_key=key, first_seen=first, last_seen=last)
+             for key, (first, last) in seen.items()],
+            update_conflicts=True, unique_fields=['user', 'merchant_key'], update_fields=['last_seen'],
+        )
+        ScoredDebit.objects.bulk_create(scored.values(), ignore_conflicts=True)
+        SpendingAnomaly.objects.bulk_create(anomalies, ignore_conflicts=True)
+        cursor.save()
+
+        # Backfilled history is recorded, but only recent debits are worth an alert
+        recent = timezone.localdate() - timedelta(days=settings.ANOMALY_ALERT_DAYS)
+        alerts = [anomaly for anomaly in anomalies if anomaly.booking_date >= recent]
+        if alerts:
+            transaction.on_commit(lambda: anomalies_detected.send(
+                sender=SpendingAnomaly, user_id=user_id, anomalies=alerts,
+            ))
+    logger.info("Scored %d debit(s) of %s: %d anomal%s", len(scored), user_id, len(anomalies),
+                'y' if len(anomalies) == 1 else 'ies')
+    return anomalies
@@ -0,0 +1,13 @@
+from rest_framework import serializers
+from .models import SpendingAnomaly
+
+
+# DRF Serializers (for REST API)
+class SpendingAnomalySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SpendingAnomaly
+        fields = (
+            'id', 'account_ref', 'booking_date', 'amount', 'currency', 'category', 'counterparty',
+            'score', 'expected_amount', 'reasons', 'created_at',
+        )
+        read_only_fields = fields
@@ -0,0 +1,82 @@
+# Generated by Django 5.2.3 on 2026-10-18 07:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('accounts', '0005_bankconsent'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DetectorCursor',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='anomaly_cursor', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('last_transaction_id', models.BigIntegerField(default=0)),
+                ('scored', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='KnownMerchant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('merchant_key', models.CharField(max_length=140)),
+                ('first_seen', models.DateField()),
+                ('last_seen', models.DateField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='known_merchants', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'merchant_key'), name='unique_known_merchant')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SpendingAnomaly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('transaction_pk', models.BigIntegerField()),
+                ('account_ref', models.CharField(max_length=64)),
+                ('booking_date', models.DateField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('currency', models.CharField(default='EUR', max_length=3)),
+                ('category', models.CharField(blank=True, max_length=50)),
+                ('counterparty', models.CharField(blank=True, max_length=140)),
+                ('score', models.FloatField()),
+                ('expected_amount', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('reasons', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='spending_anomalies', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Spending anomaly',
+                'verbose_name_plural': 'Spending anomalies',
+                'indexes': [models.Index(fields=['user', '-booking_date'], name='anomaly_user_booking_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'transaction_pk'), name='unique_spending_anomaly')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SpendingBaseline',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(blank=True, max_length=50)),
+                ('currency', models.CharField(default='EUR', max_length=3)),
+                ('observations', models.PositiveIntegerField(default=0)),
+                ('mean', models.FloatField(default=0)),
+                ('variance', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='spending_baselines', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Spending baseline',
+                'verbose_name_plural': 'Spending baselines',
+                'constraints': [models.UniqueConstraint(fields=('user', 'category', 'currency'), name='unique_spending_baseline')],
+            },
+        ),
+    ]
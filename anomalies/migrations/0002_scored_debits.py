@@ -0,0 +1,81 @@
+# Generated by Django 5.2.3 on 2026-10-18 11:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def key_by_bank_id(apps, schema_editor):
+    """Record the debits the id cursor already scored, and key anomalies by the bank's transaction id."""
+    DetectorCursor = apps.get_model('anomalies', 'DetectorCursor')
+    ScoredDebit = apps.get_model('anomalies', 'ScoredDebit')
+    SpendingAnomaly = apps.get_model('anomalies', 'SpendingAnomaly')
+    Transaction = apps.get_model('transactions', 'Transaction')
+    for cursor in DetectorCursor.objects.filter(last_transaction_id__gt=0).iterator():
+        scored = Transaction.objects.filter(
+            user_id=cursor.user_id, id__lte=cursor.last_transaction_id, amount__lt=0,
+        ).values_list('account_ref', 'transaction_id').iterator(chunk_size=2000)
+        ScoredDebit.objects.bulk_create(
+            (ScoredDebit(user_id=cursor.user_id, account_ref=account_ref, transaction_id=transaction_id)
+             for account_ref, transaction_id in scored),
+            batch_size=1000, ignore_conflicts=True,
+        )
+    for anomaly in SpendingAnomaly.objects.iterator():
+        # The row may have been deleted since; its old pk still tells the anomalies apart
+        anomaly.transaction_id = Transaction.objects.filter(pk=anomaly.transaction_pk).values_list(
+            'transaction_id', flat=True,
+        ).first() or f"#{anomaly.transaction_pk}"
+        anomaly.save(update_fields=['transaction_id'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('anomalies', '0001_initial'),
+        ('transactions', '0004_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoredDebit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('account_ref', models.CharField(max_length=64)),
+                ('transaction_id', models.CharField(max_length=100)),
+                ('scored_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scored_debits', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'account_ref', 'transaction_id'), name='unique_scored_debit')],
+            },
+        ),
+        migrations.AddField(
+            model_name='detectorcursor',
+            name='scanned_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='spendinganomaly',
+            name='transaction_id',
+            field=models.CharField(default='', max_length=100),
+            preserve_default=False,
+        ),
+        migrations.RunPython(key_by_bank_id, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='spendinganomaly',
+            name='unique_spending_anomaly',
+        ),
+        migrations.RemoveField(
+            model_name='spendinganomaly',
+            name='transaction_pk',
+        ),
+        migrations.RemoveField(
+            model_name='detectorcursor',
+            name='last_transaction_id',
+        ),
+        migrations.AddConstraint(
+            model_name='spendinganomaly',
+            constraint=models.UniqueConstraint(fields=('user', 'account_ref', 'transaction_id'), name='unique_spending_anomaly'),
+        ),
+    ]
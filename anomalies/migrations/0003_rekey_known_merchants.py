@@ -0,0 +1,37 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:20
+
+from django.db import migrations
+
+from subscriptions.detector import normalize_counterparty
+
+
+def rekey_known_merchants(apps, schema_editor):
+    """Rebuild known merchants under the accent-folding merchant key, from the users' booked debits."""
+    DetectorCursor = apps.get_model('anomalies', 'DetectorCursor')
+    KnownMerchant = apps.get_model('anomalies', 'KnownMerchant')
+    Transaction = apps.get_model('transactions', 'Transaction')
+    for user_id in DetectorCursor.objects.values_list('user_id', flat=True).iterator():
+        seen = {}
+        debits = Transaction.objects.filter(user_id=user_id, status='booked', amount__lt=0).exclude(counterparty='')
+        for counterparty, day in debits.values_list('counterparty', 'booking_date').iterator(chunk_size=2000):
+            key = normalize_counterparty(counterparty)
+            if key:
+                first, last = seen.get(key, (day, day))
+                seen[key] = (min(first, day), max(last, day))
+        KnownMerchant.objects.filter(user_id=user_id).delete()
+        KnownMerchant.objects.bulk_create(
+            [KnownMerchant(user_id=user_id, merchant_key=key, first_seen=first, last_seen=last)
+             for key, (first, last) in seen.items()],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('anomalies', '0002_scored_debits'),
+    ]
+
+    operations = [
+        migrations.RunPython(rekey_known_merchants, migrations.RunPython.noop),
+    ]
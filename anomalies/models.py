@@ -0,0 +1,116 @@
+from django.conf import settings
+from django.db import models
+
+
+class SpendingBaseline(models.Model):
+    """Exponentially weighted statistics of one user's debit sizes in one category and currency.
+    
+    ``mean`` and ``variance`` are an EWMA of ``log(1 + amount)`` (spending is
+    heavily right-skewed), updated in O(1) by ``anomalies.detector`` for every
+    new debit; recent spending weighs more, so baselines follow gradual change.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='spending_baselines')
+    category = models.CharField(max_length=50, blank=True)  # '' while uncategorized
+    currency = models.CharField(max_length=3, default='EUR')
+    observations = models.PositiveIntegerField(default=0)
+    mean = models.FloatField(default=0)
+    variance = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Spending baseline'
+        verbose_name_plural = 'Spending baselines'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'category', 'currency'], name='unique_spending_baseline'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} {self.category or 'uncategorized'} {self.currency} (n={self.observations})"
+
+
+class KnownMerchant(models.Model):
+    """A (normalized) counterparty the user has paid before."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='known_merchants')
+    merchant_key = models.CharField(max_length=140)
+    first_seen = models.DateField()
+    last_seen = models.DateField()
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'merchant_key'], name='unique_known_merchant'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} {self.merchant_key}"
+
+
+class DetectorCursor(models.Model):
+    """When the detector last looked for a user's new debits; also the lock that serializes its runs.
+    
+    Only rows created since ``scanned_until`` (less ``ANOMALY_RESCAN_MINUTES``,
+    as ingest chunks can commit out of order) are looked at again; whether a
+    debit was already scored is decided by ``ScoredDebit``.
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True,
+                                related_name='anomaly_cursor')
+    scanned_until = models.DateTimeField(null=True, blank=True)  # null until the first run
+    scored = models.PositiveIntegerField(default=0)  # debits folded into the baselines so far
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.user_id} @ {self.scanned_until}"
+
+
+class ScoredDebit(models.Model):
+    """A booked debit already folded into the user's baselines.
+    
+    Keyed by the bank's (account, transaction id): an entry whose booking date
+    moves is deleted and re-inserted under a new ``Transaction.id``, and must
+    not be scored twice.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='scored_debits')
+    account_ref = models.CharField(max_length=64)
+    transaction_id = models.CharField(max_length=100)
+    scored_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'account_ref', 'transaction_id'], name='unique_scored_debit'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} {self.account_ref} {self.transaction_id}"
+
+
+class SpendingAnomaly(models.Model):
+    """A debit that was unusual for the user when it was ingested."""
+    REASON_CHOICES = [
+        ('amount', 'Unusually large for the category'),
+        ('new_merchant', 'First payment to this merchant'),
+    ]
+    
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='spending_anomalies')
+    account_ref = models.CharField(max_length=64)
+    transaction_id = models.CharField(max_length=100)  # the bank's id; no FK, the table is partitioned
+    booking_date = models.DateField()
+    amount = models.DecimalField(max_digits=14, decimal_places=2)  # the debit, as a positive amount
+    currency = models.CharField(max_length=3, default='EUR')
+    category = models.CharField(max_length=50, blank=True)
+    counterparty = models.CharField(max_length=140, blank=True)
+    score = models.FloatField()  # standard deviations above the category baseline
+    expected_amount = models.DecimalField(max_digits=14, decimal_places=2)  # typical debit in the category
+    reasons = models.JSONField(default=list)  # values of REASON_CHOICES
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Spending anomaly'
+        verbose_name_plural = 'Spending anomalies'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'account_ref', 'transaction_id'], name='unique_spending_anomaly'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-booking_date'], name='anomaly_user_booking_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} {self.booking_date} {self.amount} {self.currency} {self.counterparty} ({self.score:.1f})"
@@ -0,0 +1,15 @@
+from django.dispatch import Signal, receiver
+
+from transactions.signals import transactions_ingested
+
+# Sent once unusual debits are committed.
+# Arguments: user_id, anomalies (list of recent SpendingAnomaly instances)
+anomalies_detected = Signal()
+
+
+@receiver(transactions_ingested, dispatch_uid='anomalies_score_transactions')
+def score_on_ingest(sender, user_id, rows, **kwargs):
+    """Queue scoring of the debits the batch added."""
+    if rows:
+        from .tasks import score_transactions
+        score_transactions.delay(user_id)
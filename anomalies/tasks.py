@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from .detector import score_user
+
+
+@shared_task
+def score_transactions(user_id):
+    """Score the user's newly ingested debits against their spending baselines."""
+    return len(score_user(user_id))
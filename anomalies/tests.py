@@ -0,0 +1,107 @@
+import math
+from datetime import timedelta
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from accounts.models import User
+from accounts.piraeus.sync import SyncBatch
+from transactions.ingest import ingest_sync_batch
+from .detector import observe, score_debit, score_user
+from .models import DetectorCursor, KnownMerchant, ScoredDebit, SpendingAnomaly, SpendingBaseline
+
+DETECTOR_SETTINGS = dict(ANOMALY_EWMA_ALPHA=0.1, ANOMALY_MIN_OBSERVATIONS=10, ANOMALY_Z_THRESHOLD=3.0,
+                         ANOMALY_NEW_MERCHANT_Z_THRESHOLD=1.0)
+
+
+def entry(transaction_id, booking_date, amount, creditor):
+    return {
+        'transactionId': transaction_id,
+        'bookingDate': booking_date.isoformat(),
+        'transactionAmount': {'amount': amount, 'currency': 'EUR'},
+        'creditorName': creditor,
+    }
+
+
+@override_settings(**DETECTOR_SETTINGS)
+class BaselineTests(SimpleTestCase):
+    def warmed_up(self):
+        baseline = SpendingBaseline(category='groceries', currency='EUR')
+        for amount in [20, 25, 30, 22, 28, 24, 26, 21, 29, 25]:
+            observe(baseline, math.log1p(amount))
+        return baseline
+
+    def test_nothing_is_flagged_before_warm_up(self):
+        baseline = SpendingBaseline(category='groceries', currency='EUR')
+        observe(baseline, math.log1p(20))
+        self.assertEqual(score_debit(baseline, math.log1p(5000), novel=False, history=50), ([], 0.0))
+
+    def test_large_debit_is_flagged(self):
+        baseline = self.warmed_up()
+        reasons, score = score_debit(baseline, math.log1p(400), novel=False, history=10)
+        self.assertEqual(reasons, ['amount'])
+        self.assertGreater(score, 3)
+        self.assertEqual(score_debit(baseline, math.log1p(27), novel=False, history=10)[0], [])
+
+    def test_new_merchant_needs_a_somewhat_high_amount(self):
+        baseline = self.warmed_up()
+        self.assertEqual(score_debit(baseline, math.log1p(24), novel=True, history=10)[0], [])
+        self.assertEqual(score_debit(baseline, math.log1p(40), novel=True, history=10)[0], ['new_merchant'])
+
+    def test_outliers_are_capped_when_folded_in(self):
+        baseline = self.warmed_up()
+        mean = baseline.mean
+        observe(baseline, math.log1p(100_000))
+        # One huge debit must not lift the baseline enough to hide the next unusual one
+        self.assertLess(baseline.mean - mean, 0.5)
+        self.assertEqual(score_debit(baseline, math.log1p(400), novel=False, history=11)[0], ['amount'])
+
+
+@override_settings(**DETECTOR_SETTINGS)
+class ScoreUserTests(TestCase):
+    def setUp(self):
+        User.objects.create(username='spender', email='spender@example.com')
+        self.today = timezone.localdate()
+        history = [
+            entry(f"h{i}", self.today - timedelta(days=40 - i), f"-{20 + i % 7}.00", ('SHOP A', 'SHOP B')[i % 2])
+            for i in range(20)
+        ]
+        self.sync(booked=history)
+        self.assertEqual(score_user('spender'), [])
+
+    def sync(self, **changes):
+        ingest_sync_batch(SyncBatch(user_id='spender', account_ref='GR1', resource_id='acc-1', **changes))
+
+    def test_unusual_debit_is_flagged_once(self):
+        self.sync(booked=[entry('big', self.today, '-450.00', 'SHOP A'), entry('ok', self.today, '-23.00', 'SHOP B')])
+        anomalies = score_user('spender')
+        self.assertEqual([(a.transaction_id, a.reasons) for a in anomalies], [('big', ['amount'])])
+        self.assertEqual(score_user('spender'), [])
+        self.assertEqual(DetectorCursor.objects.get(user_id='spender').scored, 22)
+        self.assertTrue(KnownMerchant.objects.filter(user_id='spender', merchant_key='SHOP').exists())
+
+    def test_moved_debit_is_not_scored_twice(self):
+        self.sync(booked=[entry('big', self.today - timedelta(days=1), '-450.00', 'SHOP A')])
+        self.assertEqual(len(score_user('spender')), 1)
+        baseline = SpendingBaseline.objects.get(user_id='spender')
+        # The bank moves the booking date: the row is deleted and re-inserted under a new id
+        self.sync(booked=[entry('big', self.today, '-450.00', 'SHOP A')])
+        self.assertEqual(score_user('spender'), [])
+        self.assertEqual(SpendingBaseline.objects.get(user_id='spender').observations, baseline.observations)
+        self.assertEqual(SpendingAnomaly.objects.filter(user_id='spender').count(), 1)
+
+    def test_pending_debits_wait_until_booked(self):
+        self.sync(pending=[entry('p1', self.today, '-450.00', 'SHOP A')])
+        self.assertEqual(score_user('spender'), [])
+        self.assertFalse(ScoredDebit.objects.filter(transaction_id='p1').exists())
+        # Booked under a new id; the pending row is deleted and only the booked one counts
+        self.sync(booked=[entry('b1', self.today, '-450.00', 'SHOP A')], settled={'p1': 'b1'})
+        self.assertEqual([a.transaction_id for a in score_user('spender')], ['b1'])
+        self.assertEqual(DetectorCursor.objects.get(user_id='spender').scored, 21)
+
+    def test_late_commits_inside_the_rescan_window_are_scored(self):
+        cursor = DetectorCursor.objects.get(user_id='spender')
+        self.sync(booked=[entry('late', self.today, '-450.00', 'SHOP A')])
+        # The row was created before the previous run finished scanning, as a chunk committing late would be
+        DetectorCursor.objects.filter(pk=cursor.pk).update(scanned_until=timezone.now() + timedelta(minutes=30))
+        self.assertEqual([a.transaction_id for a in score_user('spender')], ['late'])
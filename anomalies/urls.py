@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = 'anomalies'
+
+urlpatterns = [
+    path('api/anomalies/', views.AnomalyListView.as_view(), name='anomaly_list'),
+]
@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from .forms import SpendingAnomalySerializer
+from .models import SpendingAnomaly
+
+
+class AnomalyListView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        """Unusual debits booked in the last ?days=N days (default 30, max 365), newest first."""
+        try:
+            days = min(max(int(request.query_params.get('days', 30)), 1), 365)
+        except ValueError:
+            return Response({'error': 'days must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        anomalies = SpendingAnomaly.objects.filter(
+            user=request.user, booking_date__gte=timezone.localdate() - timedelta(days=days),
+        ).order_by('-booking_date', '-id')
+        serializer = SpendingAnomalySerializer(anomalies, many=True)
+        return Response({
+            'count': len(serializer.data),
+            'anomalies': serializer.data,
+        }, status=status.HTTP_200_OK)
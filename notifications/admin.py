@@ -0,0 +1,30 @@
+from django.contrib import admin
+from .models import AlertEvent, AlertRule, Notification
+
+
+class AlertRuleAdmin(admin.ModelAdmin):
+    list_display = ('user', 'trigger_type', 'threshold', 'category', 'account_ref', 'days_before', 'is_active')
+    list_filter = ('trigger_type', 'is_active')
+    search_fields = ('user__username', 'category', 'account_ref')
+    raw_id_fields = ('user',)
+    ordering = ('user', 'trigger_type')
+
+
+class AlertEventInline(admin.TabularInline):
+    model = AlertEvent
+    fields = ('rule', 'key', 'title', 'created_at')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('user', 'title', 'event_count', 'created_at', 'delivered_at', 'read_at')
+    search_fields = ('user__username', 'title')
+    raw_id_fields = ('user',)
+    ordering = ('-created_at',)
+    inlines = [AlertEventInline]
+
+
+admin.site.register(AlertRule, AlertRuleAdmin)
+admin.site.register(Notification, NotificationAdmin)
@@ -0,0 +1,282 @@
+"""
+Alert rule evaluation, driven by data changes instead of polling.
+
+Each kind of change maps to the trigger types it can affect:
+
+- bank balances, pending entries or subscriptions refreshed
+  (``safe_to_spend_refreshed``): ``low_balance``, ``bill_due``
+- monthly summaries refreshed: ``budget_limit``
+- transactions ingested: ``salary_received``
+- unusual debits detected: ``unusual_spend``
+
+``active_triggers`` keeps the set of trigger types each user has active
+rules for in the cache, so changes nobody has a rule for are dropped before
+any task is queued. ``evaluate`` then loads only the user's active rules of
+the affected types (one lookup on the partial (user, trigger_type) index)
+and checks them against the changed data. New events are deduplicated by
+(rule, key) and coalesced into the user's open ``Notification``, delivered
+``NOTIFICATION_COALESCE_SECONDS`` after it was opened.
+"""
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import send_mail
+from django.db import connection, transaction
+from django.utils import timezone
+
+from accounts.models import AccountSyncState, User
+from analytics.models import MonthlySummary
+from anomalies.models import SpendingAnomaly
+from subscriptions.models import RecurringPayment
+from transactions.models import Transaction
+from .models import AlertEvent, AlertRule, Notification
+
+logger = logging.getLogger(__name__)
+
+TRIGGERS_CACHE_KEY = 'alerts:triggers:{}'
+WAKEUP_CACHE_KEY = 'alerts:wakeup:{}:{}'
+
+# Events that already fired are skipped by the unique (rule, key) constraint; RETURNING tells which were new
+INSERT_EVENTS = f"""
+INSERT INTO {AlertEvent._meta.db_table} (rule_id, user_id, key, title, created_at)
+VALUES {{}}
+ON CONFLICT (rule_id, key) DO NOTHING
+RETURNING id, rule_id, key
+"""
+
+
+def active_triggers(user_id):
+    """Trigger types the user has active rules for.
+
+    Cached until one of their rules changes, and at most
+    ``NOTIFICATION_RULE_CACHE_SECONDS`` (a per-process cache cannot be cleared
+    from other workers).
+    """
+    key = TRIGGERS_CACHE_KEY.format(user_id)
+    triggers = cache.get(key)
+    if triggers is None:
+        triggers = set(
+            AlertRule.objects.filter(user_id=user_id, is_active=True).values_list('trigger_type', flat=True).distinct()
+        )
+        cache.set(key, triggers, settings.NOTIFICATION_RULE_CACHE_SECONDS)
+    return triggers
+
+
+def forget_triggers(user_id):
+    cache.delete(TRIGGERS_CACHE_KEY.format(user_id))
+
+
+def low_balance(rules, user_id, context, today):
+    """Accounts whose balance, as the bank last reported it, is below the rule's threshold.
+
+    The available balance is used where the bank reports one, else the booked
+    one; each account fires once per balance day.
+    """
+    balances = [
+        (account_ref, currency, day, booked if available is None else available)
+        for account_ref, currency, day, available, booked in AccountSyncState.objects
+        .filter(user_id=user_id)
+        .exclude(booked_balance__isnull=True, available_balance__isnull=True)
+        .values_list('account_ref', 'balance_currency', 'balance_date', 'available_balance', 'booked_balance')
+    ]
+    return [
+        (rule, f"{account_ref}:{currency}:{day}", f"Balance of {account_ref} is {balance} {currency}, "
+                                                  f"below your {rule.threshold} limit")
+        for account_ref, currency, day, balance in balances
+        for rule in rules
+        if rule.threshold is not None and balance < rule.threshold
+        and rule.account_ref in ('', account_ref)
+    ]
+
+
+def budget_limit(rules, user_id, context, today):
+    """Months whose spending, overall or in the rule's category, reached the threshold."""
+    months = [date.fromisoformat(month) for month in context.get('months', ())] or [today.replace(day=1)]
+    currency = User.objects.filter(pk=user_id).values_list('currency', flat=True).first()
+    spent = defaultdict(int)
+    for month, category, amount in MonthlySummary.objects.filter(
+        user_id=user_id, month__in=months, currency=currency,
+    ).values_list('month', 'category', 'spent'):
+        spent[(month, '')] += amount
+        if category:
+            spent[(month, category)] += amount
+    return [
+        (rule, f"{month:%Y-%m}", f"{rule.category or 'Total'} spending reached {spent[(month, rule.category)]} "
+                                 f"{currency} in {month:%B %Y} (budget {rule.threshold})")
+        for month in months
+        for rule in rules
+        if rule.threshold is not None and spent[(month, rule.category)] >= rule.threshold
+    ]
+
+
+def bill_due(rules, user_id, context, today):
+    """Subscriptions expected within the rule's ``days_before``, once per expected date."""
+    horizon = today + timedelta(days=max(rule.days_before for rule in rules))
+    payments = RecurringPayment.objects.filter(
+        user_id=user_id, is_subscription=True, next_expected__gte=today, next_expected__lte=horizon,
+    )
+    return [
+        (rule, f"{payment.merchant_key}:{payment.next_expected}"[:100],
+         f"{payment.display_name} ({payment.last_amount} {payment.currency}) is due on {payment.next_expected:%d/%m}")
+        for payment in payments
+        for rule in rules
+        if payment.next_expected - timedelta(days=rule.days_before) <= today
+    ]
+
+
+def bill_wakeup(rules, user_id, today):
+    """Start of tomorrow, if a reminder falls due then; the next sync may come later than that."""
+    tomorrow = today + timedelta(days=1)
+    due = RecurringPayment.objects.filter(
+        user_id=user_id, is_subscription=True,
+        next_expected__in={tomorrow + timedelta(days=rule.days_before) for rule in rules},
+    ).exists()
+    return timezone.make_aware(datetime.combine(tomorrow, time.min)) if due else None
+
+
+def salary_received(rules, user_id, context, today):
+    """Recent salary credits at least the rule's threshold (if any)."""
+    credits = Transaction.objects.filter(
+        user_id=user_id, status='booked', amount__gt=0, category=settings.SAFE_TO_SPEND_INCOME_CATEGORY,
+        booking_date__gte=today - timedelta(days=settings.NOTIFICATION_RECENT_DAYS),
+    ).values_list('id', 'amount', 'currency', 'counterparty')
+    return [
+        (rule, f"tx:{pk}", f"Salary of {amount} {currency} received{f' from {counterparty}' if counterparty else ''}")
+        for pk, amount, currency, counterparty in credits
+        for rule in rules
+        if rule.threshold is None or amount >= rule.threshold
+    ]
+
+
+def unusual_spend(rules, user_id, context, today):
+    """Debits the anomaly detector flagged, at least the rule's threshold (if any)."""
+    flagged = {tuple(pair) for pair in context.get('transactions', ())}
+    anomalies = [
+        anomaly for anomaly in SpendingAnomaly.objects.filter(
+            user_id=user_id, transaction_id__in={transaction_id for _, transaction_id in flagged},
+        )
+        if (anomaly.account_ref, anomaly.transaction_id) in flagged
+    ]
+    return [
+        (rule, f"anomaly:{anomaly.pk}",
+         f"Unusual payment of {anomaly.amount} {anomaly.currency} to {anomaly.counterparty or 'unknown'} "
+         f"(usually around {anomaly.expected_amount})")
+        for anomaly in anomalies
+        for rule in rules
+        if rule.threshold is None or anomaly.amount >= rule.threshold
+    ]
+
+
+EVALUATORS = {
+    'low_balance': low_balance,
+    'budget_limit': budget_limit,
+    'bill_due': bill_due,
+    'salary_received': salary_received,
+    'unusual_spend': unusual_spend,
+}
+
+
+@dataclass
+class Evaluation:
+    """Outcome of one ``evaluate`` call."""
+    rules: int = 0
+    events: int = 0
+    notification: Notification = None
+    opened: bool = False  # the notification was created by this evaluation and needs delivering
+    wake_at: datetime = None  # when a bill reminder falls due without new data
+
+
+def evaluate(user_id, trigger_types, context=None, today=None):
+    """Evaluate the user's active rules of ``trigger_types`` against the data that changed."""
+    context = context or {}
+    today = today or timezone.localdate()
+    result = Evaluation()
+    by_type = defaultdict(list)
+    for rule in AlertRule.objects.filter(user_id=user_id, trigger_type__in=trigger_types, is_active=True):
+        by_type[rule.trigger_type].append(rule)
+        result.rules += 1
+
+    fired = []
+    for trigger_type, rules in by_type.items():
+        fired += EVALUATORS[trigger_type](rules, user_id, context, today)
+    if 'bill_due' in by_type and not context.get('wakeup'):
+        result.wake_at = bill_wakeup(by_type['bill_due'], user_id, today)
+
+    result.notification, result.opened, result.events = record(user_id, fired)
+    return result
+
+
+def record(user_id, fired):
+    """Store events not fired before and add them to the user's open notification.
+
+    Returns ``(notification, opened, new_events)``.
+    """
+    fresh = {(rule.pk, key): (rule, key, title) for rule, key, title in fired}
+    if fresh:
+        # Cheap pre-filter; concurrent evaluations are settled by the insert below
+        existing = AlertEvent.objects.filter(
+            rule_id__in={rule_id for rule_id, _ in fresh}, key__in={key for _, key in fresh},
+        ).values_list('rule_id', 'key')
+        for pair in existing:
+            fresh.pop(pair, None)
+    if not fresh:
+        return None, False, 0
+
+    window = timezone.now() - timedelta(seconds=settings.NOTIFICATION_COALESCE_SECONDS)
+    with transaction.atomic():
+        params = []
+        for rule_id, key in fresh:
+            params += [rule_id, user_id, key, fresh[(rule_id, key)][2][:200]]
+        with connection.cursor() as cursor:
+            cursor.execute(INSERT_EVENTS.format(', '.join(['(%s, %s, %s, %s, now())'] * len(fresh))), params)
+            inserted = {(rule_id, key): pk for pk, rule_id, key in cursor.fetchall()}
+        # Only events this call inserted; a concurrent evaluation already reported the others
+        titles = [title for pair, (_, _, title) in fresh.items() if pair in inserted]
+        if not titles:
+            return None, False, 0
+
+        notification = (
+            Notification.objects.select_for_update()
+            .filter(user_id=user_id, delivered_at__isnull=True, created_at__gte=window)
+            .order_by('-created_at')
+            .first()
+        )
+        opened = notification is None
+        if opened:
+            notification = Notification(user_id=user_id)
+        notification.event_count += len(titles)
+        notification.body = '\n'.join(([notification.body] if notification.body else []) + titles)
+        notification.title = titles[0][:200] if notification.event_count == 1 else f"{notification.event_count} new alerts"
+        notification.save()
+        AlertEvent.objects.filter(pk__in=inserted.values()).update(notification=notification)
+    return notification, opened, len(titles)
+
+
+def schedule_wakeup(user_id, wake_at):
+    """Whether a bill reminder wake-up at ``wake_at`` still needs scheduling (once per user and time)."""
+    key = WAKEUP_CACHE_KEY.format(user_id, wake_at.isoformat())
+    return cache.add(key, True, timeout=max(int((wake_at - timezone.now()).total_seconds()), 1) + 3600)
+
+
+def deliver(notification_id):
+    """Close the notification to new events and send it. Returns False if it was already delivered."""
+    with transaction.atomic():
+        notification = Notification.objects.select_for_update().select_related('user').filter(
+            pk=notification_id, delivered_at__isnull=True,
+        ).first()
+        if notification is None:
+            return False
+        notification.delivered_at = timezone.now()
+        notification.save(update_fields=['delivered_at'])
+
+    if settings.NOTIFICATION_EMAIL and notification.user.email:
+        try:
+            send_mail(notification.title, notification.body, None, [notification.user.email])
+        except Exception:
+            logger.exception("Emailing notification %s to %s failed", notification.pk, notification.user_id)
+    return True
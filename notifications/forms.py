@@ -0,0 +1,27 @@
+from rest_framework import serializers
+from .models import AlertRule, Notification
+
+
+# DRF Serializers (for REST API)
+class AlertRuleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AlertRule
+        fields = (
+            'id', 'trigger_type', 'threshold', 'category', 'account_ref', 'days_before', 'is_active',
+            'created_at', 'updated_at',
+        )
+        read_only_fields = ('id', 'created_at', 'updated_at')
+    
+    def validate(self, attrs):
+        trigger_type = attrs.get('trigger_type', getattr(self.instance, 'trigger_type', None))
+        threshold = attrs.get('threshold', getattr(self.instance, 'threshold', None))
+        if trigger_type in ('low_balance', 'budget_limit') and threshold is None:
+            raise serializers.ValidationError({'threshold': 'A threshold is required for this alert.'})
+        return attrs
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Notification
+        fields = ('id', 'title', 'body', 'event_count', 'created_at', 'delivered_at', 'read_at')
+        read_only_fields = fields
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.3 on 2026-10-18 07:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigger_type', models.CharField(choices=[('low_balance', 'Account balance below threshold'), ('budget_limit', 'Monthly spending reached threshold'), ('bill_due', 'Subscription payment due soon'), ('salary_received', 'Salary received'), ('unusual_spend', 'Unusual debit')], max_length=20)),
+                ('threshold', models.DecimalField(blank=True, decimal_places=2, max_digits=14, null=True)),
+                ('category', models.CharField(blank=True, max_length=50)),
+                ('account_ref', models.CharField(blank=True, max_length=64)),
+                ('days_before', models.PositiveSmallIntegerField(default=3)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alert_rules', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Alert rule',
+                'verbose_name_plural': 'Alert rules',
+            },
+        ),
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('body', models.TextField(blank=True)),
+                ('event_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('delivered_at', models.DateTimeField(blank=True, null=True)),
+                ('read_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AlertEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100)),
+                ('title', models.CharField(max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alert_events', to=settings.AUTH_USER_MODEL)),
+                ('rule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='notifications.alertrule')),
+                ('notification', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='events', to='notifications.notification')),
+            ],
+            options={
+                'verbose_name': 'Alert event',
+                'verbose_name_plural': 'Alert events',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='alertrule',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['user', 'trigger_type'], name='alert_rule_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-created_at'], name='notification_user_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='alertevent',
+            constraint=models.UniqueConstraint(fields=('rule', 'key'), name='unique_alert_event'),
+        ),
+    ]
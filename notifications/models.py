@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.db import models
+
+
+class AlertRule(models.Model):
+    """A condition a user wants to hear about.
+    
+    Rules are only evaluated when data their trigger depends on changes (see
+    ``notifications.engine``), and are looked up by (user, trigger type).
+    """
+    TRIGGER_CHOICES = [
+        ('low_balance', 'Account balance below threshold'),
+        ('budget_limit', 'Monthly spending reached threshold'),
+        ('bill_due', 'Subscription payment due soon'),
+        ('salary_received', 'Salary received'),
+        ('unusual_spend', 'Unusual debit'),
+    ]
+    
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='alert_rules')
+    trigger_type = models.CharField(max_length=20, choices=TRIGGER_CHOICES)
+    threshold = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True)  # balance, budget or minimum amount
+    category = models.CharField(max_length=50, blank=True)  # budget_limit: '' for all spending
+    account_ref = models.CharField(max_length=64, blank=True)  # low_balance: '' for every account
+    days_before = models.PositiveSmallIntegerField(default=3)  # bill_due
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Alert rule'
+        verbose_name_plural = 'Alert rules'
+        indexes = [
+            models.Index(fields=['user', 'trigger_type'], condition=models.Q(is_active=True),
+                         name='alert_rule_active_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} {self.trigger_type} ({'active' if self.is_active else 'inactive'})"
+
+
+class Notification(models.Model):
+    """One outgoing message to a user, coalescing the alert events of a short window."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notifications')
+    title = models.CharField(max_length=200)
+    body = models.TextField(blank=True)
+    event_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)  # null while still collecting events
+    read_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='notification_user_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id}: {self.title}"
+
+
+class AlertEvent(models.Model):
+    """One firing of a rule. ``key`` identifies what it fired for, so the same condition never fires twice."""
+    rule = models.ForeignKey(AlertRule, on_delete=models.CASCADE, related_name='events')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='alert_events')
+    key = models.CharField(max_length=100)  # e.g. month, account and day, or transaction id
+    title = models.CharField(max_length=200)
+    notification = models.ForeignKey(Notification, on_delete=models.SET_NULL, null=True, blank=True,
+                                     related_name='events')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Alert event'
+        verbose_name_plural = 'Alert events'
+        constraints = [
+            models.UniqueConstraint(fields=['rule', 'key'], name='unique_alert_event'),
+        ]
+    
+    def __str__(self):
+        return f"{self.rule_id} {self.key}: {self.title}"
@@ -0,0 +1,44 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from analytics.signals import monthly_summaries_refreshed, safe_to_spend_refreshed
+from anomalies.signals import anomalies_detected
+from transactions.signals import transactions_ingested
+from .engine import active_triggers, forget_triggers
+from .models import AlertRule
+from .tasks import evaluate_alerts
+
+
+def queue(user_id, trigger_types, context=None):
+    """Queue an evaluation of the trigger types the user actually has active rules for."""
+    triggers = sorted(active_triggers(user_id) & set(trigger_types))
+    if triggers:
+        evaluate_alerts.delay(user_id, triggers, context)
+
+
+@receiver(safe_to_spend_refreshed, dispatch_uid='notifications_balances_refreshed')
+def on_balances_refreshed(sender, user_id, **kwargs):
+    queue(user_id, ['low_balance', 'bill_due'])
+
+
+@receiver(monthly_summaries_refreshed, dispatch_uid='notifications_summaries_refreshed')
+def on_summaries_refreshed(sender, user_id, months, **kwargs):
+    queue(user_id, ['budget_limit'], {'months': months})
+
+
+@receiver(transactions_ingested, dispatch_uid='notifications_transactions_ingested')
+def on_transactions_ingested(sender, user_id, changed, **kwargs):
+    if changed:
+        queue(user_id, ['salary_received'])
+
+
+@receiver(anomalies_detected, dispatch_uid='notifications_anomalies_detected')
+def on_anomalies_detected(sender, user_id, anomalies, **kwargs):
+    queue(user_id, ['unusual_spend'], {
+        'transactions': [[anomaly.account_ref, anomaly.transaction_id] for anomaly in anomalies],
+    })
+
+
+@receiver([post_save, post_delete], sender=AlertRule, dispatch_uid='notifications_rules_changed')
+def on_rule_changed(sender, instance, **kwargs):
+    forget_triggers(instance.user_id)
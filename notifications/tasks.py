@@ -0,0 +1,21 @@
+from celery import shared_task
+from django.conf import settings
+
+from .engine import deliver, evaluate, schedule_wakeup
+
+
+@shared_task
+def evaluate_alerts(user_id, trigger_types, context=None):
+    """Evaluate the user's rules of ``trigger_types`` after a change; returns the number of new events."""
+    result = evaluate(user_id, trigger_types, context)
+    if result.opened:
+        deliver_notification.apply_async((result.notification.pk,), countdown=settings.NOTIFICATION_COALESCE_SECONDS)
+    if result.wake_at and schedule_wakeup(user_id, result.wake_at):
+        evaluate_alerts.apply_async((user_id, ['bill_due'], {'wakeup': True}), eta=result.wake_at)
+    return result.events
+
+
+@shared_task
+def deliver_notification(notification_id):
+    """Send a notification once its coalescing window closed."""
+    return deliver(notification_id)
@@ -0,0 +1,120 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounts.models import AccountSyncState, User
+from analytics.models import DailyBalance
+from subscriptions.models import RecurringPayment
+from . import tasks
+from .engine import evaluate, record
+from .models import AlertEvent, AlertRule, Notification
+
+
+@override_settings(NOTIFICATION_COALESCE_SECONDS=300)
+class EvaluateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='alerted', email='alerted@example.com')
+        self.today = date(2026, 10, 18)
+        AccountSyncState.objects.create(user=self.user, account_ref='GR1', balance_currency='EUR',
+                                        booked_balance=120, available_balance=80, balance_date=self.today)
+        AccountSyncState.objects.create(user=self.user, account_ref='GR2', balance_currency='EUR',
+                                        booked_balance=5000, balance_date=self.today)
+        # Net outflows since the first sync must not read as a low balance
+        DailyBalance.objects.create(user=self.user, account_ref='GR2', currency='EUR', day=self.today,
+                                    net_change=-900, balance=None, refreshed_at=timezone.now())
+        self.rule = AlertRule.objects.create(user=self.user, trigger_type='low_balance', threshold=100)
+
+    def test_low_balance_uses_the_reported_balances(self):
+        result = evaluate('alerted', ['low_balance'], today=self.today)
+        self.assertEqual((result.rules, result.events, result.opened), (1, 1, True))
+        event = AlertEvent.objects.get()
+        self.assertEqual(event.key, f"GR1:EUR:{self.today}")
+        self.assertEqual(event.title, 'Balance of GR1 is 80.00 EUR, below your 100.00 limit')
+
+        # Rules scoped to another account ignore GR1
+        AlertRule.objects.filter(pk=self.rule.pk).update(account_ref='GR2', threshold=4000)
+        self.assertEqual(evaluate('alerted', ['low_balance'], today=self.today).events, 0)
+
+    def test_events_fire_once_per_rule_and_key(self):
+        self.assertEqual(evaluate('alerted', ['low_balance'], today=self.today).events, 1)
+        self.assertEqual(evaluate('alerted', ['low_balance'], today=self.today).events, 0)
+        # A new balance day is a new event
+        AccountSyncState.objects.filter(account_ref='GR1').update(balance_date=self.today + timedelta(days=1))
+        self.assertEqual(evaluate('alerted', ['low_balance'], today=self.today).events, 1)
+        self.assertEqual(AlertEvent.objects.count(), 2)
+
+    def test_record_skips_events_another_evaluation_inserted(self):
+        fired = [(self.rule, 'k1', 'First'), (self.rule, 'k2', 'Second')]
+        AlertEvent.objects.create(rule=self.rule, user=self.user, key='k1', title='First')
+        # The pre-filter misses it, as it would when both evaluations ran at once; the insert still skips it
+        filter_events, missed = AlertEvent.objects.filter, iter([lambda **kwargs: AlertEvent.objects.none()])
+        with mock.patch.object(AlertEvent.objects, 'filter',
+                               side_effect=lambda **kwargs: next(missed, filter_events)(**kwargs)):
+            notification, opened, events = record('alerted', fired)
+        self.assertEqual((opened, events, notification.body), (True, 1, 'Second'))
+        self.assertEqual(AlertEvent.objects.get(key='k2').notification, notification)
+        self.assertIsNone(AlertEvent.objects.get(key='k1').notification)
+
+    def test_events_coalesce_into_the_open_notification(self):
+        first, opened, _ = record('alerted', [(self.rule, 'k1', 'First')])
+        self.assertTrue(opened)
+        second, opened, _ = record('alerted', [(self.rule, 'k2', 'Second')])
+        self.assertFalse(opened)
+        self.assertEqual(second.pk, first.pk)
+        self.assertEqual((second.event_count, second.title, second.body), (2, '2 new alerts', 'First\nSecond'))
+
+        # Delivered notifications, and ones older than the window, take no more events
+        Notification.objects.filter(pk=first.pk).update(delivered_at=timezone.now())
+        third, opened, _ = record('alerted', [(self.rule, 'k3', 'Third')])
+        self.assertTrue(opened)
+        Notification.objects.filter(pk=third.pk).update(created_at=timezone.now() - timedelta(minutes=10))
+        self.assertTrue(record('alerted', [(self.rule, 'k4', 'Fourth')])[1])
+        self.assertEqual(Notification.objects.count(), 3)
+
+
+class BillWakeupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='billed', email='billed@example.com')
+        self.today = date(2026, 10, 18)
+        AlertRule.objects.create(user=self.user, trigger_type='bill_due', days_before=3)
+        self.payment = RecurringPayment.objects.create(
+            user=self.user, merchant_key='STREAM', display_name='Stream', first_date=date(2026, 7, 22),
+            last_date=date(2026, 9, 22), interval_mean=30, last_amount=Decimal('12.99'), is_subscription=True,
+            cadence='monthly', next_expected=self.today + timedelta(days=4),
+        )
+
+    def test_wakeup_is_due_when_a_reminder_falls_due_tomorrow(self):
+        result = evaluate('billed', ['bill_due'], today=self.today)
+        self.assertEqual(result.events, 0)
+        tomorrow = self.today + timedelta(days=1)
+        self.assertEqual(result.wake_at, timezone.make_aware(datetime.combine(tomorrow, time.min)))
+        # The wake-up evaluation itself schedules nothing further
+        self.assertIsNone(evaluate('billed', ['bill_due'], {'wakeup': True}, today=self.today).wake_at)
+
+        RecurringPayment.objects.filter(pk=self.payment.pk).update(next_expected=self.today + timedelta(days=9))
+        self.assertIsNone(evaluate('billed', ['bill_due'], today=self.today).wake_at)
+
+    def test_wakeup_is_scheduled_once(self):
+        wake_at = timezone.now() + timedelta(hours=6)
+        with mock.patch.object(tasks, 'evaluate', return_value=mock.Mock(opened=False, events=0, wake_at=wake_at)), \
+                mock.patch.object(tasks.evaluate_alerts, 'apply_async') as apply_async:
+            tasks.evaluate_alerts('billed', ['bill_due'])
+            tasks.evaluate_alerts('billed', ['bill_due'])
+        apply_async.assert_called_once_with(('billed', ['bill_due'], {'wakeup': True}), eta=wake_at)
+
+    def test_opened_notifications_are_delivered_after_the_window(self):
+        notification = Notification.objects.create(user=self.user, title='Stream is due')
+        result = mock.Mock(opened=True, events=1, notification=notification, wake_at=None)
+        with mock.patch.object(tasks, 'evaluate', return_value=result), \
+                mock.patch.object(tasks.deliver_notification, 'apply_async') as apply_async, \
+                self.settings(NOTIFICATION_COALESCE_SECONDS=300):
+            tasks.evaluate_alerts('billed', ['bill_due'])
+        apply_async.assert_called_once_with((notification.pk,), countdown=300)
+        self.assertTrue(tasks.deliver_notification(notification.pk))
+        self.assertFalse(tasks.deliver_notification(notification.pk))
@@ -0,0 +1,10 @@
+from django.urls import path
+from . import views
+
+app_name = 'notifications'
+
+urlpatterns = [
+    path('api/alerts/rules/', views.AlertRuleListView.as_view(), name='alert_rule_list'),
+    path('api/alerts/rules/<int:pk>/', views.AlertRuleDetailView.as_view(), name='alert_rule_detail'),
+    path('api/notifications/', views.NotificationListView.as_view(), name='notification_list'),
+]
@@ -0,0 +1,63 @@
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from .forms import AlertRuleSerializer, NotificationSerializer
+from .models import AlertRule, Notification
+
+
+class AlertRuleListView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        """List the user's alert rules."""
+        rules = AlertRule.objects.filter(user=request.user).order_by('trigger_type', 'created_at')
+        return Response(AlertRuleSerializer(rules, many=True).data, status=status.HTTP_200_OK)
+    
+    def post(self, request):
+        """Create an alert rule."""
+        serializer = AlertRuleSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save(user=request.user)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class AlertRuleDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def put(self, request, pk):
+        """Update an alert rule."""
+        rule = get_object_or_404(AlertRule, pk=pk, user=request.user)
+        serializer = AlertRuleSerializer(rule, data=request.data, partial=True)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    def delete(self, request, pk):
+        """Delete an alert rule."""
+        get_object_or_404(AlertRule, pk=pk, user=request.user).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class NotificationListView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        """The user's latest 50 notifications (?unread=true for unread ones only)."""
+        notifications = Notification.objects.filter(user=request.user)
+        if request.query_params.get('unread', '').lower() in ('1', 'true'):
+            notifications = notifications.filter(read_at__isnull=True)
+        serializer = NotificationSerializer(notifications.order_by('-created_at')[:50], many=True)
+        return Response({
+            'unread': Notification.objects.filter(user=request.user, read_at__isnull=True).count(),
+            'notifications': serializer.data,
+        }, status=status.HTTP_200_OK)
+    
+    def post(self, request):
+        """Mark all the user's notifications as read."""
+        marked = Notification.objects.filter(user=request.user, read_at__isnull=True).update(read_at=timezone.now())
+        return Response({'marked_read': marked}, status=status.HTTP_200_OK)
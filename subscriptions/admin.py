@@ -0,0 +1,13 @@
+from django.contrib import admin
+from .models import RecurringPayment
+
+
+class RecurringPaymentAdmin(admin.ModelAdmin):
+    list_display = ('user', 'display_name', 'cadence', 'is_subscription', 'last_amount', 'occurrences', 'last_date')
+    list_filter = ('is_subscription', 'cadence', 'currency')
+    search_fields = ('user__username', 'merchant_key', 'display_name')
+    raw_id_fields = ('user',)
+    ordering = ('user', 'merchant_key')
+
+
+admin.site.register(RecurringPayment, RecurringPaymentAdmin)
@@ -0,0 +1,215 @@
+"""
+Incremental recurring-payment and subscription detection.
+
+Debits are grouped by user, normalized counterparty and currency into
+``RecurringPayment`` rows. Each new debit updates the row's running
+statistics in O(1): days since the previous debit and the debit size are
+folded into Welford mean / M2 pairs, and the last two amounts are kept to
+spot price changes. A row counts as a subscription once it has
+``SUBSCRIPTION_MIN_OCCURRENCES`` debits whose mean interval falls in a known
+cadence band and whose intervals and amounts vary little.
+
+``update_user`` applies whatever the latest ingest added. A debit dated before
+a row's ``last_date`` that arrived after the row was last updated (booked
+late, or from a second account) cannot be folded into the interval
+statistics in order, so that merchant's row is replayed from its full
+history instead. ``recompute_users`` rebuilds all rows from the full history
+(backfills, rule changes), spreading users over a process pool.
+"""
+
+import logging
+import math
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from transactions.categorizer import normalize
+from transactions.models import Transaction
+from .models import RecurringPayment
+
+logger = logging.getLogger(__name__)
+
+# (cadence, lowest mean interval, highest mean interval) in days
+CADENCES = (
+    ('weekly', 6, 8),
+    ('monthly', 26, 35),
+    ('quarterly', 85, 95),
+    ('yearly', 350, 380),
+)
+MAX_INTERVAL_CV = 0.25  # standard deviation / mean of the intervals
+MAX_AMOUNT_CV = 0.5
+
+NOISE = re.compile(r'[^A-ZΑ-Ω ]+')  # applied after accents are stripped, so Ά, Ί, ... are kept as Α, Ι
+# Payment processor prefixes and legal suffixes (Latin and Greek) that vary between debits of the same merchant
+STOP_WORDS = frozenset({
+    'PAYPAL', 'SUMUP', 'SQ', 'WWW', 'COM', 'NET', 'GR', 'EU', 'LTD', 'SA', 'AE', 'IKE', 'EPE', 'INC', 'BV',
+    'ΑΕ', 'ΙΚΕ', 'ΕΠΕ', 'ΟΕ', 'ΕΕ',
+})
+
+
+def normalize_counterparty(name):
+    """Stable merchant key: letters only, accents stripped, without processor prefixes or legal suffixes,
+    at most three words."""
+    words = [word for word in NOISE.sub(' ', normalize(name)).split() if len(word) > 1 and word not in STOP_WORDS]
+    return ' '.join(words[:3])
+
+
+def welford(count, mean, m2, value):
+    """Fold ``value`` into a running (mean, M2) over ``count`` previous values."""
+    count += 1
+    delta = value - mean
+    mean += delta / count
+    return mean, m2 + delta * (value - mean)
+
+
+def coefficient_of_variation(count, mean, m2):
+    if count < 2 or not mean:
+        return 0.0
+    return math.sqrt(m2 / (count - 1)) / abs(mean)
+
+
+def observe(state, day, amount, transaction_id):
+    """Fold one debit (``amount`` positive) into ``state``. Returns False if it was already counted."""
+    if state.occurrences and (day < state.last_date or
+                              (day == state.last_date and transaction_id in state.last_transaction_ids)):
+        return False
+
+    if state.occurrences:
+        if day > state.last_date:
+            state.interval_mean, state.interval_m2 = welford(
+                state.intervals, state.interval_mean, state.interval_m2, (day - state.last_date).days,
+            )
+            state.intervals += 1
+            state.last_transaction_ids = []
+        state.previous_amount = state.last_amount
+    else:
+        state.first_date = day
+
+    state.amount_mean, state.amount_m2 = welford(state.occurrences, state.amount_mean, state.amount_m2, float(amount))
+    state.occurrences += 1
+    state.last_date = day
+    state.last_amount = amount
+    state.last_transaction_ids = state.last_transaction_ids + [transaction_id]
+    return True
+
+
+def classify(state, min_occurrences=None):
+    """Derive ``is_subscription``, ``cadence`` and ``next_expected`` from the running statistics."""
+    min_occurrences = min_occurrences or settings.SUBSCRIPTION_MIN_OCCURRENCES
+    cadence = next((name for name, low, high in CADENCES if low <= state.interval_mean <= high), '')
+    state.cadence = cadence if state.intervals else ''
+    state.is_subscription = bool(
+        state.cadence
+        and state.occurrences >= min_occurrences
+        and coefficient_of_variation(state.intervals, state.interval_mean, state.interval_m2) <= MAX_INTERVAL_CV
+        and coefficient_of_variation(state.occurrences, state.amount_mean, state.amount_m2) <= MAX_AMOUNT_CV
+    )
+    state.next_expected = state.last_date + timedelta(days=round(state.interval_mean)) if state.cadence else None
+    return state
+
+
+def debits(user_id, since=None):
+    """The user's booked debits as ``(merchant_key, name, currency, day, amount, transaction_id, created_at)``,
+    oldest first."""
+    rows = (
+        Transaction.objects
+        .filter(user_id=user_id, status='booked', amount__lt=0)
+        .exclude(counterparty='')
+        .order_by('booking_date', 'id')
+        .values_list('counterparty', 'currency', 'booking_date', 'amount', 'transaction_id', 'created_at')
+    )
+    if since is not None:
+        rows = rows.filter(booking_date__gte=since)
+    for name, currency, day, amount, transaction_id, created_at in rows.iterator(chunk_size=2000):
+        key = normalize_counterparty(name)
+        if key:
+            yield key, name, currency, day, -amount, transaction_id, created_at
+
+
+def replay(user_id, merchants=None):
+    """Fresh rows folded from the user's full history, for every merchant or only ``merchants``
+    ((merchant_key, currency) pairs)."""
+    states = {}
+    for key, name, currency, day, amount, transaction_id, _ in debits(user_id):
+        if merchants is not None and (key, currency) not in merchants:
+            continue
+        state = states.get((key, currency))
+        if state is None:
+            state = states[(key, currency)] = RecurringPayment(
+                user_id=user_id, merchant_key=key, display_name=name, currency=currency, first_date=day, last_date=day,
+            )
+        observe(state, day, amount, transaction_id)
+    return states
+
+
+def update_user(user_id, since=None):
+    """Fold the user's debits booked since ``since`` into their recurring-payment rows.
+
+    Debits already counted are skipped, so overlapping windows are harmless;
+    merchants that received a debit out of order are replayed from their full
+    history. Returns the number of rows changed.
+    """
+    states = {
+        (state.merchant_key, state.currency): state
+        for state in RecurringPayment.objects.filter(user_id=user_id)
+    }
+    changed, late = {}, set()
+    for key, name, currency, day, amount, transaction_id, created_at in debits(user_id, since):
+        state = states.get((key, currency))
+        if state is None:
+            state = states[(key, currency)] = RecurringPayment(
+                user_id=user_id, merchant_key=key, display_name=name, currency=currency, first_date=day, last_date=day,
+            )
+        if observe(state, day, amount, transaction_id):
+            changed[(key, currency)] = state
+        elif state.updated_at and created_at > state.updated_at and day < state.last_date:
+            # Arrived after the row was saved, yet dated before its last debit
+            late.add((key, currency))
+
+    if late:
+        for merchant, state in replay(user_id, late).items():
+            state.pk = states[merchant].pk
+            changed[merchant] = state
+        logger.info("Replayed %d merchant(s) of %s for out-of-order debits", len(late), user_id)
+
+    with transaction.atomic():
+        for state in changed.values():
+            classify(state).save()
+    return len(changed)
+
+
+def recompute_user(user_id):
+    """Rebuild one user's rows from their full history. Returns the number of subscriptions found."""
+    states = replay(user_id)
+    with transaction.atomic():
+        RecurringPayment.objects.filter(user_id=user_id).delete()
+        RecurringPayment.objects.bulk_create([classify(state) for state in states.values()], batch_size=1000)
+    return sum(state.is_subscription for state in states.values())
+
+
+def _recompute_chunk(user_ids):
+    return sum(recompute_user(user_id) for user_id in user_ids)
+
+
+def _close_connections():
+    # Forked workers must open their own connections rather than share the parent's socket
+    connections.close_all()
+
+
+def recompute_users(user_ids, processes=None, chunk_size=50):
+    """Rebuild the rows of many users, ``chunk_size`` users per task across ``processes`` workers.
+
+    Returns the number of subscriptions found.
+    """
+    processes = processes or settings.SUBSCRIPTION_RECOMPUTE_PROCESSES
+    user_ids = list(user_ids)
+    chunks = [user_ids[i:i + chunk_size] for i in range(0, len(user_ids), chunk_size)]
+    if processes <= 1 or len(chunks) <= 1:
+        return sum(_recompute_chunk(chunk) for chunk in chunks)
+
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=processes, initializer=_close_connections) as pool:
+        return sum(pool.map(_recompute_chunk, chunks))
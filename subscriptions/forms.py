@@ -0,0 +1,24 @@
+from rest_framework import serializers
+from .models import RecurringPayment
+
+
+# DRF Serializers (for REST API)
+class RecurringPaymentSerializer(serializers.ModelSerializer):
+    amount = serializers.DecimalField(source='last_amount', max_digits=14, decimal_places=2, read_only=True)
+    average_amount = serializers.SerializerMethodField()
+    price_change = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    average_interval_days = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = RecurringPayment
+        fields = (
+            'id', 'display_name', 'merchant_key', 'currency', 'cadence', 'is_subscription', 'amount', 'average_amount',
+            'price_change', 'occurrences', 'first_date', 'last_date', 'next_expected', 'average_interval_days',
+        )
+        read_only_fields = fields
+    
+    def get_average_amount(self, obj):
+        return f"{obj.amount_mean:.2f}"
+    
+    def get_average_interval_days(self, obj):
+        return round(obj.interval_mean, 1)
@@ -0,0 +1,45 @@
+"""
+Django management command to run the subscription detector.
+
+Usage: python manage.py detect_subscriptions --full --processes 8
+
+--full rebuilds every user's recurring-payment rows from their whole history
+on a process pool (backfills, detector changes). Without it, each user's rows
+are updated incrementally with whatever debits they have not seen yet.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from subscriptions.detector import recompute_users, update_user
+from subscriptions.models import RecurringPayment
+from transactions.models import Transaction
+
+
+class Command(BaseCommand):
+    help = 'Detect recurring payments and subscriptions, incrementally or from full history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Recompute from full history on a process pool')
+        parser.add_argument('--user', action='append', default=[], help='Only these usernames (repeatable)')
+        parser.add_argument('--processes', type=int, help='Worker processes (default: SUBSCRIPTION_RECOMPUTE_PROCESSES)')
+        parser.add_argument('--chunk-size', type=int, default=50, help='Users per worker task (default: 50)')
+
+    def handle(self, *args, **options):
+        user_ids = options['user'] or list(
+            Transaction.objects.filter(status='booked', amount__lt=0).values_list('user_id', flat=True).distinct()
+        )
+        start = time.perf_counter()
+        if options['full']:
+            self.stdout.write(f"🔄 Recomputing {len(user_ids)} user(s) from full history ...")
+            found = recompute_users(user_ids, options['processes'], options['chunk_size'])
+        else:
+            self.stdout.write(f"🔄 Updating {len(user_ids)} user(s) incrementally ...")
+            for user_id in user_ids:
+                update_user(user_id)
+            found = RecurringPayment.objects.filter(user_id__in=user_ids, is_subscription=True).count()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {found} subscription(s) across {len(user_ids)} user(s) in {time.perf_counter() - start:.2f}s"
+        ))
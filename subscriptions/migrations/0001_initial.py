@@ -0,0 +1,48 @@
+# Generated by Django 5.2.3 on 2026-10-18 07:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecurringPayment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('merchant_key', models.CharField(max_length=140)),
+                ('display_name', models.CharField(max_length=140)),
+                ('currency', models.CharField(default='EUR', max_length=3)),
+                ('occurrences', models.PositiveIntegerField(default=0)),
+                ('first_date', models.DateField()),
+                ('last_date', models.DateField()),
+                ('last_transaction_ids', models.JSONField(default=list)),
+                ('intervals', models.PositiveIntegerField(default=0)),
+                ('interval_mean', models.FloatField(default=0)),
+                ('interval_m2', models.FloatField(default=0)),
+                ('amount_mean', models.FloatField(default=0)),
+                ('amount_m2', models.FloatField(default=0)),
+                ('last_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('previous_amount', models.DecimalField(blank=True, decimal_places=2, max_digits=14, null=True)),
+                ('is_subscription', models.BooleanField(default=False)),
+                ('cadence', models.CharField(blank=True, choices=[('weekly', 'Weekly'), ('monthly', 'Monthly'), ('quarterly', 'Quarterly'), ('yearly', 'Yearly')], max_length=10)),
+                ('next_expected', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recurring_payments', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Recurring payment',
+                'verbose_name_plural': 'Recurring payments',
+                'indexes': [models.Index(fields=['user', 'is_subscription'], name='recurring_subscription_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'merchant_key', 'currency'), name='unique_recurring_payment')],
+            },
+        ),
+    ]
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.db import models
+
+
+class RecurringPayment(models.Model):
+    """Running statistics of one user's debits to one (normalized) counterparty.
+    
+    ``subscriptions.detector`` folds each new debit into this row: interval
+    and amount statistics are kept as Welford running mean / M2 pairs, so
+    nothing needs the full history again. ``is_subscription`` and ``cadence``
+    are re-derived from them after every update.
+    """
+    CADENCE_CHOICES = [
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+        ('quarterly', 'Quarterly'),
+        ('yearly', 'Yearly'),
+    ]
+    
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='recurring_payments')
+    merchant_key = models.CharField(max_length=140)  # normalized counterparty
+    display_name = models.CharField(max_length=140)
+    currency = models.CharField(max_length=3, default='EUR')
+    
+    occurrences = models.PositiveIntegerField(default=0)
+    first_date = models.DateField()
+    last_date = models.DateField()
+    last_transaction_ids = models.JSONField(default=list)  # ids already counted on last_date
+    
+    # Days between consecutive debit dates
+    intervals = models.PositiveIntegerField(default=0)
+    interval_mean = models.FloatField(default=0)
+    interval_m2 = models.FloatField(default=0)
+    
+    # Debit sizes (positive) and drift between the last two
+    amount_mean = models.FloatField(default=0)
+    amount_m2 = models.FloatField(default=0)
+    last_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    previous_amount = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True)
+    
+    is_subscription = models.BooleanField(default=False)
+    cadence = models.CharField(max_length=10, choices=CADENCE_CHOICES, blank=True)
+    next_expected = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Recurring payment'
+        verbose_name_plural = 'Recurring payments'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'merchant_key', 'currency'], name='unique_recurring_payment'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'is_subscription'], name='recurring_subscription_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} {self.display_name} ({self.cadence or 'irregular'})"
+    
+    @property
+    def price_change(self):
+        """Change of the last debit against the one before it, e.g. ``Decimal('1.50')``; None if unknown."""
+        if self.previous_amount is None:
+            return None
+        return self.last_amount - self.previous_amount
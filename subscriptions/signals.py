@@ -0,0 +1,12 @@
+from django.dispatch import receiver
+
+from transactions.signals import transactions_ingested
+from .tasks import update_recurring_payments
+
+
+@receiver(transactions_ingested, dispatch_uid='subscriptions_update_recurring_payments')
+def update_on_ingest(sender, user_id, months, changed, **kwargs):
+    """Queue an incremental detector update from the earliest month the batch changed."""
+    if changed:
+        year, month = min(months)
+        update_recurring_payments.delay(user_id, f"{year:04d}-{month:02d}-01")
@@ -0,0 +1,15 @@
+from datetime import date
+
+from celery import shared_task
+
+from analytics.tasks import refresh_safe_to_spend
+from .detector import update_user
+
+
+@shared_task
+def update_recurring_payments(user_id, since=None):
+    """Fold the user's debits booked since ``since`` (ISO date) into their recurring-payment state."""
+    changed = update_user(user_id, date.fromisoformat(since) if since else None)
+    if changed:
+        refresh_safe_to_spend.delay(user_id)
+    return changed
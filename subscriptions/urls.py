@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = 'subscriptions'
+
+urlpatterns = [
+    path('api/subscriptions/', views.SubscriptionListView.as_view(), name='subscription_list'),
+]
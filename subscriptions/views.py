@@ -0,0 +1,26 @@
+from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from .forms import RecurringPaymentSerializer
+from .models import RecurringPayment
+
+
+class SubscriptionListView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        """Detected subscriptions (?all=true also lists other recurring counterparties)."""
+        payments = RecurringPayment.objects.filter(user=request.user)
+        if request.query_params.get('all', '').lower() not in ('1', 'true'):
+            payments = payments.filter(is_subscription=True)
+        payments = payments.order_by('-is_subscription', 'next_expected', 'display_name')
+        
+        serializer = RecurringPaymentSerializer(payments, many=True)
+        price_increases = [item for item in serializer.data if item['is_subscription'] and item['price_change']
+                           and float(item['price_change']) > 0]
+        return Response({
+            'count': len(serializer.data),
+            'price_increases': len(price_increases),
+            'subscriptions': serializer.data,
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,23 @@
+from django.contrib import admin
+from .models import CategoryRule, Transaction
+
+
+class TransactionAdmin(admin.ModelAdmin):
+    list_display = ('transaction_id', 'user', 'account_ref', 'booking_date', 'amount', 'currency', 'status', 'category')
+    list_filter = ('status', 'currency')
+    search_fields = ('transaction_id', 'account_ref', 'user__username')
+    raw_id_fields = ('user',)
+    ordering = ('-booking_date', '-id')
+
+
+admin.site.register(Transaction, TransactionAdmin)
+
+
+class CategoryRuleAdmin(admin.ModelAdmin):
+    list_display = ('pattern', 'match_type', 'category', 'priority', 'is_active', 'updated_at')
+    list_filter = ('match_type', 'is_active', 'category')
+    search_fields = ('pattern', 'category')
+    ordering = ('category', 'pattern')
+
+
+admin.site.register(CategoryRule, CategoryRuleAdmin)
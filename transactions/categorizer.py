@@ -0,0 +1,285 @@
+"""
+Rule-based transaction categorization.
+
+Thousands of keyword rules are compiled once into an Aho-Corasick automaton,
+so a description is scanned in a single pass whatever the number of rules,
+instead of testing every rule against every transaction. MCC rules are a dict
+lookup. Descriptions and keywords are reduced to a merchant key first:
+accents, case, punctuation and reference numbers are dropped, so
+"ΑΓΟΡΑ -Σκλαβενίτης 4471 Αθήνα" and "ΑΓΟΡΑ -ΣΚΛΑΒΕΝΙΤΗΣ 9902 ΑΘΗΝΑ" share one
+key, and keywords only match at the start of a word.
+
+``get_categorizer()`` returns the process-wide ``Categorizer``. It recompiles
+only when ``CategoryRule`` rows changed (one aggregate query, run at most
+every ``CATEGORY_RULES_CHECK_SECONDS``) and remembers results per merchant
+key in a bounded in-process LRU, optionally backed by a shared Django cache,
+so recurring merchants skip the automaton entirely. Cached results are keyed
+by the rule set version, so a rule change invalidates them.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Max
+
+from .models import CategoryRule
+
+logger = logging.getLogger(__name__)
+
+# Punctuation, and digit runs long enough to be card, terminal or invoice references
+KEY_NOISE = re.compile(r'[^\w]+|_|\b\d{3,}\b')
+
+
+def normalize(text):
+    """Upper-case ``text`` and strip accents (combining marks)."""
+    decomposed = unicodedata.normalize('NFD', text or '')
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).upper()
+
+
+def merchant_key(text):
+    """Normalized text with punctuation and reference numbers removed; what rules are matched against."""
+    return ' '.join(KEY_NOISE.sub(' ', normalize(text)).split())
+
+
+@dataclass(frozen=True)
+class Rule:
+    pattern: str
+    category: str
+    priority: int = 0
+    match_type: str = 'keyword'
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over normalized keywords."""
+
+    def __init__(self, rules):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [()]
+        for rule in rules:
+            self._add(merchant_key(rule.pattern), rule)
+        self._link()
+
+    def _add(self, keyword, rule):
+        if not keyword:
+            return
+        node = 0
+        for ch in keyword:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(())
+            node = nxt
+        self.output[node] += ((len(keyword), rule),)
+
+    def _link(self):
+        # Breadth-first, so every node's failure target is final before its children need it
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                target = self.fail[node]
+                while target and ch not in self.goto[target]:
+                    target = self.fail[target]
+                self.fail[child] = self.goto[target].get(ch, 0)
+                self.output[child] += self.output[self.fail[child]]
+
+    def matches(self, text):
+        """Yield ``(start, length, rule)`` for every keyword occurring at a word start of ``text`` (a merchant key)."""
+        goto, fail, output = self.goto, self.fail, self.output
+        node = 0
+        for end, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for length, rule in output[node]:
+                start = end - length + 1
+                if start == 0 or not text[start - 1].isalnum():
+                    yield start, length, rule
+
+
+class CompiledRules:
+    """An immutable, compiled rule set."""
+
+    def __init__(self, rules, version=None):
+        rules = list(rules)
+        self.version = version
+        self.token = hashlib.sha1(repr(version).encode()).hexdigest()[:12]
+        self.size = len(rules)
+        self.keywords = KeywordAutomaton(rule for rule in rules if rule.match_type == 'keyword')
+        self.mcc = {}
+        for rule in rules:
+            if rule.match_type == 'mcc' and rule.priority >= self.mcc.get(rule.pattern, rule).priority:
+                self.mcc[rule.pattern] = rule
+
+    def categorize(self, description, mcc=None):
+        """Category of the best matching rule, or '' if none matches."""
+        return self.categorize_key(merchant_key(description), mcc)
+
+    def categorize_key(self, key, mcc=None):
+        """``categorize`` for a description already reduced by ``merchant_key``."""
+        best, best_rank = None, None
+        candidate = self.mcc.get(str(mcc)) if mcc else None
+        if candidate is not None:
+            best, best_rank = candidate, (candidate.priority, 0)
+        for _, length, rule in self.keywords.matches(key):
+            rank = (rule.priority, length)
+            if best_rank is None or rank > best_rank:
+                best, best_rank = rule, rank
+        return best.category if best else ''
+
+    def categorize_many(self, items):
+        """Categories for ``(description, mcc)`` pairs."""
+        return [self.categorize(description, mcc) for description, mcc in items]
+
+
+class CategoryCache:
+    """Categorization results by (rule set token, merchant key, MCC).
+
+    A bounded LRU in process memory, in front of an optional shared Django
+    cache alias that all workers read and fill. Counts hits per tier.
+    """
+
+    def __init__(self, maxsize=None, alias=None, timeout=None):
+        self.maxsize = maxsize or settings.CATEGORY_CACHE_SIZE
+        alias = settings.CATEGORY_CACHE_ALIAS if alias is None else alias
+        self.shared = caches[alias] if alias else None
+        self.timeout = timeout or settings.CATEGORY_CACHE_TIMEOUT
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self._token = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _shared_key(self, token, key):
+        digest = hashlib.sha1(f"{key[0]}|{key[1]}".encode()).hexdigest()
+        return f"category:{token}:{digest}"
+
+    def get_many(self, token, keys):
+        """Cached categories of ``keys`` (``(merchant_key, mcc)`` pairs) under rule set ``token``."""
+        found = {}
+        with self._lock:
+            if token != self._token:
+                # The rules changed; nothing cached under the old version is valid
+                self._entries.clear()
+                self._token = token
+            for key in keys:
+                category = self._entries.get(key)
+                if category is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = category
+            self.local_hits += len(found)
+
+        missing = [key for key in keys if key not in found]
+        if self.shared is not None and missing:
+            shared_keys = {self._shared_key(token, key): key for key in missing}
+            shared = {shared_keys[k]: v for k, v in self.shared.get_many(list(shared_keys)).items()}
+            self._remember(token, shared)
+            found.update(shared)
+            self.shared_hits += len(shared)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def set_many(self, token, categories, shared=True):
+        """Remember freshly computed ``{(merchant_key, mcc): category}``."""
+        self._remember(token, categories)
+        if shared and self.shared is not None and categories:
+            self.shared.set_many(
+                {self._shared_key(token, key): category for key, category in categories.items()}, self.timeout,
+            )
+
+    def _remember(self, token, categories):
+        with self._lock:
+            if token != self._token:
+                return
+            self._entries.update(categories)
+            for key in categories:
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        lookups = self.local_hits + self.shared_hits + self.misses
+        return {
+            'size': len(self._entries),
+            'local_hits': self.local_hits,
+            'shared_hits': self.shared_hits,
+            'misses': self.misses,
+            'hit_rate': (self.local_hits + self.shared_hits) / lookups if lookups else 0.0,
+        }
+
+
+def rules_version():
+    """Cheap fingerprint of the active rule set; changes whenever a rule is added, edited or deleted."""
+    stats = CategoryRule.objects.aggregate(count=Count('id'), changed=Max('updated_at'))
+    return stats['count'], stats['changed']
+
+
+def load_rules():
+    return [
+        Rule(pattern, category, priority, match_type)
+        for pattern, category, priority, match_type in CategoryRule.objects.filter(is_active=True).values_list(
+            'pattern', 'category', 'priority', 'match_type',
+        )
+    ]
+
+
+class Categorizer:
+    """Process-wide holder of the compiled rules and the result cache."""
+
+    def __init__(self, check_seconds=None, cache=None):
+        self.check_seconds = settings.CATEGORY_RULES_CHECK_SECONDS if check_seconds is None else check_seconds
+        self.cache = cache or CategoryCache()
+        self._compiled = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def rules(self):
+        """The current ``CompiledRules``."""
+        if self._compiled is not None and time.monotonic() - self._checked_at < self.check_seconds:
+            return self._compiled
+        with self._lock:
+            version = rules_version()
+            if self._compiled is None or self._compiled.version != version:
+                start = time.perf_counter()
+                self._compiled = CompiledRules(load_rules(), version)
+                logger.info("Compiled %d category rule(s) in %.0fms",
+                            self._compiled.size, (time.perf_counter() - start) * 1000)
+            self._checked_at = time.monotonic()
+            return self._compiled
+
+    def categorize_many(self, items):
+        """Categories for ``(description, mcc)`` pairs, served from the cache where possible."""
+        rules = self.rules()
+        keys = [(merchant_key(description), str(mcc) if mcc else '') for description, mcc in items]
+        unique = list(dict.fromkeys(keys))
+        found = self.cache.get_many(rules.token, unique)
+        computed = {key: rules.categorize_key(*key) for key in unique if key not in found}
+        if computed:
+            self.cache.set_many(rules.token, computed)
+            found.update(computed)
+        return [found[key] for key in keys]
+
+
+_categorizer = None
+
+
+def get_categorizer():
+    """Return the process-wide ``Categorizer``."""
+    global _categorizer
+    if _categorizer is None:
+        _categorizer = Categorizer()
+    return _categorizer
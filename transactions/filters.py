@@ -0,0 +1,33 @@
+from datetime import date
+
+from django_filters import rest_framework as filters
+
+from .models import Transaction
+
+
+class CharInFilter(filters.BaseInFilter, filters.CharFilter):
+    """Comma-separated values."""
+
+
+class TransactionFilter(filters.FilterSet):
+    """Query parameters of the transaction list; each maps onto a ``(user, ...)`` composite index."""
+    account = CharInFilter(field_name='account_ref')
+    category = CharInFilter(method='filter_category')  # 'uncategorized' for none
+    min_amount = filters.NumberFilter(field_name='amount', lookup_expr='gte')  # signed: debits are negative
+    max_amount = filters.NumberFilter(field_name='amount', lookup_expr='lte')
+    date_from = filters.DateFilter(field_name='booking_date', lookup_expr='gte')
+    date_to = filters.DateFilter(field_name='booking_date', lookup_expr='lte')
+    month = filters.DateFilter(method='filter_month', input_formats=['%Y-%m'])  # YYYY-MM
+    status = filters.ChoiceFilter(choices=Transaction.STATUS_CHOICES)
+    
+    class Meta:
+        model = Transaction
+        fields = []
+    
+    def filter_category(self, queryset, name, value):
+        return queryset.filter(category__in=['' if category == 'uncategorized' else category for category in value])
+    
+    def filter_month(self, queryset, name, value):
+        # Half-open range on the partition key, as TransactionQuerySet.for_month does
+        end = date(value.year + value.month // 12, value.month % 12 + 1, 1)
+        return queryset.filter(booking_date__gte=value, booking_date__lt=end)
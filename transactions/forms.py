@@ -0,0 +1,19 @@
+from rest_framework import serializers
+from .models import LISTING_FIELDS, Transaction
+
+
+# DRF Serializers (for REST API)
+class TransactionSerializer(serializers.ModelSerializer):
+    """List representation: extracted columns only, never the raw payload."""
+    
+    class Meta:
+        model = Transaction
+        fields = LISTING_FIELDS
+        read_only_fields = fields
+
+
+class TransactionDetailSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Transaction
+        fields = LISTING_FIELDS + ('raw', 'created_at', 'updated_at')
+        read_only_fields = fields
@@ -0,0 +1,105 @@
+"""
+Django management command to benchmark the rule-based categorizer.
+
+Usage: python manage.py benchmark_categorizer --rules 5000 --transactions 100000
+
+Compiles a synthetic rule set (Greek and Latin merchant keywords plus MCC
+mappings), categorizes synthetic card and account descriptions and reports
+transactions/sec. The same descriptions are then run through the merchant-key
+cache, in ingest-sized batches, to report its hit rate. A sample is also
+categorized by testing every rule against every description, for comparison.
+Nothing is written to the database.
+"""
+
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from transactions.categorizer import CategoryCache, Categorizer, CompiledRules, Rule, normalize
+
+KEYWORDS = (
+    ('ΣΚΛΑΒΕΝΙΤΗΣ', 'groceries'), ('ΑΒ ΒΑΣΙΛΟΠΟΥΛΟΣ', 'groceries'), ('ΜΑΣΟΥΤΗΣ', 'groceries'),
+    ('ΣΟΥΠΕΡΜΑΡΚΕΤ', 'groceries'), ('ΦΟΥΡΝΟΣ', 'groceries'), ('ΕΥΔΑΠ', 'utilities'), ('ΔΕΗ', 'utilities'),
+    ('COSMOTE', 'utilities'), ('VODAFONE', 'utilities'), ('ΟΑΣΑ', 'transport'), ('SHELL', 'fuel'),
+    ('ΕΚΟ', 'fuel'), ('AEGEAN', 'travel'), ('ΦΑΡΜΑΚΕΙΟ', 'health'), ('NETFLIX', 'subscriptions'),
+    ('SPOTIFY', 'subscriptions'), ('EFOOD', 'restaurants'), ('WOLT', 'restaurants'), ('ΜΙΣΘΟΔΟΣΙΑ', 'salary'),
+    ('ΕΝΟΙΚΙΟ', 'rent'), ('PUBLIC', 'shopping'), ('ΚΩΤΣΟΒΟΛΟΣ', 'shopping'), ('ZARA', 'shopping'),
+)
+MCCS = (('5411', 'groceries'), ('5812', 'restaurants'), ('5541', 'fuel'), ('4111', 'transport'), ('5912', 'health'))
+PREFIXES = ('ΑΓΟΡΑ -', 'POS ', 'ΧΡΕΩΣΗ ', 'ΠΛΗΡΩΜΗ ', '')
+CITIES = ('ΑΘΗΝΑ', 'ΠΕΙΡΑΙΑΣ', 'ΘΕΣΣΑΛΟΝΙΚΗ', 'ATHENS', 'ΗΡΑΚΛΕΙΟ', 'ΠΑΤΡΑ')
+LETTERS = 'ΑΒΓΔΕΖΗΘΙΚΛΜΝΞΟΠΡΣΤΥΦΧΨΩABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+class Command(BaseCommand):
+    help = 'Benchmark compiled multi-pattern categorization throughput'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rules', type=int, default=5000, help='Keyword rules (default: 5000)')
+        parser.add_argument('--transactions', type=int, default=100000, help='Descriptions (default: 100000)')
+        parser.add_argument('--naive-sample', type=int, default=500,
+                            help='Descriptions to categorize rule by rule for comparison, 0 to skip (default: 500)')
+        parser.add_argument('--stores', type=int, default=20000, help='Distinct merchant locations (default: 20000)')
+        parser.add_argument('--batch-size', type=int, default=500, help='Descriptions per cached batch (default: 500)')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        rules = [Rule(keyword, category, priority=1) for keyword, category in KEYWORDS]
+        rules += [Rule(mcc, category, match_type='mcc') for mcc, category in MCCS]
+        merchants = [''.join(rng.choices(LETTERS, k=rng.randint(4, 12))) for _ in range(options['rules'])]
+        rules += [Rule(merchant, f"category-{i % 40}") for i, merchant in enumerate(merchants)]
+
+        start = time.perf_counter()
+        compiled = CompiledRules(rules)
+        compile_seconds = time.perf_counter() - start
+        self.stdout.write(f"🔧 Compiled {len(rules)} rules into {len(compiled.keywords.goto)} automaton states "
+                          f"in {compile_seconds * 1000:.0f}ms")
+
+        # Stores with a fixed prefix, city and MCC; a few popular ones get most of the transactions
+        stores = []
+        for _ in range(options['stores']):
+            merchant = rng.choice(KEYWORDS)[0] if rng.random() < 0.3 else rng.choice(merchants)
+            if rng.random() < 0.2:
+                merchant = ''.join(rng.choices(LETTERS, k=8))  # unknown merchant
+            stores.append((f"{rng.choice(PREFIXES)}{merchant} {rng.choice(CITIES)} GR",
+                           rng.choice(MCCS)[0] if rng.random() < 0.3 else None))
+        weights = [1 / rank for rank in range(1, len(stores) + 1)]
+        items = [
+            (f"{description} {rng.randint(1000, 99999)}", mcc)
+            for description, mcc in rng.choices(stores, weights, k=options['transactions'])
+        ]
+
+        start = time.perf_counter()
+        categories = compiled.categorize_many(items)
+        seconds = time.perf_counter() - start
+        matched = sum(1 for category in categories if category)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Automaton: {len(items)} transactions in {seconds:.2f}s "
+            f"({len(items) / seconds:,.0f} transactions/s), {matched / len(items):.0%} categorized"
+        ))
+
+        categorizer = Categorizer(cache=CategoryCache(alias=''))
+        categorizer.rules = lambda: compiled
+        batch_size = options['batch_size']
+        start = time.perf_counter()
+        for i in range(0, len(items), batch_size):
+            categorizer.categorize_many(items[i:i + batch_size])
+        cached_seconds = time.perf_counter() - start
+        stats = categorizer.cache.stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Cached: {len(items) / cached_seconds:,.0f} transactions/s, {stats['hit_rate']:.0%} hit rate, "
+            f"{stats['size']} merchant keys cached"
+        ))
+
+        sample = items[:options['naive_sample']]
+        if sample:
+            keywords = [(normalize(rule.pattern), rule) for rule in rules if rule.match_type == 'keyword']
+            start = time.perf_counter()
+            for description, _ in sample:
+                text = normalize(description)
+                [rule for keyword, rule in keywords if keyword in text]
+            naive_rate = len(sample) / (time.perf_counter() - start)
+            self.stdout.write(f"🐢 Rule by rule: {naive_rate:,.0f} transactions/s on {len(sample)} descriptions "
+                              f"({len(items) / seconds / naive_rate:.0f}x slower)")
@@ -0,0 +1,59 @@
+"""
+Django management command to benchmark bulk transaction ingestion.
+
+Usage: python manage.py benchmark_transaction_ingest --users 200 --days 90
+
+Generates a synthetic 90-day backfill with the local Piraeus stub's data,
+ingests it twice (first load, then an idempotent re-sync) and reports rows/sec.
+The synthetic users and their transactions are removed afterwards.
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from accounts.models import User
+from accounts.piraeus.stub_server import StubConfig, StubData
+from transactions.ingest import TransactionIngestor, entry_row
+from transactions.models import Transaction
+
+
+class Command(BaseCommand):
+    help = 'Benchmark bulk ingestion of a synthetic transaction backfill'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help='Synthetic users (default: 100)')
+        parser.add_argument('--days', type=int, default=90, help='Days of history per account (default: 90)')
+        parser.add_argument('--chunk-size', type=int, help='Rows per chunk (default: TRANSACTION_INGEST_CHUNK_SIZE)')
+
+    def handle(self, *args, **options):
+        data = StubData(StubConfig())
+        today = timezone.localdate()
+        date_from = today - timedelta(days=options['days'])
+
+        usernames = [f"bench-ingest-{i}" for i in range(options['users'])]
+        User.objects.bulk_create(
+            [User(username=name, email=f"{name}@example.com", first_name='Bench', last_name='Ingest') for name in usernames],
+            ignore_conflicts=True,
+        )
+
+        rows = []
+        for username in usernames:
+            for account in data.accounts(username):
+                for entry in data.transactions(account['resourceId'], date_from, today):
+                    rows.append(entry_row(username, account['iban'], entry, 'booked', today))
+
+        ingestor = TransactionIngestor(chunk_size=options['chunk_size'])
+        self.stdout.write(f"🚀 Ingesting {len(rows)} rows for {len(usernames)} users in chunks of {ingestor.chunk_size} ...")
+        try:
+            for label in ('Initial load', 'Re-sync'):
+                stats = ingestor.ingest(rows)
+                self.stdout.write(
+                    f"📥 {label}: {stats.rows} rows, {stats.written} written, {stats.chunks} chunk(s) "
+                    f"in {stats.seconds:.2f}s ({stats.rows_per_second:.0f} rows/s)"
+                )
+        finally:
+            Transaction.objects.filter(user__in=usernames).delete()
+            User.objects.filter(username__in=usernames).delete()
+        self.stdout.write(self.style.SUCCESS("✅ Done; synthetic users removed"))
@@ -0,0 +1,56 @@
+"""
+Django management command to maintain the monthly transaction partitions.
+
+Usage: python manage.py manage_transaction_partitions --months-ahead 3 --retain-months 36
+
+Pre-creates partitions for the coming months (and for the initial sync window),
+detaches months older than the retention period into an archive schema and
+lists the partitions with their estimated sizes.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.partitions import list_partitions, maintain_partitions
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming monthly transaction partitions and detach or archive expired ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months-ahead', type=int,
+                            help='Months to pre-create after the current one (default: TRANSACTION_PARTITION_MONTHS_AHEAD)')
+        parser.add_argument('--months-back', type=int,
+                            help='Months to ensure before the current one (default: the initial sync window)')
+        parser.add_argument('--retain-months', type=int,
+                            help='Detach months older than this, 0 to keep all (default: TRANSACTION_PARTITION_RETAIN_MONTHS)')
+        parser.add_argument('--archive-schema',
+                            help="Schema detached partitions move to, '' to leave them in place "
+                                 "(default: TRANSACTION_PARTITION_ARCHIVE_SCHEMA)")
+        parser.add_argument('--dry-run', action='store_true', help='Show what would change without changing it')
+
+    def handle(self, *args, **options):
+        if options['retain_months'] is not None and options['months_back'] is not None \
+                and 0 < options['retain_months'] <= options['months_back']:
+            raise CommandError('--retain-months must be greater than --months-back')
+
+        created, detached = maintain_partitions(
+            months_ahead=options['months_ahead'],
+            months_back=options['months_back'],
+            retain_months=options['retain_months'],
+            archive_schema=options['archive_schema'],
+            dry_run=options['dry_run'],
+        )
+
+        prefix = 'Would create' if options['dry_run'] else 'Created'
+        for name in created:
+            self.stdout.write(f"➕ {prefix} {name}")
+        prefix = 'Would detach' if options['dry_run'] else 'Detached'
+        for name in detached:
+            self.stdout.write(f"📦 {prefix} {name}")
+
+        self.stdout.write("=" * 60)
+        for partition in list_partitions():
+            span = f"{partition.start} → {partition.end}" if partition.start else 'default'
+            self.stdout.write(f"🗂️  {partition.name:<45} {span:<25} ~{partition.estimated_rows} rows")
+        self.stdout.write("=" * 60)
+        self.stdout.write(self.style.SUCCESS(f"✅ {len(created)} created, {len(detached)} detached"))
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.3 on 2026-10-18 07:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# PostgreSQL needs the partition key in the primary key and every unique constraint,
+# so the table is created by hand. Rows outside any monthly partition land in the
+# default partition until manage_transaction_partitions creates theirs.
+CREATE_PARTITIONED_TABLE = """
+CREATE TABLE transactions_transaction (
+    id bigserial NOT NULL,
+    user_id varchar(30) NOT NULL
+        REFERENCES auth_user (username) DEFERRABLE INITIALLY DEFERRED,
+    account_ref varchar(64) NOT NULL,
+    transaction_id varchar(100) NOT NULL,
+    booking_date date NOT NULL,
+    value_date date NULL,
+    amount numeric(14, 2) NOT NULL,
+    currency varchar(3) NOT NULL,
+    status varchar(10) NOT NULL,
+    category varchar(50) NOT NULL,
+    created_at timestamp with time zone NOT NULL,
+    updated_at timestamp with time zone NOT NULL,
+    PRIMARY KEY (id, booking_date),
+    CONSTRAINT unique_transaction UNIQUE (user_id, account_ref, transaction_id, booking_date)
+) PARTITION BY RANGE (booking_date);
+
+CREATE INDEX transaction_user_booking_idx ON transactions_transaction (user_id, booking_date);
+
+CREATE TABLE transactions_transaction_default PARTITION OF transactions_transaction DEFAULT;
+"""
+
+DROP_PARTITIONED_TABLE = "DROP TABLE transactions_transaction CASCADE;"
+
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(CREATE_PARTITIONED_TABLE, DROP_PARTITIONED_TABLE),
+            ],
+            state_operations=[
+                migrations.CreateModel(
+                    name='Transaction',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('account_ref', models.CharField(max_length=64)),
+                        ('transaction_id', models.CharField(max_length=100)),
+                        ('booking_date', models.DateField()),
+                        ('value_date', models.DateField(blank=True, null=True)),
+                        ('amount', models.DecimalField(decimal_places=2, max_digits=14)),
+                        ('currency', models.CharField(default='EUR', max_length=3)),
+                        ('status', models.CharField(choices=[('booked', 'Booked'), ('pending', 'Pending')], default='booked', max_length=10)),
+                        ('category', models.CharField(blank=True, max_length=50)),
+                        ('created_at', models.DateTimeField(auto_now_add=True)),
+                        ('updated_at', models.DateTimeField(auto_now=True)),
+                        ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transactions', to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'indexes': [models.Index(fields=['user', 'booking_date'], name='transaction_user_booking_idx')],
+                        'constraints': [models.UniqueConstraint(fields=('user', 'account_ref', 'transaction_id', 'booking_date'), name='unique_transaction')],
+                    },
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.3 on 2026-10-18 07:04
+
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='bank_code',
+            field=models.CharField(blank=True, max_length=35),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='counterparty',
+            field=models.CharField(blank=True, max_length=140),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='raw',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='remittance_info',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'counterparty'], name='transaction_counterparty_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['raw'], name='transaction_raw_gin', opclasses=['jsonb_path_ops']),
+        ),
+    ]
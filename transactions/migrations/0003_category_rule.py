@@ -0,0 +1,29 @@
+# Generated by Django 5.2.3 on 2026-10-18 07:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0002_raw_payload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('match_type', models.CharField(choices=[('keyword', 'Keyword in description'), ('mcc', 'Merchant category code')], default='keyword', max_length=10)),
+                ('pattern', models.CharField(max_length=100)),
+                ('category', models.CharField(max_length=50)),
+                ('priority', models.SmallIntegerField(default=0)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('match_type', 'pattern'), name='unique_category_rule')],
+            },
+        ),
+    ]
@@ -0,0 +1,113 @@
+from datetime import date
+
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models
+
+# Columns list endpoints read; everything except the raw bank payload
+LISTING_FIELDS = (
+    'id', 'account_ref', 'transaction_id', 'booking_date', 'value_date', 'amount', 'currency',
+    'status', 'category', 'counterparty', 'remittance_info', 'bank_code',
+)
+
+
+class TransactionQuerySet(models.QuerySet):
+    def for_month(self, user, year, month):
+        """A user's transactions booked in one month.
+        
+        Filtering on a half-open ``booking_date`` range lets PostgreSQL prune
+        the scan down to that month's partition.
+        """
+        start = date(year, month, 1)
+        end = date(year + month // 12, month % 12 + 1, 1)
+        return self.filter(user=user, booking_date__gte=start, booking_date__lt=end)
+    
+    def for_listing(self):
+        """Only the extracted columns; ``raw`` is fetched (and decoded) on first access."""
+        return self.only(*LISTING_FIELDS)
+
+
+class Transaction(models.Model):
+    """A bank transaction, stored in a table range-partitioned by booking month.
+    
+    The table is created by hand in the initial migration: PostgreSQL requires
+    the partition key in every unique constraint, so the database primary key
+    is ``(id, booking_date)`` while Django keeps treating ``id`` as the pk
+    (ids come from a single sequence and never repeat). Partitions are
+    maintained by ``manage_transaction_partitions``.
+    """
+    STATUS_CHOICES = [
+        ('booked', 'Booked'),
+        ('pending', 'Pending'),
+    ]
+    
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='transactions')
+    account_ref = models.CharField(max_length=64)  # IBAN or masked PAN, stable across consents
+    transaction_id = models.CharField(max_length=100)
+    booking_date = models.DateField()  # partition key
+    value_date = models.DateField(null=True, blank=True)
+    amount = models.DecimalField(max_digits=14, decimal_places=2)
+    currency = models.CharField(max_length=3, default='EUR')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='booked')
+    category = models.CharField(max_length=50, blank=True)
+    
+    # Promoted from the bank payload for querying
+    counterparty = models.CharField(max_length=140, blank=True)
+    remittance_info = models.CharField(max_length=500, blank=True)
+    bank_code = models.CharField(max_length=35, blank=True)  # proprietaryBankTransactionCode
+    
+    # The untouched AIS entry, for anything the columns above don't cover
+    raw = models.JSONField(default=dict)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    objects = TransactionQuerySet.as_manager()
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'account_ref', 'transaction_id', 'booking_date'],
+                name='unique_transaction',
+            ),
+        ]
+        indexes = [
+            # (booking_date, id) last: list filters seek straight to a keyset page
+            models.Index(fields=['user', 'booking_date', 'id'], name='transaction_user_seek_idx'),
+            models.Index(fields=['user', 'account_ref', 'booking_date', 'id'], name='transaction_account_seek_idx'),
+            models.Index(fields=['user', 'category', 'booking_date', 'id'], name='transaction_category_seek_idx'),
+            models.Index(fields=['user', 'amount'], name='transaction_amount_idx'),
+            models.Index(fields=['user', 'counterparty'], name='transaction_counterparty_idx'),
+            GinIndex(fields=['raw'], opclasses=['jsonb_path_ops'], name='transaction_raw_gin'),
+        ]
+    
+    def __str__(self):
+        return f"{self.booking_date} {self.amount} {self.currency} ({self.transaction_id})"
+
+
+class CategoryRule(models.Model):
+    """Assigns ``category`` to transactions whose description contains a keyword or whose MCC matches.
+    
+    Rules are compiled into one matcher by ``transactions.categorizer``; when
+    several match, the highest ``priority`` wins, then the longest keyword.
+    """
+    MATCH_CHOICES = [
+        ('keyword', 'Keyword in description'),
+        ('mcc', 'Merchant category code'),
+    ]
+    
+    match_type = models.CharField(max_length=10, choices=MATCH_CHOICES, default='keyword')
+    pattern = models.CharField(max_length=100)  # keyword (accents and case are ignored) or 4-digit MCC
+    category = models.CharField(max_length=50)
+    priority = models.SmallIntegerField(default=0)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['match_type', 'pattern'], name='unique_category_rule'),
+        ]
+    
+    def __str__(self):
+        return f"{self.match_type} {self.pattern!r} -> {self.category}"
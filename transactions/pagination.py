@@ -0,0 +1,66 @@
+import base64
+from datetime import date
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Keyset ("seek") pagination over ``(booking_date, id)``, newest first.
+    
+    The cursor is the key of the last row of the previous page and the next
+    page starts right below it, using a predicate the ``(..., booking_date, id)``
+    indexes can seek to: page 1000 costs what page 1 does, where OFFSET would
+    read and discard every earlier row. ``booking_date <= cursor date`` also
+    lets PostgreSQL skip the partitions of later months.
+    """
+    page_size = 50
+    max_page_size = 200
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            day, pk = self.decode_cursor(cursor)
+            queryset = queryset.filter(booking_date__lte=day).filter(Q(booking_date__lt=day) | Q(id__lt=pk))
+        
+        rows = list(queryset.order_by('-booking_date', '-id')[:self.page_size + 1])
+        self.next_cursor = self.encode_cursor(rows[self.page_size - 1]) if len(rows) > self.page_size else None
+        return rows[:self.page_size]
+    
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+    
+    def encode_cursor(self, row):
+        return base64.urlsafe_b64encode(f"{row.booking_date.isoformat()}|{row.pk}".encode()).decode().rstrip('=')
+    
+    def decode_cursor(self, cursor):
+        try:
+            day, pk = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode().split('|')
+            return date.fromisoformat(day), int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+    
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor)
+    
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'next_cursor': self.next_cursor,
+            'page_size': self.page_size,
+            'transactions': data,
+        })
@@ -0,0 +1,152 @@
+"""
+Monthly range partitions of the transactions table.
+
+Each month lives in ``transactions_transaction_y<YYYY>m<MM>``. Rows dated
+outside every monthly partition fall into ``transactions_transaction_default``
+and are moved into their month's partition when it is created. Old months can
+be detached, optionally into an archive schema, which keeps the data queryable
+without it weighing on the live table.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import date, timedelta
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Transaction
+
+TABLE = Transaction._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+
+BOUND = re.compile(r"FROM \('(?P<start>[\d-]+)'\) TO \('(?P<end>[\d-]+)'\)")
+
+
+@dataclass(frozen=True)
+class Partition:
+    name: str
+    start: date | None  # None for the default partition
+    end: date | None
+    estimated_rows: int
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{TABLE}_y{month.year}m{month.month:02d}"
+
+
+def current_month():
+    """First day of the current month in bank local time."""
+    return timezone.localdate(timezone=ZoneInfo(settings.PIRAEUS_TIMEZONE)).replace(day=1)
+
+
+def list_partitions():
+    """Attached partitions, oldest first, with the default partition last."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname, pg_get_expr(child.relpartbound, child.oid), child.reltuples
+            FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = %s::regclass
+            """,
+            [TABLE],
+        )
+        rows = cursor.fetchall()
+
+    partitions = []
+    for name, bound, estimated_rows in rows:
+        match = BOUND.search(bound)
+        start, end = (date.fromisoformat(match['start']), date.fromisoformat(match['end'])) if match else (None, None)
+        partitions.append(Partition(name, start, end, max(int(estimated_rows), 0)))
+    return sorted(partitions, key=lambda p: (p.start is None, p.start or date.min))
+
+
+def create_partition(month):
+    """Create the partition for ``month``, moving any rows parked in the default partition."""
+    quote = connection.ops.quote_name
+    name, start, end = partition_name(month), month, add_months(month, 1)
+    bounds = f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT EXISTS (SELECT 1 FROM {quote(DEFAULT_PARTITION)} WHERE booking_date >= %s AND booking_date < %s)",
+            [start, end],
+        )
+        if not cursor.fetchone()[0]:
+            cursor.execute(f"CREATE TABLE {quote(name)} PARTITION OF {quote(TABLE)} {bounds}")
+            return name
+
+        # Attaching would fail while the default partition holds rows of this month
+        cursor.execute(f"CREATE TABLE {quote(name)} (LIKE {quote(TABLE)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        cursor.execute(
+            f"""
+            WITH moved AS (
+                DELETE FROM {quote(DEFAULT_PARTITION)} WHERE booking_date >= %s AND booking_date < %s RETURNING *
+            )
+            INSERT INTO {quote(name)} SELECT * FROM moved
+            """,
+            [start, end],
+        )
+        cursor.execute(f"ALTER TABLE {quote(TABLE)} ATTACH PARTITION {quote(name)} {bounds}")
+    return name
+
+
+def detach_partition(name, archive_schema=None):
+    """Detach a monthly partition, moving it into ``archive_schema`` when given."""
+    quote = connection.ops.quote_name
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {quote(TABLE)} DETACH PARTITION {quote(name)}")
+        if archive_schema:
+            cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {quote(archive_schema)}")
+            cursor.execute(f"ALTER TABLE {quote(name)} SET SCHEMA {quote(archive_schema)}")
+
+
+def maintain_partitions(months_ahead=None, months_back=None, retain_months=None, archive_schema=None, dry_run=False):
+    """Create missing partitions around today and detach expired ones.
+
+    Partitions are ensured from ``months_back`` months ago (by default far
+    enough back for the initial sync window) to ``months_ahead`` months ahead.
+    With ``retain_months`` set, months older than that are detached.
+    Returns ``(created, detached)`` partition names.
+    """
+    months_ahead = settings.TRANSACTION_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    retain_months = settings.TRANSACTION_PARTITION_RETAIN_MONTHS if retain_months is None else retain_months
+    archive_schema = settings.TRANSACTION_PARTITION_ARCHIVE_SCHEMA if archive_schema is None else archive_schema
+
+    this_month = current_month()
+    if months_back is None:
+        first = (this_month - timedelta(days=settings.PIRAEUS_SYNC_INITIAL_DAYS)).replace(day=1)
+    else:
+        first = add_months(this_month, -months_back)
+    if retain_months:
+        first = max(first, add_months(this_month, -retain_months))
+
+    existing = list_partitions()
+    attached = {p.name for p in existing}
+
+    created = []
+    month = first
+    while month <= add_months(this_month, months_ahead):
+        if partition_name(month) not in attached:
+            if not dry_run:
+                create_partition(month)
+            created.append(partition_name(month))
+        month = add_months(month, 1)
+
+    detached = []
+    if retain_months:
+        cutoff = add_months(this_month, -retain_months)
+        for partition in existing:
+            if partition.end is not None and partition.end <= cutoff:
+                if not dry_run:
+                    detach_partition(partition.name, archive_schema)
+                detached.append(partition.name)
+    return created, detached
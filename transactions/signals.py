@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Sent once the rows of an ingested batch are committed.
+# Arguments: user_id, account_ref, months (set of (year, month) touched, including those rows moved out of or were
+# deleted from), rows (rows written), changed (whether any row was written or deleted)
+transactions_ingested = Signal()
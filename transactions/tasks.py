@@ -0,0 +1,16 @@
+import logging
+
+from celery import shared_task
+
+from .partitions import maintain_partitions
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def maintain_transaction_partitions():
+    """Keep monthly partitions created ahead of time and detach expired ones."""
+    created, detached = maintain_partitions()
+    if created or detached:
+        logger.info("Transaction partitions: created %s, detached %s", created, detached)
+    return len(created), len(detached)
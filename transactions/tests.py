@@ -0,0 +1,185 @@
+import csv
+import io
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from accounts.piraeus.sync import SyncBatch
+from . import export, ingest
+from .ingest import TransactionIngestor, entry_row, ingest_sync_batch
+from .models import Transaction
+
+
+def entry(transaction_id, booking_date, amount, creditor='SHOP'):
+    return {
+        'transactionId': transaction_id,
+        'bookingDate': booking_date,
+        'transactionAmount': {'amount': amount, 'currency': 'EUR'},
+        'creditorName': creditor,
+    }
+
+
+class IngestTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='ingest', email='ingest@example.com')
+        self.ingestor = TransactionIngestor(chunk_size=2)
+        self.today = date(2026, 10, 18)
+
+    def rows(self, *entries, status='booked'):
+        return [entry_row('ingest', 'GR1', e, status, self.today) for e in entries]
+
+    def test_rows_are_upserted_in_chunks(self):
+        stats = self.ingestor.ingest(self.rows(entry('a', '2026-10-01', '-1.00'), entry('b', '2026-10-02', '-2.00'),
+                                               entry('c', '2026-10-03', '-3.00')))
+        self.assertEqual((stats.rows, stats.written, stats.deleted, stats.chunks), (3, 3, 0, 2))
+        # Unchanged rows are not rewritten; changed ones are updated in place
+        stats = self.ingestor.ingest(self.rows(entry('a', '2026-10-01', '-1.00'), entry('b', '2026-10-02', '-2.50')))
+        self.assertEqual((stats.written, stats.deleted), (1, 0))
+        self.assertEqual(Transaction.objects.get(transaction_id='b').amount, -2.5)
+        self.assertEqual(Transaction.objects.count(), 3)
+
+    def test_moved_booking_date_replaces_the_row(self):
+        self.ingestor.ingest(self.rows(entry('a', '2026-09-30', '-1.00')))
+        stats = self.ingestor.ingest(self.rows(entry('a', '2026-10-01', '-1.00')))
+        self.assertEqual((stats.written, stats.deleted), (1, 1))
+        self.assertEqual(stats.deleted_months, {(2026, 9)})
+        self.assertEqual(list(Transaction.objects.values_list('transaction_id', 'booking_date')),
+                         [('a', date(2026, 10, 1))])
+
+    def test_removed_pending_rows_are_deleted(self):
+        self.ingestor.ingest(self.rows(entry('p1', '2026-10-02', '-4.00'), entry('p2', '2026-10-03', '-5.00'),
+                                       status='pending'))
+        stats = self.ingestor.ingest([], removed=[('ingest', 'GR1', 'p1'), ('ingest', 'GR1', 'missing')])
+        self.assertEqual((stats.written, stats.deleted), (0, 1))
+        self.assertEqual(stats.deleted_months, {(2026, 10)})
+        self.assertEqual(list(Transaction.objects.values_list('transaction_id', flat=True)), ['p2'])
+
+    def test_delete_only_batch_signals_a_change(self):
+        batch = SyncBatch(user_id='ingest', account_ref='GR1', resource_id='acc-1',
+                          pending=[entry('p1', '2026-09-29', '-4.00')])
+        with mock.patch.object(ingest, 'transactions_ingested') as signal, \
+                self.captureOnCommitCallbacks(execute=True):
+            ingest_sync_batch(batch)
+            ingest_sync_batch(SyncBatch(user_id='ingest', account_ref='GR1', resource_id='acc-1', dropped=['p1']))
+        first, second = (call.kwargs for call in signal.send.call_args_list)
+        self.assertEqual((first['rows'], first['changed'], first['months']), (1, True, {(2026, 9)}))
+        self.assertEqual((second['rows'], second['changed'], second['months']), (0, True, {(2026, 9)}))
+        self.assertFalse(Transaction.objects.exists())
+
+
+class TransactionListTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='lister', email='lister@example.com')
+        other = User.objects.create(username='other', email='other@example.com')
+        start = date(2026, 8, 1)
+        # Several rows per day, so pages split days and ties are broken by id
+        Transaction.objects.bulk_create([
+            Transaction(user=self.user, account_ref='GR1' if i % 3 else 'GR2', transaction_id=f"t{i}",
+                        booking_date=start + timedelta(days=i // 4), amount=Decimal(-1 - i),
+                        category='groceries' if i % 2 else 'transport')
+            for i in range(45)
+        ] + [Transaction(user=other, account_ref='GR9', transaction_id='x', booking_date=start, amount=-1)])
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def walk(self, **params):
+        ids, response = [], self.client.get('/api/transactions/', params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            ids += [row['id'] for row in response.json()['transactions']]
+            if not response.json()['next']:
+                return ids
+            response = self.client.get(response.json()['next'])
+
+    def test_pages_cover_every_row_once_newest_first(self):
+        expected = list(Transaction.objects.filter(user=self.user).order_by('-booking_date', '-id')
+                        .values_list('id', flat=True))
+        self.assertEqual(self.walk(page_size=7), expected)
+
+    def test_filters_apply_to_every_page(self):
+        expected = list(
+            Transaction.objects.filter(user=self.user, account_ref='GR1', category='groceries')
+            .order_by('-booking_date', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(self.walk(page_size=4, account='GR1', category='groceries'), expected)
+
+    def test_page_size_is_capped_and_bad_cursors_rejected(self):
+        response = self.client.get('/api/transactions/', {'page_size': 10_000})
+        self.assertEqual(response.json()['page_size'], 200)
+        self.assertEqual(len(response.json()['transactions']), 45)
+        self.assertIsNone(response.json()['next'])
+        self.assertEqual(self.client.get('/api/transactions/', {'cursor': 'not-a-cursor'}).status_code, 404)
+        self.assertEqual(self.client.get('/api/transactions/', {'month': '2026-13'}).status_code, 400)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='exporter', email='exporter@example.com')
+        other = User.objects.create(username='stranger', email='stranger@example.com')
+        Transaction.objects.bulk_create([
+            Transaction(user=self.user, account_ref='GR1', transaction_id='t1', booking_date=date(2026, 9, 2),
+                        amount=Decimal('-12.50'), counterparty='=HYPERLINK("http://evil")', category='groceries'),
+            Transaction(user=self.user, account_ref='GR1', transaction_id='t2', booking_date=date(2026, 9, 1),
+                        amount=Decimal('1500.00'), counterparty='ΕΡΓΟΔΟΤΗΣ', remittance_info='-salary',
+                        status='pending'),
+            Transaction(user=self.user, account_ref='GR2', transaction_id='t3', booking_date=date(2026, 9, 3),
+                        amount=Decimal('-3.00'), counterparty='@SUM(A1)', bank_code='\tPOS'),
+            Transaction(user=other, account_ref='GR9', transaction_id='x', booking_date=date(2026, 9, 2),
+                        amount=-1),
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def download(self, file_format, **params):
+        params = {'from': '2026-09-01', 'to': '2026-09-30', **params}
+        response = self.client.get(f"/api/transactions/export/{file_format}/", params)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_csv_guards_formulas(self):
+        response, body = self.download('csv')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="transactions-20260901-20260930.csv"')
+        reader = csv.DictReader(io.StringIO(body))
+        rows = list(reader)
+        self.assertEqual(tuple(reader.fieldnames), export.EXPORT_FIELDS)
+        self.assertEqual([row['transaction_id'] for row in rows], ['t2', 't1', 't3'])
+        self.assertEqual([row['counterparty'] for row in rows],
+                         ['ΕΡΓΟΔΟΤΗΣ', '\'=HYPERLINK("http://evil")', "'@SUM(A1)"])
+        self.assertEqual(rows[0]['remittance_info'], "'-salary")
+        self.assertEqual(rows[2]['bank_code'], "'\tPOS")
+        # Amounts are numbers, not text, so a negative one is left alone
+        self.assertEqual(rows[1]['amount'], '-12.50')
+
+    def test_ndjson_has_one_object_per_line(self):
+        response, body = self.download('ndjson', account='GR1')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = body.splitlines()
+        self.assertEqual(len(lines), 2)
+        first = json.loads(lines[0])
+        self.assertEqual(set(first), set(export.EXPORT_FIELDS))
+        self.assertEqual((first['transaction_id'], first['amount'], first['booking_date']),
+                         ('t2', '1500.00', '2026-09-01'))
+        self.assertEqual(first['counterparty'], 'ΕΡΓΟΔΟΤΗΣ')
+        self.assertEqual(first['status'], 'pending')
+        self.assertEqual(json.loads(lines[1])['counterparty'], '=HYPERLINK("http://evil")')
+
+    def test_large_exports_are_streamed_in_blocks(self):
+        rows = [(i, 'GR1', f"t{i}", date(2026, 9, 1), None, Decimal('-1.00'), 'EUR', 'booked', '', 'SHOP', '', '')
+                for i in range(5000)]
+        with mock.patch.object(export, 'BLOCK_SIZE', 4096):
+            for stream in (export.csv_stream, export.ndjson_stream):
+                blocks = list(stream(iter(rows)))
+                self.assertGreater(len(blocks), 1)
+                self.assertTrue(all(block.endswith('\n') for block in blocks))
+
+    def test_bad_requests_are_rejected(self):
+        self.assertEqual(self.client.get('/api/transactions/export/xlsx/').status_code, 404)
+        url = '/api/transactions/export/csv/'
+        self.assertEqual(self.client.get(url, {'from': '2026-09-31'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'from': '2026-09-30', 'to': '2026-09-01'}).status_code, 400)
@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+app_name = 'transactions'
+
+urlpatterns = [
+    path('api/transactions/', views.TransactionListView.as_view(), name='transaction_list'),
+    path('api/transactions/export/<str:file_format>/', views.TransactionExportView.as_view(),
+         name='transaction_export'),
+    path('api/transactions/<int:pk>/', views.TransactionDetailView.as_view(), name='transaction_detail'),
+]
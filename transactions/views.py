@@ -0,0 +1,90 @@
+from datetime import date, timedelta
+
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from .export import csv_stream, export_rows, ndjson_stream
+from .filters import TransactionFilter
+from .forms import TransactionSerializer, TransactionDetailSerializer
+from .models import Transaction
+from .pagination import KeysetPagination
+
+
+class TransactionListView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        """List the user's transactions, newest first, a page at a time (?cursor=, ?page_size=).
+        
+        Filters: ?account= and ?category= (comma-separated), ?min_amount=, ?max_amount=,
+        ?date_from=, ?date_to= (YYYY-MM-DD), ?month= (YYYY-MM) and ?status=.
+        """
+        filterset = TransactionFilter(request.query_params, queryset=Transaction.objects.filter(user=request.user))
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(filterset.qs.for_listing(), request, view=self)
+        return paginator.get_paginated_response(TransactionSerializer(page, many=True).data)
+
+
+class TransactionDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, pk):
+        """One transaction, including the raw bank payload."""
+        transaction = get_object_or_404(Transaction, pk=pk, user=request.user)
+        return Response(TransactionDetailSerializer(transaction).data, status=status.HTTP_200_OK)
+
+
+class TransactionExportView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    FORMATS = {
+        'csv': (csv_stream, 'text/csv; charset=utf-8'),
+        'ndjson': (ndjson_stream, 'application/x-ndjson'),
+    }
+    
+    def get(self, request, file_format):
+        """Stream the user's transactions as CSV or NDJSON.
+        
+        Filters: ?from=YYYY-MM-DD&to=YYYY-MM-DD (booking dates, default the last
+        365 days), ?account=, ?category= (comma-separated; 'uncategorized' for
+        none) and ?status=booked|pending.
+        """
+        if file_format not in self.FORMATS:
+            return Response({'error': 'format must be csv or ndjson'}, status=status.HTTP_404_NOT_FOUND)
+        
+        params = request.query_params
+        today = timezone.localdate()
+        try:
+            date_to = date.fromisoformat(params['to']) if params.get('to') else today
+            date_from = date.fromisoformat(params['from']) if params.get('from') else date_to - timedelta(days=365)
+        except ValueError:
+            return Response({'error': 'from and to must be formatted YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        if date_from > date_to:
+            return Response({'error': 'from must not be after to'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        transactions = Transaction.objects.filter(
+            user=request.user, booking_date__gte=date_from, booking_date__lte=date_to,
+        )
+        if params.get('account'):
+            transactions = transactions.filter(account_ref__in=params['account'].split(','))
+        if params.get('category'):
+            categories = ['' if name == 'uncategorized' else name for name in params['category'].split(',')]
+            transactions = transactions.filter(category__in=categories)
+        if params.get('status'):
+            transactions = transactions.filter(status=params['status'])
+        
+        stream, content_type = self.FORMATS[file_format]
+        response = StreamingHttpResponse(
+            stream(export_rows(transactions.order_by('booking_date', 'id'))), content_type=content_type,
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="transactions-{date_from:%Y%m%d}-{date_to:%Y%m%d}.{file_format}"'
+        )
+        return response